@@ -0,0 +1,114 @@
+import numpy as np
+
+def decimate_minmax(y, start, stop, n_bins, keep=None):
+    """
+    Memilih indeks titik untuk ditampilkan dengan decimation min/max.
+
+    Rentang [start, stop) dibagi menjadi n_bins kelompok; dari tiap kelompok hanya
+    titik minimum dan maksimum yang diambil, sehingga bentuk puncak dan lembah tetap
+    terlihat walaupun jumlah titik yang digambar dibatasi oleh lebar layar.
+
+    Parameters:
+    - y: np.ndarray, intensitas (terurut menurut x)
+    - start, stop: int, rentang indeks yang terlihat
+    - n_bins: int, jumlah kelompok (biasanya lebar axes dalam piksel)
+    - keep: np.ndarray indeks yang selalu disertakan (mis. puncak)
+
+    Returns:
+    - indices: np.ndarray indeks terurut
+    """
+    count = stop - start
+    if count <= 2 * n_bins:
+        indices = np.arange(start, stop)
+    else:
+        bin_size = -(-count // n_bins)
+        n_bins = -(-count // bin_size)
+        # Lengkapi kelompok terakhir dengan nilai tepi agar bisa di-reshape
+        segment = np.pad(y[start:stop], (0, n_bins * bin_size - count), mode='edge').reshape(n_bins, bin_size)
+        base = start + np.arange(n_bins) * bin_size
+        indices = np.concatenate([base + segment.argmin(axis=1), base + segment.argmax(axis=1), [start, stop - 1]])
+        indices = np.minimum(indices, stop - 1)
+    if keep is not None and len(keep):
+        keep = np.asarray(keep)
+        indices = np.concatenate([indices, keep[(keep >= start) & (keep < stop)]])
+    return np.unique(indices)
+
+def attach_decimation(ax, line, x, y, keep=None):
+    """
+    Menghubungkan garis dengan decimation level-of-detail yang dihitung ulang saat zoom/pan.
+
+    Data lengkap disimpan di sini, sedangkan garis hanya menerima titik hasil
+    decimate_minmax untuk rentang sumbu x yang terlihat. Callback 'xlim_changed'
+    dipicu oleh zoom, pan dan home pada NavigationToolbar2Tk. Indeks pada keep
+    (mis. puncak) selalu digambar.
+
+    Returns:
+    - decimation: dict berisi 'cid' (id callback) dan 'add_keep' (fungsi untuk menambah
+      indeks asli yang selalu digambar, mis. puncak yang ditambahkan manual)
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    order = np.argsort(x, kind='mergesort')
+    x_sorted, y_sorted = x[order], y[order]
+    # Posisi indeks asli di dalam urutan terurut
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    state = {'keep': None if keep is None else rank[np.asarray(keep, dtype=np.int64)]}
+
+    def update(axes):
+        low, high = sorted(axes.get_xlim())
+        # Sertakan satu titik di luar tiap tepi agar garis menyambung sampai batas axes
+        start = max(np.searchsorted(x_sorted, low, side='left') - 1, 0)
+        stop = min(np.searchsorted(x_sorted, high, side='right') + 1, len(x_sorted))
+        n_bins = max(int(axes.bbox.width), 1)
+        indices = decimate_minmax(y_sorted, start, stop, n_bins, state['keep'])
+        line.set_data(x_sorted[indices], y_sorted[indices])
+
+    def add_keep(indices):
+        added = rank[np.atleast_1d(np.asarray(indices, dtype=np.int64))]
+        state['keep'] = added if state['keep'] is None else np.union1d(state['keep'], added)
+        update(line.axes)
+
+    update(ax)
+    return {'cid': ax.callbacks.connect('xlim_changed', update), 'add_keep': add_keep}
+
+def layout_labels(positions, label_width, n_levels=1, descending=True):
+    """
+    Menempatkan label puncak tanpa tumpang tindih dengan algoritma sweep-line.
+
+    Label diproses sekali dari satu ujung sumbu ke ujung lainnya. Tiap baris (level)
+    hanya mengingat posisi label terakhirnya, sehingga total biaya O(n log n) untuk
+    pengurutan ditambah O(n * n_levels) untuk penempatan.
+
+    Parameters:
+    - positions: array-like, posisi puncak pada sumbu x
+    - label_width: float, lebar label dalam satuan sumbu x
+    - n_levels: int, jumlah baris label yang boleh dipakai
+    - descending: bool, True jika label digeser ke arah x yang lebih kecil
+      (sumbu wavenumber FTIR yang dibalik), False untuk arah x yang lebih besar
+
+    Returns:
+    - label_x: np.ndarray, posisi x label (urutan sama dengan positions)
+    - levels: np.ndarray int, indeks baris label (0 = paling dekat dengan puncak)
+    """
+    positions = np.asarray(positions, dtype=np.float64)
+    direction = -1.0 if descending else 1.0
+    # Dalam koordinat u = direction * x, sweep selalu berjalan ke arah u yang membesar
+    u = direction * positions
+    order = np.argsort(u, kind='mergesort')
+    label_u = np.empty_like(u)
+    levels = np.zeros(len(u), dtype=int)
+    frontiers = [-np.inf] * max(1, n_levels)  # Posisi u label terakhir di tiap baris
+    for i in order:
+        # Pilih baris yang membutuhkan pergeseran paling kecil
+        best_level, best_u = 0, None
+        for level, frontier in enumerate(frontiers):
+            candidate = max(u[i], frontier + label_width)
+            if best_u is None or candidate < best_u:
+                best_level, best_u = level, candidate
+                if candidate == u[i]:
+                    break
+        frontiers[best_level] = best_u
+        label_u[i] = best_u
+        levels[i] = best_level
+    return direction * label_u, levels
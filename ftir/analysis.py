@@ -1,15 +1,443 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
-from scipy.signal import find_peaks
+import pandas as pd
+from scipy.optimize import least_squares
+from scipy.signal import find_peaks, peak_prominences, peak_widths, savgol_filter
+from scipy.spatial import cKDTree
 
-def identify_peaks(data):
-    """Mengidentifikasi puncak pada data transmitansi"""
+# Struktur hasil karakterisasi puncak (satu baris per puncak)
+PEAK_DTYPE = np.dtype([
+    ('index', np.int64),        # Indeks titik puncak pada data
+    ('wavenumber', np.float64), # Posisi puncak (cm⁻¹)
+    ('height', np.float64),     # Nilai %T pada dasar pita
+    ('prominence', np.float64), # Kedalaman pita terhadap garis dasar lokal (%T)
+    ('fwhm', np.float64),       # Lebar setengah kedalaman (cm⁻¹)
+    ('area', np.float64),       # Luas pita di bawah garis dasar lokal (%T·cm⁻¹)
+])
+
+# Struktur hasil fitting pita
+BAND_DTYPE = np.dtype([
+    ('index', np.int64),        # Indeks puncak awal yang menjadi tebakan pita
+    ('cluster', np.int64),      # Nomor kelompok pita yang difit bersama
+    ('center', np.float64),     # Pusat pita hasil fitting (cm⁻¹)
+    ('amplitude', np.float64),  # Kedalaman pita (%T)
+    ('fwhm', np.float64),       # Lebar setengah kedalaman (cm⁻¹)
+    ('eta', np.float64),        # Fraksi Lorentzian (0 = Gaussian, 1 = Lorentzian)
+    ('area', np.float64),       # Luas analitik pita (%T·cm⁻¹)
+])
+
+BAND_MODELS = ('gaussian', 'lorentzian', 'pseudo_voigt')
+PEAK_METHODS = ('minima', 'derivative', 'fsd')
+_GAUSS_FACTOR = 4 * np.log(2)
+
+def _find_peak_indices(y):
+    """Indeks minimum lokal %T (puncak serapan)"""
+    # distance=10 untuk mencegah deteksi puncak yang terlalu rapat
+    peaks, _ = find_peaks(-y, distance=10)
+    return peaks
+
+def identify_peaks(data, method='minima', **options):
+    """
+    Mengidentifikasi puncak pada data transmitansi.
+
+    method 'minima' (default) mencari minimum lokal %T; 'derivative' dan 'fsd'
+    memakai spektrum turunan kedua / Fourier self-deconvolution sehingga bahu dan
+    pita yang tumpang tindih ikut terdeteksi (opsi lihat find_peaks_enhanced).
+    """
     if '%T_corrected' not in data.columns:
         raise ValueError("Data tidak memiliki kolom '%T_corrected'. Pastikan koreksi baseline telah dilakukan.")
-    
+
     # Gunakan data transmitansi untuk mendeteksi puncak ke atas (penurunan %T)
     y = data['%T_corrected'].values
-    
+    if method != 'minima':
+        return find_peaks_enhanced(data['wavenumber'].values, y, method=method, **options)
+
     # Balik data untuk mendeteksi puncak ke atas (penurunan %T)
-    peaks, _ = find_peaks(-y, distance=10)  # distance=10 untuk mencegah deteksi puncak yang terlalu rapat
-    
-    return peaks
\ No newline at end of file
+    return _find_peak_indices(y)
+
+def second_derivative(Y, step=1.0, window=15, polyorder=3):
+    """
+    Spektrum turunan kedua Savitzky-Golay untuk satu atau banyak spektrum sekaligus.
+
+    Pita serapan (lembah %T) menjadi puncak positif yang lebih sempit, sehingga
+    bahu pada pita yang tumpang tindih terpisah.
+    """
+    return savgol_filter(np.asarray(Y, dtype=np.float64), window, polyorder, deriv=2, delta=step, axis=-1)
+
+def fourier_self_deconvolution(Y, step=1.0, gamma=8.0, k=2.0):
+    """
+    Fourier self-deconvolution (FSD) untuk satu atau banyak spektrum dalam satu pass FFT.
+
+    Parameters:
+    - Y: np.ndarray (n_titik,) atau (n_spektrum x n_titik), %T dengan sumbu berjarak sama
+    - step: float, jarak titik (cm⁻¹)
+    - gamma: float, setengah lebar (HWHM) Lorentzian pita yang didekonvolusi (cm⁻¹)
+    - k: float, faktor penyempitan; menentukan panjang apodisasi segitiga
+
+    Returns:
+    - enhanced: np.ndarray dengan bentuk sama; pita serapan menjadi puncak positif
+    """
+    Y = np.asarray(Y, dtype=np.float64)
+    depth = Y.mean(axis=-1, keepdims=True) - Y
+    n_points = Y.shape[-1]
+    # Padding cermin mengurangi artefak tepi akibat periodisitas FFT
+    padded = np.concatenate([depth, depth[..., ::-1]], axis=-1)
+    t = np.fft.rfftfreq(2 * n_points, d=step)
+    t_max = k / (2 * gamma)
+    filter_ = np.exp(2 * np.pi * gamma * t) * np.clip(1 - t / t_max, 0, None)
+    return np.fft.irfft(np.fft.rfft(padded, axis=-1) * filter_, n=2 * n_points, axis=-1)[..., :n_points]
+
+def find_peaks_enhanced(x, Y, method='derivative', threshold=8.0, window=15, polyorder=3,
+                        gamma=8.0, k=2.0, distance=3):
+    """
+    Deteksi puncak dari spektrum turunan kedua atau FSD (vektorisasi per batch).
+
+    Parameters:
+    - x: np.ndarray (n_titik,), wavenumber (boleh tidak terurut; diurutkan seperti baseline)
+    - Y: np.ndarray (n_titik,) atau (n_spektrum x n_titik), %T terkoreksi
+    - method: 'derivative' atau 'fsd'
+    - threshold: float, prominence minimum dalam kelipatan derau (MAD) spektrum hasil transformasi
+    - window, polyorder: parameter Savitzky-Golay (method='derivative')
+    - gamma, k: parameter FSD (method='fsd')
+    - distance: int, jarak minimum antar puncak (titik)
+
+    Returns:
+    - peaks: array indeks (format identify_peaks) untuk Y 1 dimensi,
+      atau list array indeks untuk Y 2 dimensi
+    """
+    if method not in PEAK_METHODS[1:]:
+        raise ValueError(f"Metode deteksi puncak tidak dikenal: {method}. Pilih salah satu dari {', '.join(PEAK_METHODS)}.")
+    x = np.asarray(x, dtype=np.float64)
+    Y = np.asarray(Y, dtype=np.float64)
+    single = Y.ndim == 1
+    Y = np.atleast_2d(Y)
+    order = np.argsort(x, kind='mergesort')
+    step = float(np.median(np.diff(x[order])))
+    Y = Y[:, order]
+
+    if method == 'derivative':
+        enhanced = second_derivative(Y, step=step, window=window, polyorder=polyorder)
+    else:
+        enhanced = fourier_self_deconvolution(Y, step=step, gamma=gamma, k=k)
+    # Derau tiap baris diperkirakan dengan MAD (tahan terhadap puncak)
+    noise = 1.4826 * np.median(np.abs(enhanced - np.median(enhanced, axis=1, keepdims=True)), axis=1)
+
+    peaks = []
+    for row, sigma in zip(enhanced, noise):
+        indices, _ = find_peaks(row, prominence=threshold * sigma, distance=distance)
+        peaks.append(np.sort(order[indices]))
+    return peaks[0] if single else peaks
+
+def characterize_spectrum(x, y, peaks=None):
+    """
+    Menghitung posisi, tinggi, prominence, FWHM dan luas untuk setiap puncak serapan.
+
+    Parameters:
+    - x: np.ndarray, wavenumber
+    - y: np.ndarray, %T (biasanya '%T_corrected')
+    - peaks: array indeks puncak (default: dideteksi seperti identify_peaks)
+
+    Returns:
+    - table: np.ndarray terstruktur dengan dtype PEAK_DTYPE
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    peaks = _find_peak_indices(y) if peaks is None else np.asarray(peaks, dtype=np.int64)
+    table = np.zeros(len(peaks), dtype=PEAK_DTYPE)
+    if len(peaks) == 0:
+        return table
+
+    # Pita serapan adalah lembah %T, sehingga dianalisis pada sinyal terbalik
+    depth = -y
+    prominences, left_bases, right_bases = peak_prominences(depth, peaks)
+    _, _, left_ips, right_ips = peak_widths(depth, peaks, rel_height=0.5,
+                                            prominence_data=(prominences, left_bases, right_bases))
+    points = np.arange(len(x))
+    fwhm = np.abs(np.interp(right_ips, points, x) - np.interp(left_ips, points, x))
+
+    # Luas di antara garis dasar lokal (puncak - prominence) dan kurva %T
+    contour = y[peaks] + prominences
+    area = np.empty(len(peaks))
+    for i, (left, right) in enumerate(zip(left_bases, right_bases)):
+        segment = slice(left, right + 1)
+        area[i] = abs(np.trapezoid(np.clip(contour[i] - y[segment], 0, None), x[segment]))
+
+    table['index'] = peaks
+    table['wavenumber'] = x[peaks]
+    table['height'] = y[peaks]
+    table['prominence'] = prominences
+    table['fwhm'] = fwhm
+    table['area'] = area
+    return table
+
+def characterize_peaks(data, peaks=None):
+    """Karakterisasi puncak untuk DataFrame hasil koreksi baseline (lihat characterize_spectrum)"""
+    if '%T_corrected' not in data.columns:
+        raise ValueError("Data tidak memiliki kolom '%T_corrected'. Pastikan koreksi baseline telah dilakukan.")
+    return characterize_spectrum(data['wavenumber'].values, data['%T_corrected'].values, peaks)
+
+def _band_profiles(x, centers, widths, etas, model):
+    """Profil pita ternormalisasi (tinggi 1) beserta turunannya terhadap pusat, lebar dan eta"""
+    dx = x[:, np.newaxis] - centers
+    dx2_w2 = dx ** 2 / widths ** 2
+    profile = np.zeros_like(dx)
+    d_center = np.zeros_like(dx)
+    d_width = np.zeros_like(dx)
+    gauss = lorentz = None
+    if model in ('gaussian', 'pseudo_voigt'):
+        gauss = np.exp(-_GAUSS_FACTOR * dx2_w2)
+        g_weight = 1.0 if model == 'gaussian' else 1 - etas
+        profile += g_weight * gauss
+        d_center += g_weight * gauss * 2 * _GAUSS_FACTOR * dx / widths ** 2
+        d_width += g_weight * gauss * 2 * _GAUSS_FACTOR * dx2_w2 / widths
+    if model in ('lorentzian', 'pseudo_voigt'):
+        lorentz = 1 / (1 + 4 * dx2_w2)
+        l_weight = 1.0 if model == 'lorentzian' else etas
+        profile += l_weight * lorentz
+        d_center += l_weight * lorentz ** 2 * 8 * dx / widths ** 2
+        d_width += l_weight * lorentz ** 2 * 8 * dx2_w2 / widths
+    d_eta = lorentz - gauss if model == 'pseudo_voigt' else None
+    return profile, d_center, d_width, d_eta
+
+def _unpack_params(params, n_bands, model):
+    """Pisahkan vektor parameter menjadi offset dan parameter per pita"""
+    per_band = 4 if model == 'pseudo_voigt' else 3
+    bands = params[1:].reshape(n_bands, per_band)
+    etas = bands[:, 3] if model == 'pseudo_voigt' else np.full(n_bands, 1.0 if model == 'lorentzian' else 0.0)
+    return params[0], bands[:, 0], bands[:, 1], bands[:, 2], etas
+
+def _band_residual(params, x, y, n_bands, model):
+    offset, amplitudes, centers, widths, etas = _unpack_params(params, n_bands, model)
+    profile = _band_profiles(x, centers, widths, etas, model)[0]
+    # Pita serapan menurunkan %T dari garis dasar offset
+    return offset - profile @ amplitudes - y
+
+def _band_jacobian(params, x, y, n_bands, model):
+    offset, amplitudes, centers, widths, etas = _unpack_params(params, n_bands, model)
+    profile, d_center, d_width, d_eta = _band_profiles(x, centers, widths, etas, model)
+    per_band = 4 if model == 'pseudo_voigt' else 3
+    jac = np.empty((len(x), 1 + n_bands * per_band))
+    jac[:, 0] = 1.0
+    jac[:, 1::per_band] = -profile
+    jac[:, 2::per_band] = -amplitudes * d_center
+    jac[:, 3::per_band] = -amplitudes * d_width
+    if model == 'pseudo_voigt':
+        jac[:, 4::per_band] = -amplitudes * d_eta
+    return jac
+
+def _band_area(amplitudes, widths, etas):
+    """Luas analitik pita pseudo-Voigt (mencakup Gaussian dan Lorentzian murni)"""
+    gauss_area = amplitudes * widths * np.sqrt(np.pi / _GAUSS_FACTOR)
+    lorentz_area = amplitudes * widths * np.pi / 2
+    return etas * lorentz_area + (1 - etas) * gauss_area
+
+def _group_overlapping(table, window_factor):
+    """Kelompokkan puncak yang jendelanya (± window_factor x FWHM) saling bertumpuk"""
+    order = np.argsort(table['wavenumber'])
+    lows = table['wavenumber'][order] - window_factor * table['fwhm'][order]
+    highs = table['wavenumber'][order] + window_factor * table['fwhm'][order]
+    # Kelompok baru dimulai jika batas bawah jendela melewati batas atas kumulatif sebelumnya
+    new_group = np.r_[True, lows[1:] > np.maximum.accumulate(highs)[:-1]]
+    groups = np.empty(len(order), dtype=np.int64)
+    groups[order] = np.cumsum(new_group) - 1
+    return groups
+
+def fit_bands(x, y, table=None, model='pseudo_voigt', window_factor=2.0, max_nfev=200):
+    """
+    Fitting pita yang saling tumpang tindih dengan model Gaussian/Lorentzian/pseudo-Voigt.
+
+    Puncak yang jendelanya bertumpuk difit bersama dalam satu masalah least squares
+    (dengan Jacobian analitik), puncak yang terpisah difit sendiri-sendiri.
+
+    Parameters:
+    - x: np.ndarray, wavenumber
+    - y: np.ndarray, %T (biasanya '%T_corrected')
+    - table: hasil characterize_spectrum sebagai tebakan awal (default: dihitung)
+    - model: 'gaussian', 'lorentzian' atau 'pseudo_voigt'
+    - window_factor: float, lebar jendela fitting dalam kelipatan FWHM
+    - max_nfev: int, batas evaluasi fungsi per kelompok
+
+    Returns:
+    - bands: np.ndarray terstruktur dengan dtype BAND_DTYPE
+    """
+    if model not in BAND_MODELS:
+        raise ValueError(f"Model pita tidak dikenal: {model}. Pilih salah satu dari {', '.join(BAND_MODELS)}.")
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if table is None:
+        table = characterize_spectrum(x, y)
+    # Puncak tanpa lebar terukur tidak bisa dijadikan tebakan awal
+    table = table[table['fwhm'] > 0]
+    bands = np.zeros(len(table), dtype=BAND_DTYPE)
+    if len(table) == 0:
+        return bands
+
+    groups = _group_overlapping(table, window_factor)
+    min_width = np.min(np.abs(np.diff(x))) if len(x) > 1 else 1.0
+    for group in range(groups.max() + 1):
+        members = np.flatnonzero(groups == group)
+        peaks = table[members]
+        low = np.min(peaks['wavenumber'] - window_factor * peaks['fwhm'])
+        high = np.max(peaks['wavenumber'] + window_factor * peaks['fwhm'])
+        window = (x >= low) & (x <= high)
+        x_fit, y_fit = x[window], y[window]
+        n_bands = len(peaks)
+
+        # Tebakan awal dan batas: [offset, (amplitudo, pusat, lebar[, eta]) x n_bands]
+        p0 = [np.max(y_fit)]
+        lower = [-np.inf]
+        upper = [np.inf]
+        for peak in peaks:
+            p0 += [peak['prominence'], peak['wavenumber'], peak['fwhm']]
+            lower += [0.0, peak['wavenumber'] - max(peak['fwhm'], min_width), min_width]
+            upper += [np.inf, peak['wavenumber'] + max(peak['fwhm'], min_width), max(4 * peak['fwhm'], 2 * min_width)]
+            if model == 'pseudo_voigt':
+                p0.append(0.5)
+                lower.append(0.0)
+                upper.append(1.0)
+        p0 = np.clip(p0, lower, upper)
+
+        result = least_squares(_band_residual, p0, jac=_band_jacobian, bounds=(lower, upper),
+                               args=(x_fit, y_fit, n_bands, model), max_nfev=max_nfev)
+        _, amplitudes, centers, widths, etas = _unpack_params(result.x, n_bands, model)
+        bands['index'][members] = peaks['index']
+        bands['cluster'][members] = group
+        bands['center'][members] = centers
+        bands['amplitude'][members] = amplitudes
+        bands['fwhm'][members] = widths
+        bands['eta'][members] = etas
+        bands['area'][members] = _band_area(amplitudes, widths, etas)
+    return bands
+
+def _analyze_row(args):
+    """Pekerja proses: karakterisasi (dan fitting) satu spektrum"""
+    x, y, model, fit, window_factor = args
+    table = characterize_spectrum(x, y)
+    bands = fit_bands(x, y, table, model=model, window_factor=window_factor) if fit else None
+    return table, bands
+
+def analyze_batch(x, Y, model='pseudo_voigt', fit=True, window_factor=2.0, max_workers=None):
+    """
+    Karakterisasi puncak dan fitting pita untuk banyak spektrum secara paralel.
+
+    Parameters:
+    - x: np.ndarray (n_titik,), wavenumber bersama
+    - Y: np.ndarray (n_spektrum x n_titik), %T terkoreksi (mis. dari baseline_correction_many)
+    - model, window_factor: lihat fit_bands
+    - fit: bool, False untuk hanya menghitung tabel puncak
+    - max_workers: int, jumlah proses (default: jumlah CPU)
+
+    Returns:
+    - results: list (table, bands) per spektrum; bands bernilai None jika fit=False
+    """
+    Y = np.atleast_2d(Y)
+    tasks = [(x, y, model, fit, window_factor) for y in Y]
+    if len(tasks) == 1 or max_workers == 1:
+        return [_analyze_row(task) for task in tasks]
+    chunksize = max(1, len(tasks) // (4 * (max_workers or os.cpu_count() or 1)))
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(_analyze_row, tasks, chunksize=chunksize))
+
+# Kolom karakteristik puncak yang dibawa ke tabel lintasan
+_TRACK_FIELDS = ('height', 'prominence', 'fwhm', 'area')
+
+def _peak_columns(peaks):
+    """Menyeragamkan satu set puncak (tabel PEAK_DTYPE, DataFrame, list dict atau array wavenumber) menjadi kolom array"""
+    if isinstance(peaks, pd.DataFrame) or (getattr(peaks, 'dtype', None) is not None and peaks.dtype.names):
+        source = peaks
+        fields = peaks.columns if isinstance(peaks, pd.DataFrame) else peaks.dtype.names
+    elif len(peaks) and isinstance(peaks[0], dict):
+        fields = set().union(*peaks)
+        source = {name: [peak.get(name, np.nan) for peak in peaks] for name in fields}
+    else:
+        fields = ('wavenumber',)
+        source = {'wavenumber': peaks}
+    if 'wavenumber' not in fields:
+        raise ValueError("Set puncak harus memiliki kolom 'wavenumber'")
+    n_peaks = len(source['wavenumber'])
+    columns = {'wavenumber': np.asarray(source['wavenumber'], dtype=np.float64)}
+    for name in _TRACK_FIELDS:
+        columns[name] = np.asarray(source[name], dtype=np.float64) if name in fields else np.full(n_peaks, np.nan)
+    return columns
+
+def track_peaks(peak_sets, names=None, tolerance=8.0, max_gap=1):
+    """
+    Menautkan puncak yang bersesuaian antar banyak spektrum (mis. seri konsentrasi dopan).
+
+    Setiap sampel dicocokkan dengan posisi terakhir lintasan yang masih aktif memakai
+    KD-tree (cKDTree) dan batas toleransi; konflik diselesaikan secara greedy dari
+    jarak terdekat sehingga satu lintasan hanya menerima satu puncak per sampel.
+
+    Parameters:
+    - peak_sets: list set puncak per sampel (hasil characterize_spectrum/analyze_batch,
+      DataFrame, list dict seperti peak_table_data, atau array wavenumber)
+    - names: list nama sampel (default: 0, 1, 2, ...)
+    - tolerance: float, pergeseran maksimum antar sampel (cm⁻¹)
+    - max_gap: int, jumlah sampel berturut-turut yang boleh terlewat sebelum lintasan ditutup
+
+    Returns:
+    - trajectories: DataFrame rapi (satu baris per puncak per sampel) dengan kolom
+      'track', 'sample', 'sample_index', 'wavenumber', 'shift' (terhadap posisi awal
+      lintasan), 'height', 'prominence', 'fwhm', 'area'
+    """
+    names = list(range(len(peak_sets))) if names is None else list(names)
+    if len(names) != len(peak_sets):
+        raise ValueError("Jumlah nama sampel tidak sama dengan jumlah set puncak")
+
+    last_position = np.empty(0)                # Posisi terakhir tiap lintasan
+    last_seen = np.empty(0, dtype=np.int64)    # Indeks sampel terakhir tiap lintasan
+    frames, tracks, samples = [], [], []  # Kolom puncak, lintasan dan sampel per set
+    for s, peaks in enumerate(peak_sets):
+        columns = _peak_columns(peaks)
+        positions = columns['wavenumber']
+        assignment = np.full(len(positions), -1, dtype=np.int64)
+
+        active = np.flatnonzero(s - last_seen <= max_gap + 1)
+        if len(active) and len(positions):
+            tree = cKDTree(last_position[active, None])
+            k = min(3, len(active))
+            distances, candidates = tree.query(positions[:, None], k=k, distance_upper_bound=tolerance)
+            distances = distances.reshape(len(positions), k)
+            candidates = candidates.reshape(len(positions), k)
+            best = np.where(np.isfinite(distances[:, 0]), candidates[:, 0], -1)
+            matched = best[best >= 0]
+            if len(np.unique(matched)) == len(matched):
+                # Tanpa konflik: setiap puncak memakai lintasan terdekatnya
+                assignment = np.where(best >= 0, active[np.maximum(best, 0)], -1)
+            else:
+                # Pasangan (puncak, lintasan) diproses dari jarak terkecil
+                peak_index = np.repeat(np.arange(len(positions)), k)
+                distances, candidates = distances.ravel(), candidates.ravel()
+                valid = np.isfinite(distances)
+                order = np.argsort(distances[valid], kind='stable')
+                taken = set()
+                for p, t in zip(peak_index[valid][order], candidates[valid][order]):
+                    if assignment[p] < 0 and t not in taken:
+                        assignment[p] = active[t]
+                        taken.add(t)
+
+        new = assignment < 0
+        assignment[new] = len(last_position) + np.arange(new.sum())
+        last_position = np.concatenate([last_position, positions[new]])
+        last_seen = np.concatenate([last_seen, np.full(new.sum(), s)])
+        last_position[assignment] = positions
+        last_seen[assignment] = s
+
+        frames.append(columns)
+        tracks.append(assignment)
+        samples.append(np.full(len(positions), s))
+
+    columns = ['track', 'sample', 'sample_index', 'wavenumber', 'shift', *_TRACK_FIELDS]
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    sample_index = np.concatenate(samples)
+    trajectories = pd.DataFrame({
+        'track': np.concatenate(tracks),
+        'sample': np.asarray(names, dtype=object)[sample_index],
+        'sample_index': sample_index,
+        **{name: np.concatenate([frame[name] for frame in frames]) for name in ('wavenumber', *_TRACK_FIELDS)},
+    })
+    trajectories = trajectories.sort_values(['track', 'sample_index'], kind='stable')
+    trajectories['shift'] = trajectories['wavenumber'] - trajectories.groupby('track')['wavenumber'].transform('first')
+    return trajectories[columns].reset_index(drop=True)
@@ -0,0 +1,188 @@
+import argparse
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from pybaselines import Baseline
+from ftir.processing import load_folder, baseline_correction_many, clear_caches, data_hash
+
+# Konfigurasi bawaan: (nama algoritma, parameter). 'asls_native' adalah AsLS batch milik
+# ftir.processing; nama lain adalah metode pybaselines.Baseline
+DEFAULT_ALGORITHMS = [
+    ('asls_native', {'lam': 1e5, 'p': 0.01}),
+    ('asls', {'lam': 1e5, 'p': 0.01}),
+    ('asls', {'lam': 1e7, 'p': 0.01}),
+    ('arpls', {'lam': 1e5}),
+    ('arpls', {'lam': 1e7}),
+    ('airpls', {'lam': 1e5}),
+    ('modpoly', {'poly_order': 3}),
+    ('snip', {'max_half_window': 40}),
+]
+
+def synthetic_corpus(n_spectra=50, n_points=3735, n_bands=12, noise=0.05, seed=0):
+    """
+    Membuat korpus spektrum sintetis dengan baseline yang diketahui.
+
+    Sinyal berorientasi serapan (pita ke atas): baseline polinomial + punuk Gaussian lebar,
+    ditambah pita Lorentzian acak dan derau Gaussian.
+
+    Returns:
+    - corpus: dict {'names', 'x' (list array), 'Y' (list array), 'baselines' (list array)}
+    """
+    rng = np.random.default_rng(seed)
+    x = np.linspace(400.0, 4000.0, n_points)
+    t = (x - x[0]) / (x[-1] - x[0])
+    names, Y, baselines = [], [], []
+    for i in range(n_spectra):
+        coefficients = rng.normal(0, [2.0, 3.0, 2.0])
+        hump_center, hump_width = rng.uniform(0.2, 0.8), rng.uniform(0.15, 0.4)
+        baseline = (10 + coefficients[0] + coefficients[1] * t + coefficients[2] * t ** 2
+                    + rng.uniform(0, 5) * np.exp(-((t - hump_center) / hump_width) ** 2))
+        centers = rng.uniform(500, 3900, n_bands)
+        widths = rng.uniform(5, 60, n_bands)
+        heights = rng.uniform(1, 30, n_bands)
+        bands = (heights / (1 + ((x[:, None] - centers) / (widths / 2)) ** 2)).sum(axis=1)
+        names.append(f"sintetis_{i + 1:03d}")
+        Y.append(baseline + bands + rng.normal(0, noise, n_points))
+        baselines.append(baseline)
+    return {'names': names, 'x': [x] * n_spectra, 'Y': Y, 'baselines': baselines}
+
+def file_corpus(source, extension='.txt'):
+    """
+    Memuat korpus spektrum nyata (tanpa baseline acuan) dari folder atau pola glob.
+
+    %T diubah menjadi kedalaman serapan (100 - %T) agar pita mengarah ke atas,
+    sesuai asumsi algoritma baseline.
+    """
+    batch = load_folder(source, max_workers=1, extension=extension)
+    lengths = batch['lengths']
+    return {
+        'names': batch['names'],
+        'x': [batch['wavenumber'][i, :n] for i, n in enumerate(lengths)],
+        'Y': [100.0 - batch['%T'][i, :n] for i, n in enumerate(lengths)],
+        'baselines': None,
+    }
+
+def _run_algorithm(name, params, corpus):
+    """Menjalankan satu konfigurasi pada seluruh korpus dan mengembalikan list baseline"""
+    if name == 'asls_native':
+        # Spektrum dengan sumbu sama (isi identik, bukan hanya ujungnya) diselesaikan bersama
+        groups = {}
+        for i, x in enumerate(corpus['x']):
+            groups.setdefault(data_hash(x), []).append(i)
+        result = [None] * len(corpus['Y'])
+        for members in groups.values():
+            Y = np.vstack([corpus['Y'][i] for i in members])
+            # baseline_correction_many mengembalikan baseline AsLS (setara '%T_corrected')
+            for i, baseline in zip(members, baseline_correction_many(corpus['x'][members[0]], Y, **params)):
+                result[i] = baseline
+        return result
+
+    fitters = {}
+    result = []
+    for x, y in zip(corpus['x'], corpus['Y']):
+        key = data_hash(x)
+        if key not in fitters:
+            # Satu objek Baseline per sumbu agar matriks internal pybaselines dipakai ulang
+            fitters[key] = Baseline(x_data=x)
+        method = getattr(fitters[key], name, None)
+        if method is None:
+            raise ValueError(f"Algoritma baseline tidak dikenal: {name}")
+        baseline, _ = method(y, **params)
+        result.append(baseline)
+    return result
+
+def _peak_memory(name, params, corpus):
+    """Puncak alokasi memori (tracemalloc) untuk satu spektrum"""
+    single = {key: value[:1] if isinstance(value, list) else value for key, value in corpus.items()}
+    # Cache yang terisi sebelum tracing (mis. matriks penalti dari pengukuran waktu)
+    # tidak terlihat oleh tracemalloc; kosongkan agar alokasinya ikut terukur
+    clear_caches()
+    tracemalloc.start()
+    try:
+        _run_algorithm(name, params, single)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+def run_benchmark(corpus, algorithms=None, repeat=3):
+    """
+    Membandingkan algoritma baseline pada satu korpus.
+
+    Parameters:
+    - corpus: dict dari synthetic_corpus atau file_corpus
+    - algorithms: list (nama, parameter) (default: DEFAULT_ALGORITHMS)
+    - repeat: int, jumlah pengulangan; waktu yang dilaporkan adalah yang tercepat
+
+    Returns:
+    - table: DataFrame satu baris per konfigurasi dengan kolom 'algorithm', 'params',
+      'n_spectra', 'total_s', 'ms_per_spectrum', 'peak_memory_kb', 'rmse', 'max_abs_error'
+      (metrik kualitas NaN bila korpus tidak memiliki baseline acuan), terurut dari
+      rmse lalu waktu
+    """
+    algorithms = DEFAULT_ALGORITHMS if algorithms is None else algorithms
+    n_spectra = len(corpus['Y'])
+    rows = []
+    for name, params in algorithms:
+        timings = []
+        for _ in range(max(1, repeat)):
+            start = time.perf_counter()
+            baselines = _run_algorithm(name, params, corpus)
+            timings.append(time.perf_counter() - start)
+
+        rmse = max_error = np.nan
+        if corpus.get('baselines') is not None:
+            errors = [baseline - truth for baseline, truth in zip(baselines, corpus['baselines'])]
+            rmse = float(np.mean([np.sqrt(np.mean(error ** 2)) for error in errors]))
+            max_error = float(max(np.abs(error).max() for error in errors))
+
+        total = min(timings)
+        rows.append({
+            'algorithm': name,
+            'params': ", ".join(f"{key}={value:g}" if isinstance(value, float) else f"{key}={value}"
+                                for key, value in params.items()),
+            'n_spectra': n_spectra,
+            'total_s': total,
+            'ms_per_spectrum': 1000 * total / max(n_spectra, 1),
+            'peak_memory_kb': _peak_memory(name, params, corpus) / 1024,
+            'rmse': rmse,
+            'max_abs_error': max_error,
+        })
+    return pd.DataFrame(rows).sort_values(['rmse', 'total_s'], na_position='last').reset_index(drop=True)
+
+def write_table(table, file_path):
+    """Menyimpan tabel perbandingan ke CSV atau Excel sesuai ekstensi"""
+    if file_path.lower().endswith(('.xlsx', '.xls')):
+        table.to_excel(file_path, index=False)
+    else:
+        table.to_csv(file_path, index=False)
+
+def main(argv=None):
+    """Titik masuk baris perintah: python -m ftir.benchmark [folder] [opsi]"""
+    parser = argparse.ArgumentParser(description="Benchmark algoritma koreksi baseline FTIR")
+    parser.add_argument('source', nargs='?', help="folder atau pola glob spektrum nyata (default: korpus sintetis)")
+    parser.add_argument('--extension', default='.txt', help="ekstensi file spektrum (.txt, .smf, .jdx)")
+    parser.add_argument('--synthetic', type=int, default=50, help="jumlah spektrum sintetis")
+    parser.add_argument('--seed', type=int, default=0, help="seed korpus sintetis")
+    parser.add_argument('--algorithms', help="daftar nama algoritma dipisah koma (filter dari konfigurasi bawaan)")
+    parser.add_argument('--repeat', type=int, default=3, help="jumlah pengulangan pengukuran waktu")
+    parser.add_argument('--output', default='baseline_benchmark.csv', help="file tabel hasil (.csv/.xlsx)")
+    args = parser.parse_args(argv)
+
+    corpus = file_corpus(args.source, args.extension) if args.source else synthetic_corpus(args.synthetic, seed=args.seed)
+    algorithms = DEFAULT_ALGORITHMS
+    if args.algorithms:
+        selected = [name.strip() for name in args.algorithms.split(',')]
+        algorithms = [(name, params) for name, params in DEFAULT_ALGORITHMS if name in selected]
+        if not algorithms:
+            parser.error(f"Tidak ada algoritma yang cocok: {args.algorithms}")
+
+    table = run_benchmark(corpus, algorithms, repeat=args.repeat)
+    write_table(table, args.output)
+    print(table.to_string(index=False))
+    print(f"\nTabel disimpan ke: {args.output}")
+    return table
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,200 @@
+import numpy as np
+from scipy.signal import savgol_filter
+from ftir.compare import resample_series
+from ftir.processing import baseline_correction_batch
+
+NORMALIZATIONS = (None, 'snv', 'vector', 'area', 'minmax')
+
+def build_matrix(spectra, column='%T_corrected', grid=None, lam=1e3, p=0.01):
+    """
+    Menyusun matriks sampel x wavenumber dari banyak spektrum pada grid bersama.
+
+    Parameters:
+    - spectra: list/dict DataFrame atau hasil load_folder (lihat resample_series)
+    - column: str, kolom intensitas (default: hasil koreksi baseline)
+    - grid: np.ndarray, grid wavenumber (default: common_grid)
+    - lam, p: parameter AsLS bila hasil load_folder belum memiliki '%T_corrected'
+      (dikoreksi dulu dengan baseline_correction_batch)
+
+    Returns:
+    - X: np.ndarray (n_sampel x n_grid)
+    - grid: np.ndarray wavenumber
+    - names: list nama sampel
+    """
+    if (column == '%T_corrected' and isinstance(spectra, dict) and 'lengths' in spectra
+            and column not in spectra):
+        spectra = baseline_correction_batch(spectra, lam=lam, p=p)
+    # Resampling langsung: matriks selisih dan rasio compare_series tidak dibutuhkan
+    X, grid, names = resample_series(spectra, grid=grid, column=column)
+    if np.isnan(X).any():
+        # Titik di luar rentang salah satu spektrum dibuang agar PCA tidak terganggu NaN
+        keep = ~np.isnan(X).any(axis=0)
+        return X[:, keep], grid[keep], names
+    return X, grid, names
+
+def preprocess(X, normalize=None, derivative=0, window=15, polyorder=2, step=1.0):
+    """
+    Normalisasi dan/atau turunan Savitzky-Golay per baris spektrum.
+
+    Parameters:
+    - X: np.ndarray (n_sampel x n_titik)
+    - normalize: None, 'snv' (dikurangi rata-rata, dibagi simpangan baku), 'vector' (norma satu),
+      'area' (luas absolut satu) atau 'minmax' (rentang 0-1)
+    - derivative: int, orde turunan (0 = tanpa turunan)
+    - window, polyorder: int, parameter filter Savitzky-Golay
+    - step: float, jarak grid (untuk skala turunan)
+
+    Returns:
+    - X: np.ndarray baru hasil praproses
+    """
+    if normalize not in NORMALIZATIONS:
+        raise ValueError(f"Normalisasi tidak dikenal: {normalize}. "
+                         f"Pilih salah satu dari {', '.join(str(n) for n in NORMALIZATIONS)}.")
+    X = np.array(X, dtype=np.float64)
+    if derivative:
+        X = savgol_filter(X, window, polyorder, deriv=derivative, delta=step, axis=1)
+
+    if normalize == 'snv':
+        X -= X.mean(axis=1, keepdims=True)
+        scale = X.std(axis=1, keepdims=True)
+    elif normalize == 'vector':
+        scale = np.linalg.norm(X, axis=1, keepdims=True)
+    elif normalize == 'area':
+        scale = np.abs(X).sum(axis=1, keepdims=True)
+    elif normalize == 'minmax':
+        X -= X.min(axis=1, keepdims=True)
+        scale = X.max(axis=1, keepdims=True)
+    else:
+        return X
+    X /= np.where(scale > 0, scale, 1.0)
+    return X
+
+def _column_mean(X, chunk_size):
+    """Rata-rata kolom dihitung per blok baris"""
+    total = np.zeros(X.shape[1])
+    for start in range(0, len(X), chunk_size):
+        total += X[start:start + chunk_size].sum(axis=0)
+    return total / len(X)
+
+def _total_variance(X, mean, chunk_size):
+    """Jumlah varians kolom tanpa membentuk salinan matriks yang sudah dipusatkan"""
+    total = 0.0
+    for start in range(0, len(X), chunk_size):
+        block = X[start:start + chunk_size] - mean
+        total += np.einsum('ij,ij->', block, block)
+    return total / max(len(X) - 1, 1)
+
+def randomized_svd(X, n_components, mean=None, n_oversamples=10, n_iter=4, random_state=0):
+    """
+    SVD terpotong acak (Halko dkk.) untuk matriks yang dipusatkan secara implisit.
+
+    (X - mean) tidak pernah dibentuk: setiap perkalian memakai
+    (X - 1 mean^T) A = X A - 1 (mean^T A), sehingga memori tambahan hanya
+    sebesar n_sampel x (n_components + n_oversamples).
+
+    Returns:
+    - U: np.ndarray (n_sampel x n_components)
+    - S: np.ndarray (n_components,)
+    - Vt: np.ndarray (n_components x n_titik)
+    """
+    n_samples, n_features = X.shape
+    n_random = min(n_components + n_oversamples, n_samples, n_features)
+    mean = np.zeros(n_features) if mean is None else mean
+    rng = np.random.default_rng(random_state)
+
+    def matmul(A):
+        return X @ A - np.outer(np.ones(n_samples), mean @ A)
+
+    def rmatmul(B):
+        return X.T @ B - np.outer(mean, B.sum(axis=0))
+
+    Q = matmul(rng.standard_normal((n_features, n_random)))
+    # Iterasi pangkat dengan re-ortogonalisasi QR agar spektrum singular yang cepat meluruh tetap stabil
+    for _ in range(n_iter):
+        Q, _ = np.linalg.qr(Q)
+        Q, _ = np.linalg.qr(rmatmul(Q))
+        Q = matmul(Q)
+    Q, _ = np.linalg.qr(Q)
+
+    B = rmatmul(Q).T
+    U_small, S, Vt = np.linalg.svd(B, full_matrices=False)
+    U = Q @ U_small
+    return U[:, :n_components], S[:n_components], Vt[:n_components]
+
+def pca(X, n_components=5, center=True, n_oversamples=10, n_iter=4, random_state=0, chunk_size=4096):
+    """
+    PCA pada matriks sampel x wavenumber dengan SVD terpotong acak.
+
+    Matriks kovarians (n_titik x n_titik) tidak pernah dibentuk, sehingga cocok
+    untuk puluhan ribu spektrum pada satu CPU.
+
+    Parameters:
+    - X: np.ndarray (n_sampel x n_titik), mis. hasil build_matrix/preprocess
+    - n_components: int, jumlah komponen utama
+    - center: bool, pusatkan kolom (PCA standar)
+    - n_oversamples, n_iter, random_state: parameter SVD acak
+    - chunk_size: int, jumlah baris per blok saat menghitung rata-rata dan varians total
+
+    Returns:
+    - model: dict dengan kunci
+        'scores': np.ndarray (n_sampel x n_components)
+        'loadings': np.ndarray (n_components x n_titik)
+        'explained_variance': np.ndarray (n_components,)
+        'explained_variance_ratio': np.ndarray (n_components,)
+        'singular_values': np.ndarray (n_components,)
+        'mean': np.ndarray (n_titik,), rata-rata kolom yang dikurangkan
+    """
+    X = np.asarray(X, dtype=np.float64)
+    if X.ndim != 2 or min(X.shape) < 2:
+        raise ValueError("PCA membutuhkan matriks dengan minimal 2 sampel dan 2 titik")
+    n_components = min(n_components, *X.shape)
+    mean = _column_mean(X, chunk_size) if center else np.zeros(X.shape[1])
+
+    U, S, Vt = randomized_svd(X, n_components, mean, n_oversamples, n_iter, random_state)
+    # Tanda deterministik: elemen loading terbesar tiap komponen bernilai positif
+    signs = np.sign(Vt[np.arange(len(Vt)), np.abs(Vt).argmax(axis=1)])
+    signs[signs == 0] = 1.0
+    U *= signs
+    Vt *= signs[:, None]
+
+    explained_variance = S ** 2 / max(len(X) - 1, 1)
+    return {
+        'scores': U * S,
+        'loadings': Vt,
+        'explained_variance': explained_variance,
+        'explained_variance_ratio': explained_variance / _total_variance(X, mean, chunk_size),
+        'singular_values': S,
+        'mean': mean,
+    }
+
+def project(model, X):
+    """Memproyeksikan spektrum baru (praproses sama) ke ruang komponen utama model"""
+    return (np.atleast_2d(np.asarray(X, dtype=np.float64)) - model['mean']) @ model['loadings'].T
+
+def analyze_series(spectra, column='%T_corrected', n_components=5, normalize=None, derivative=0,
+                   window=15, polyorder=2, grid=None, **pca_options):
+    """
+    Alur lengkap kemometrik: matriks bersama, praproses, lalu PCA.
+
+    Parameters:
+    - spectra: list/dict DataFrame atau hasil load_folder
+    - column: str, kolom intensitas
+    - n_components: int, jumlah komponen utama
+    - normalize, derivative, window, polyorder: lihat preprocess
+    - grid: np.ndarray, grid wavenumber bersama (opsional)
+    - pca_options: argumen tambahan untuk pca
+
+    Returns:
+    - model: dict hasil pca ditambah 'grid', 'names' dan 'preprocessing'
+    """
+    X, grid, names = build_matrix(spectra, column=column, grid=grid)
+    step = float(np.median(np.diff(grid))) if len(grid) > 1 else 1.0
+    X = preprocess(X, normalize=normalize, derivative=derivative, window=window, polyorder=polyorder, step=step)
+    model = pca(X, n_components=n_components, **pca_options)
+    model.update({
+        'grid': grid,
+        'names': names,
+        'preprocessing': {'normalize': normalize, 'derivative': derivative,
+                          'window': window, 'polyorder': polyorder},
+    })
+    return model
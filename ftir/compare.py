@@ -0,0 +1,175 @@
+import os
+import numpy as np
+from collections import OrderedDict
+from ftir.processing import cache_put, data_hash
+
+# Label sumbu y tiap mode perbandingan; urutan kunci menjadi urutan pilihan mode
+COMPARE_LABELS = {
+    'overlay': '% Transmittance',
+    'difference': 'Selisih % Transmittance',
+    'ratio': 'Rasio Transmittance',
+}
+COMPARE_MODES = tuple(COMPARE_LABELS)
+
+# Cache bobot interpolasi linier per (hash grid sumber, hash grid tujuan)
+_WEIGHT_CACHE = OrderedDict()
+
+def common_grid(xs, step=None):
+    """
+    Membuat grid wavenumber bersama untuk sekumpulan spektrum.
+
+    Rentang grid adalah irisan rentang semua spektrum (tanpa ekstrapolasi);
+    langkah default mengikuti resolusi spektrum yang paling kasar.
+    """
+    xs = [np.asarray(x, dtype=np.float64) for x in xs]
+    low = max(np.nanmin(x) for x in xs)
+    high = min(np.nanmax(x) for x in xs)
+    if low >= high:
+        raise ValueError("Rentang wavenumber spektrum tidak saling beririsan")
+    if step is None:
+        step = max(np.median(np.abs(np.diff(np.sort(x[np.isfinite(x)])))) for x in xs)
+    n_points = int(np.floor((high - low) / step + 1e-9)) + 1
+    return np.minimum(low + step * np.arange(n_points), high)
+
+def interpolation_weights(x, grid):
+    """
+    Menghitung (dan meng-cache) bobot interpolasi linier dari grid sumber ke grid tujuan.
+
+    Returns:
+    - weights: dict {'order': urutan x naik, 'lower': indeks titik kiri,
+      'weight': bobot titik kanan, 'valid': mask titik grid di dalam rentang x}
+    """
+    x = np.asarray(x, dtype=np.float64)
+    grid = np.asarray(grid, dtype=np.float64)
+    key = (data_hash(x), data_hash(grid))
+    cached = _WEIGHT_CACHE.get(key)
+    if cached is not None:
+        _WEIGHT_CACHE.move_to_end(key)
+        return cached
+
+    # Urutkan seperti np.interp/pybaselines (x ekspor instrumen tidak selalu monoton)
+    order = np.argsort(x, kind='mergesort')
+    x_sorted = x[order]
+    lower = np.clip(np.searchsorted(x_sorted, grid, side='right') - 1, 0, len(x) - 2)
+    span = x_sorted[lower + 1] - x_sorted[lower]
+    weight = np.divide(grid - x_sorted[lower], span, out=np.zeros_like(grid), where=span > 0)
+    weights = {
+        'order': order,
+        'lower': lower,
+        'weight': np.clip(weight, 0.0, 1.0),
+        'valid': (grid >= x_sorted[0]) & (grid <= x_sorted[-1]),
+    }
+    for value in weights.values():
+        value.setflags(write=False)
+    cache_put(_WEIGHT_CACHE, key, weights)
+    return weights
+
+def resample(x, Y, grid):
+    """
+    Resampling satu atau banyak spektrum berbagi sumbu x ke grid (vektorisasi, tanpa loop).
+
+    Titik grid di luar rentang x bernilai NaN.
+    """
+    weights = interpolation_weights(x, grid)
+    Y = np.atleast_2d(np.asarray(Y, dtype=np.float64))[:, weights['order']]
+    lower, weight = weights['lower'], weights['weight']
+    resampled = Y[:, lower] * (1.0 - weight) + Y[:, lower + 1] * weight
+    resampled[:, ~weights['valid']] = np.nan
+    return resampled
+
+def _as_spectra(spectra, column):
+    """Menyeragamkan input menjadi list (nama, x, y)"""
+    if isinstance(spectra, dict) and 'wavenumber' in spectra and 'lengths' in spectra:
+        # Hasil load_folder: baris berisi NaN di bagian akhir
+        if column not in spectra:
+            raise ValueError(f"Kolom '{column}' tidak ada pada batch spektrum")
+        return [(name, spectra['wavenumber'][i, :n], spectra[column][i, :n])
+                for i, (name, n) in enumerate(zip(spectra['names'], spectra['lengths']))]
+    if isinstance(spectra, dict):
+        items = list(spectra.items())
+    else:
+        # Nama diambil dari metadata file (TITLE/FILE) bila ada
+        items = []
+        for i, data in enumerate(spectra):
+            metadata = data.attrs.get('metadata', {})
+            name = metadata.get('TITLE') or os.path.splitext(metadata.get('FILE', ''))[0] or f"Spektrum {i + 1}"
+            items.append((name, data))
+    result = []
+    for name, data in items:
+        if column not in data.columns:
+            raise ValueError(f"Kolom '{column}' tidak ada pada spektrum {name}")
+        result.append((name, data['wavenumber'].to_numpy(), data[column].to_numpy()))
+    return result
+
+def resample_series(spectra, grid=None, column='%T'):
+    """
+    Resampling banyak spektrum ke grid bersama, tanpa selisih/rasio.
+
+    Spektrum dengan grid sumber yang sama di-resample bersama dalam satu operasi
+    dan bobot interpolasinya diambil dari cache.
+
+    Parameters:
+    - spectra: list/dict DataFrame (kolom 'wavenumber' dan 'column') atau hasil load_folder
+    - grid: np.ndarray, grid tujuan (default: common_grid)
+    - column: str, kolom intensitas (mis. '%T' atau '%T_corrected')
+
+    Returns:
+    - matrix: np.ndarray (n_spektrum x n_grid), NaN di luar rentang spektrum
+    - grid: np.ndarray (n_grid,)
+    - names: list nama spektrum
+    """
+    items = _as_spectra(spectra, column)
+    if not items:
+        raise ValueError("Tidak ada spektrum untuk dibandingkan")
+    names = [name for name, _, _ in items]
+    grid = common_grid([x for _, x, _ in items]) if grid is None else np.asarray(grid, dtype=np.float64)
+
+    # Kelompokkan spektrum per grid sumber agar satu gather melayani semuanya
+    groups = {}
+    for i, (_, x, _) in enumerate(items):
+        groups.setdefault(data_hash(x), []).append(i)
+    matrix = np.empty((len(items), len(grid)))
+    for members in groups.values():
+        x = items[members[0]][1]
+        matrix[members] = resample(x, np.vstack([items[i][2] for i in members]), grid)
+    return matrix, grid, names
+
+def compare_series(spectra, reference=0, grid=None, column='%T'):
+    """
+    Membandingkan banyak spektrum sekaligus pada grid wavenumber bersama.
+
+    Resampling dilakukan oleh resample_series.
+
+    Parameters:
+    - spectra: list/dict DataFrame (kolom 'wavenumber' dan 'column') atau hasil load_folder
+    - reference: int atau str, indeks/nama spektrum acuan untuk selisih dan rasio
+    - grid: np.ndarray, grid tujuan (default: common_grid)
+    - column: str, kolom intensitas (mis. '%T' atau '%T_corrected')
+
+    Returns:
+    - comparison: dict dengan kunci
+        'grid': np.ndarray (n_grid,)
+        'names': list nama spektrum
+        'spectra': np.ndarray (n_spektrum x n_grid), overlay
+        'difference': spectra - acuan
+        'ratio': spectra / acuan (NaN jika acuan nol)
+        'reference': int, indeks acuan
+    """
+    matrix, grid, names = resample_series(spectra, grid=grid, column=column)
+    if not isinstance(reference, (int, np.integer)):
+        if reference not in names:
+            raise ValueError(f"Spektrum acuan tidak ditemukan: {reference}")
+        reference = names.index(reference)
+
+    reference_row = matrix[reference]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = matrix / reference_row
+    ratio[:, reference_row == 0] = np.nan
+    return {
+        'grid': grid,
+        'names': names,
+        'spectra': matrix,
+        'difference': matrix - reference_row,
+        'ratio': ratio,
+        'reference': reference,
+    }
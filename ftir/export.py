@@ -0,0 +1,230 @@
+import os
+import numpy as np
+import pandas as pd
+from ftir.analysis import PEAK_DTYPE
+from ftir.qc import screen_spectrum
+
+EXPORT_FORMATS = {
+    '.parquet': 'parquet',
+    '.feather': 'feather',
+    '.arrow': 'feather',
+    '.h5': 'hdf5',
+    '.hdf5': 'hdf5',
+}
+
+def _require(module_name, package_name):
+    """Impor dependensi opsional dengan pesan yang jelas jika belum terpasang"""
+    try:
+        return __import__(module_name, fromlist=['_'])
+    except ImportError as e:
+        raise ImportError(f"Ekspor format ini membutuhkan paket '{package_name}'. "
+                          f"Pasang dengan: pip install {package_name}") from e
+
+def peak_table(sample):
+    """
+    Menyusun tabel puncak satu sampel sebagai DataFrame.
+
+    'peaks' boleh berupa array indeks (hasil identify_peaks) atau array terstruktur
+    hasil characterize_peaks; 'functional_groups' (opsional) mengisi kolom 'group'.
+    Kolom selalu sama (field PEAK_DTYPE + 'group') agar semua sampel berbagi satu skema;
+    karakteristik yang tidak tersedia diisi NaN.
+    """
+    data = sample['data']
+    peaks = sample.get('peaks')
+    if peaks is None:
+        peaks = np.zeros(0, dtype=PEAK_DTYPE)
+    elif getattr(peaks, 'dtype', None) is None or not peaks.dtype.names:
+        indices = np.asarray(peaks, dtype=np.int64)
+        table = np.zeros(len(indices), dtype=PEAK_DTYPE)
+        for name in ('height', 'prominence', 'fwhm', 'area'):
+            table[name] = np.nan
+        table['index'] = indices
+        table['wavenumber'] = data['wavenumber'].to_numpy()[indices]
+        peaks = table
+    table = pd.DataFrame(peaks)
+
+    dominant = {}
+    for fg in sample.get('functional_groups') or []:
+        dominant.setdefault(int(fg['wavenumber']), fg['group'])
+    table['group'] = [dominant.get(int(w), "") for w in table['wavenumber']]
+    table.insert(0, 'sample', sample['name'])
+    return table
+
+def _spectrum_table(sample):
+    """
+    Kolom numerik spektrum satu sampel dalam format panjang (satu baris per titik).
+
+    Kolom '%T' (data mentah) dan 'baseline' (baseline AsLS) selalu ada agar hasil
+    koreksi dapat direproduksi dari file ekspor; baseline diambil dari 'baseline'
+    sampel bila diberikan, jika tidak dari kolom '%T_corrected', dan NaN bila keduanya
+    tidak tersedia.
+    """
+    data = sample['data']
+    table = data.select_dtypes(include='number').reset_index(drop=True)
+    if '%T' not in table:
+        table['%T'] = np.nan
+    baseline = sample.get('baseline')
+    if baseline is None:
+        baseline = table['%T_corrected'].to_numpy() if '%T_corrected' in table else np.nan
+    table['baseline'] = baseline
+    is_peak = np.zeros(len(table), dtype=bool)
+    peaks = sample.get('peaks')
+    if peaks is not None:
+        indices = peaks['index'] if getattr(peaks, 'dtype', None) is not None and peaks.dtype.names else peaks
+        is_peak[np.asarray(indices, dtype=np.int64)] = True
+    table['Peak'] = is_peak
+    table.insert(0, 'sample', sample['name'])
+    return table
+
+def _peak_schema(pa):
+    """Skema Arrow tetap untuk tabel puncak: 'sample', field PEAK_DTYPE, 'group'"""
+    fields = [pa.field('sample', pa.string())]
+    fields += [pa.field(name, pa.from_numpy_dtype(PEAK_DTYPE[name])) for name in PEAK_DTYPE.names]
+    fields.append(pa.field('group', pa.string()))
+    return pa.schema(fields)
+
+class _ArrowSink:
+    """
+    Penulis Parquet/Feather yang menambahkan satu row group/record batch per sampel.
+
+    Bila schema tidak diberikan, skema diambil dari sampel pertama.
+    """
+
+    def __init__(self, file_path, fmt, compression, schema=None):
+        self.pa = _require('pyarrow', 'pyarrow')
+        self.file_path = file_path
+        self.fmt = fmt
+        self.compression = compression
+        self.writer = None
+        self.schema = schema
+
+    def write(self, table):
+        if self.schema is not None:
+            # Samakan kolom dengan skema (kolom yang hilang diisi NaN)
+            table = table.reindex(columns=self.schema.names)
+        batch = self.pa.Table.from_pandas(table, schema=self.schema, preserve_index=False)
+        if self.writer is None:
+            self.schema = batch.schema
+            if self.fmt == 'parquet':
+                pq = _require('pyarrow.parquet', 'pyarrow')
+                self.writer = pq.ParquetWriter(self.file_path, self.schema, compression=self.compression)
+            else:
+                ipc = _require('pyarrow.ipc', 'pyarrow')
+                options = ipc.IpcWriteOptions(compression=self.compression)
+                self.writer = ipc.new_file(self.file_path, self.schema, options=options)
+        self.writer.write_table(batch.cast(self.schema))
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+def _write_hdf5_sample(h5py, h5file, sample, spectra, peaks, compression):
+    """Tulis satu sampel sebagai grup HDF5 dengan dataset terkompresi dan ber-chunk"""
+    group = h5file.require_group(sample['name'])
+    for column in spectra.columns:
+        if column == 'sample':
+            continue
+        values = spectra[column].to_numpy()
+        if column in group:
+            del group[column]
+        group.create_dataset(column, data=values, compression=compression, chunks=True)
+    records = peaks.drop(columns=['sample']).to_records(index=False)
+    records = records.astype([(name, h5py.string_dtype() if name == 'group' else records.dtype[name])
+                              for name in records.dtype.names])
+    if 'peaks' in group:
+        del group['peaks']
+    group.create_dataset('peaks', data=records, compression=compression if len(records) else None,
+                         chunks=True if len(records) else None)
+    group.attrs['metadata'] = repr(sample['data'].attrs.get('metadata', {}))
+
+def _screened(samples, screen):
+    """Menyaring sampel dengan QC (lajur 'reject' dilewati) tanpa memuat seluruh batch"""
+    for sample in samples:
+        if screen:
+            # Lajur QC yang sudah dihitung pemanggil dipakai ulang
+            lane = sample.get('qc') or screen_spectrum(sample['data'])[0]
+            if lane == 'reject':
+                continue
+            sample = {**sample, 'qc': lane}
+        yield sample
+
+def export_batch(samples, file_path, fmt=None, compression=None, summary_path=None, screen=True):
+    """
+    Ekspor spektrum terkoreksi dan tabel puncak banyak sampel secara streaming.
+
+    Sampel diproses satu per satu (boleh berupa generator), sehingga memori tetap
+    datar walaupun batch sangat besar. Dengan screen=True tiap sampel disaring QC
+    (ftir.qc.screen_spectrum) dan sampel yang ditolak tidak diekspor.
+
+    Parameters:
+    - samples: iterable dict {'name', 'data' (DataFrame), 'peaks' (opsional),
+      'functional_groups' (opsional), 'baseline' (opsional, default '%T_corrected'),
+      'qc' (opsional, lajur QC yang sudah dihitung; tidak dihitung ulang)}
+    - file_path: str, file tujuan (.parquet, .feather/.arrow, .h5/.hdf5)
+    - fmt: 'parquet', 'feather' atau 'hdf5' (default: ditentukan dari ekstensi)
+    - compression: str, kodek kompresi (default: 'zstd' untuk Arrow, 'gzip' untuk HDF5)
+    - summary_path: str, opsional; file Excel berisi ringkasan satu baris per sampel
+    - screen: bool, lewati sampel yang ditolak QC
+
+    Tabel spektrum selalu memuat '%T' mentah dan 'baseline' (lihat _spectrum_table).
+    Untuk Parquet/Feather, tabel puncak ditulis ke file pendamping '<nama>_peaks<ekstensi>';
+    untuk HDF5 semuanya berada dalam satu file dengan satu grup per sampel.
+
+    Returns:
+    - summary: DataFrame ringkasan per sampel
+    """
+    stem, extension = os.path.splitext(file_path)
+    fmt = fmt or EXPORT_FORMATS.get(extension.lower())
+    if fmt not in ('parquet', 'feather', 'hdf5'):
+        raise ValueError(f"Format ekspor tidak dikenal untuk file: {file_path}")
+
+    samples = _screened(samples, screen)
+    summary = []
+    if fmt == 'hdf5':
+        h5py = _require('h5py', 'h5py')
+        compression = compression or 'gzip'
+        with h5py.File(file_path, 'w') as h5file:
+            for sample in samples:
+                spectra, peaks = _spectrum_table(sample), peak_table(sample)
+                _write_hdf5_sample(h5py, h5file, sample, spectra, peaks, compression)
+                summary.append(_summary_row(sample, peaks))
+    else:
+        compression = compression or 'zstd'
+        spectra_sink = _ArrowSink(file_path, fmt, compression)
+        # Skema puncak tetap: sampel tanpa puncak tidak boleh menentukan tipe kolom 'group'
+        peaks_sink = _ArrowSink(f"{stem}_peaks{extension}", fmt, compression,
+                                schema=_peak_schema(spectra_sink.pa))
+        try:
+            for sample in samples:
+                peaks = peak_table(sample)
+                spectra_sink.write(_spectrum_table(sample))
+                peaks_sink.write(peaks)
+                summary.append(_summary_row(sample, peaks))
+        finally:
+            spectra_sink.close()
+            peaks_sink.close()
+
+    summary = pd.DataFrame(summary)
+    if summary_path:
+        export_summary_excel(summary, summary_path)
+    return summary
+
+def _summary_row(sample, peaks):
+    """Ringkasan kecil satu sampel untuk laporan Excel"""
+    wavenumber = sample['data']['wavenumber']
+    row = {
+        'sample': sample['name'],
+        'n_points': len(wavenumber),
+        'wavenumber_min': float(wavenumber.min()),
+        'wavenumber_max': float(wavenumber.max()),
+        'n_peaks': len(peaks),
+        'peaks': ", ".join(str(int(w)) for w in peaks['wavenumber']),
+    }
+    if 'qc' in sample:
+        row['qc'] = sample['qc']
+    row['groups'] = ", ".join(f"{int(w)}: {g}" for w, g in zip(peaks['wavenumber'], peaks['group']) if g)
+    return row
+
+def export_summary_excel(summary, file_path):
+    """Ekspor ringkasan per sampel (bukan data spektrum lengkap) ke Excel"""
+    summary.to_excel(file_path, index=False)
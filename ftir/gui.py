@@ -1,11 +1,28 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import tkinter as tk
 from tkinter import filedialog, messagebox, ttk
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
-from ftir.processing import load_data, baseline_correction
-from ftir.analysis import identify_peaks
-from ftir.plotting import plot_spectrum, plot_raw_data
-from ftir.utils import export_to_excel, export_plot, identify_functional_groups
+from ftir.processing import load_data, baseline_correction, auto_baseline_correction
+from ftir.analysis import PEAK_METHODS, identify_peaks
+from ftir.plotting import (plot_raw_data, draw_spectrum_artists, update_spectrum_artists, plot_comparison,
+                           add_peak_artist, remove_peak_artist)
+from ftir.compare import COMPARE_MODES, compare_series
+from ftir.export import export_batch
+from ftir.jcamp import export_jcamp
+from ftir.report import generate_report
+from ftir.streaming import SimulatedInstrument, StreamReceiver, IncrementalBaseline, synthetic_template
+from ftir.history import AnalysisHistory
+from ftir.interaction import PeakHitIndex, snap_to_minimum
+from ftir.qc import screen_spectrum
+from ftir.utils import (export_to_excel, export_plot, identify_functional_groups, assign_functional_groups,
+                        load_band_library)
+
+DOUBLE_CLICK_DELAY = 300  # ms; klik tunggal di area kosong ditunda selama ini untuk menunggu klik ganda
+BACKGROUND_POLL = 100  # ms; selang pemeriksaan tugas ekspor/laporan di thread pekerja
 
 class FtirWindow:
     def __init__(self, master):
@@ -20,7 +37,22 @@ class FtirWindow:
         self.file_menu = tk.Menu(self.menu_bar, tearoff=0)
         self.menu_bar.add_cascade(label="File", menu=self.file_menu)
         self.file_menu.add_command(label="Ekspor Data ke Excel", command=self.export_data)
+        self.file_menu.add_command(label="Ekspor Data (Parquet/Feather/HDF5)", command=self.export_columnar)
+        self.file_menu.add_command(label="Ekspor JCAMP-DX", command=self.export_jcamp)
         self.file_menu.add_command(label="Ekspor Plot", command=self.export_plot)
+        self.file_menu.add_command(label="Laporan PDF Folder", command=self.export_report)
+        self.file_menu.add_separator()
+        self.file_menu.add_command(label="Muat Pustaka Gugus", command=self.load_band_library)
+        
+        # Menu Riwayat untuk undo/redo dan cabang analisis
+        self.history_menu = tk.Menu(self.menu_bar, tearoff=0)
+        self.menu_bar.add_cascade(label="Riwayat", menu=self.history_menu)
+        self.history_menu.add_command(label="Undo", accelerator="Ctrl+Z", command=self.undo)
+        self.history_menu.add_command(label="Redo", accelerator="Ctrl+Y", command=self.redo)
+        self.history_menu.add_separator()
+        self.history_menu.add_command(label="Tampilkan Riwayat", command=self.show_history)
+        master.bind("<Control-z>", lambda event: self.undo())
+        master.bind("<Control-y>", lambda event: self.redo())
         
         # Frame utama untuk membagi tata letak (kiri: kontrol, kanan: plot)
         self.main_frame = tk.Frame(master)
@@ -60,6 +92,38 @@ class FtirWindow:
         self.plot_button = tk.Button(self.button_frame, text="Plot Spektrum Dikoreksi", command=self.plot_spectrum)
         self.plot_button.grid(row=2, column=0, padx=10, pady=5)
         
+        # Perbandingan banyak spektrum pada grid bersama
+        self.compare_button = tk.Button(self.button_frame, text="Bandingkan Spektrum", command=self.compare_spectra)
+        self.compare_button.grid(row=3, column=0, padx=10, pady=5)
+        self.compare_mode = tk.StringVar(value="overlay")
+        self.compare_mode_box = ttk.Combobox(self.button_frame, textvariable=self.compare_mode, values=COMPARE_MODES,
+                                             state="readonly", width=12)
+        self.compare_mode_box.grid(row=3, column=1, padx=10, pady=5)
+        self.compare_mode_box.bind("<<ComboboxSelected>>", lambda event: self.plot_comparison())
+        
+        # Metode deteksi puncak (minimum lokal, turunan kedua, FSD)
+        self.peak_method = tk.StringVar(value="minima")
+        self.peak_method_box = ttk.Combobox(self.button_frame, textvariable=self.peak_method, values=PEAK_METHODS,
+                                            state="readonly", width=12)
+        self.peak_method_box.grid(row=3, column=2, padx=10, pady=5)
+        
+        # Akuisisi streaming dari instrumen simulasi
+        self.stream_button = tk.Button(self.button_frame, text="Mode Streaming", command=self.open_stream)
+        self.stream_button.grid(row=4, column=0, padx=10, pady=5)
+        
+        # Parameter koreksi baseline AsLS
+        self.baseline_param_frame = tk.Frame(self.button_frame)
+        self.baseline_param_frame.grid(row=2, column=1, columnspan=2, padx=10, pady=5, sticky=tk.W)
+        tk.Label(self.baseline_param_frame, text="lam:").pack(side=tk.LEFT)
+        self.lam_entry = tk.Entry(self.baseline_param_frame, width=8)
+        self.lam_entry.insert(0, "1e3")
+        self.lam_entry.pack(side=tk.LEFT, padx=5)
+        tk.Label(self.baseline_param_frame, text="p:").pack(side=tk.LEFT)
+        self.p_entry = tk.Entry(self.baseline_param_frame, width=8)
+        self.p_entry.insert(0, "0.01")
+        self.p_entry.pack(side=tk.LEFT, padx=5)
+        tk.Button(self.baseline_param_frame, text="Auto", command=self.auto_baseline_correction).pack(side=tk.LEFT, padx=5)
+        
         # Frame untuk kontrol tampilan grafik
         self.control_frame = tk.Frame(self.left_frame)
         self.control_frame.pack(fill=tk.X, pady=5)
@@ -76,6 +140,11 @@ class FtirWindow:
         tk.Checkbutton(self.control_frame, text="Tampilkan Gugus", variable=self.show_groups,
                        command=self.update_plot).pack(side=tk.LEFT, padx=5)
         
+        # Edit puncak langsung di plot: klik kiri = tambah, klik kanan = hapus,
+        # klik ganda pada puncak/label = ubah gugus (mode manual)
+        self.edit_peaks = tk.BooleanVar(value=False)
+        tk.Checkbutton(self.control_frame, text="Edit Puncak di Plot", variable=self.edit_peaks).pack(side=tk.LEFT, padx=5)
+        
         # Frame untuk mode identifikasi gugus
         self.mode_frame = tk.Frame(self.left_frame)
         self.mode_frame.pack(fill=tk.X, pady=5)
@@ -83,9 +152,9 @@ class FtirWindow:
         tk.Label(self.mode_frame, text="Mode Identifikasi Gugus:").pack(side=tk.LEFT, padx=5)
         self.mode = tk.StringVar(value="auto")  # Default: otomatis
         tk.Radiobutton(self.mode_frame, text="Otomatis", variable=self.mode, value="auto",
-                       command=self.update_table).pack(side=tk.LEFT, padx=5)
+                       command=self.change_mode).pack(side=tk.LEFT, padx=5)
         tk.Radiobutton(self.mode_frame, text="Manual", variable=self.mode, value="manual",
-                       command=self.update_table).pack(side=tk.LEFT, padx=5)
+                       command=self.change_mode).pack(side=tk.LEFT, padx=5)
         
         # Frame untuk tabel puncak
         self.table_frame = tk.Frame(self.left_frame)
@@ -122,6 +191,7 @@ class FtirWindow:
         self.toolbar = NavigationToolbar2Tk(self.canvas, self.plot_frame)
         self.toolbar.update()
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        self.canvas.mpl_connect("button_press_event", self.on_canvas_click)
         
         # Variabel untuk menyimpan data
         self.data = None
@@ -129,16 +199,65 @@ class FtirWindow:
         self.peaks = None
         self.functional_groups = None
         self.peak_table_data = []  # Simpan data puncak untuk tabel
+        self.auto_groups = []  # Gugus dominan hasil identifikasi otomatis per puncak
+        self.spectrum_artists = None  # Artist spektrum yang sedang tampil (dipakai ulang saat toggle)
+        self.spectrum_source = None  # Pasangan (corrected_data, peaks) asal artist
+        self.hit_index = None  # KD-tree posisi puncak/label untuk klik di plot
+        self.pending_add = None  # Job after() penambahan puncak dari klik tunggal
+        # Ekspor dan laporan berjalan di luar thread Tk (satu per satu) agar jendela tetap responsif
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.band_index = None  # Pustaka pita eksternal (None: tabel bawaan)
+        self.comparison = None  # Hasil compare_series terakhir
+        # Riwayat analisis copy-on-write; nilai yang sudah dicatat tidak diubah in-place
+        self.history = AnalysisHistory(peak_table_data=[], auto_groups=[], mode=self.mode.get())
+        self.history_window = None
         
     def load_data(self):
-        """Memuat data FTIR dari file .txt"""
-        file_path = filedialog.askopenfilename(filetypes=[("File Teks", "*.txt")])
+        """Memuat data FTIR dari file .txt, .smf atau JCAMP-DX"""
+        file_path = filedialog.askopenfilename(filetypes=[("File Spektrum", "*.txt *.smf *.jdx *.dx"),
+                                                          ("File Teks", "*.txt"), ("File SMF", "*.smf"),
+                                                          ("File JCAMP-DX", "*.jdx *.dx")])
         if file_path:
-            self.data = load_data(file_path)
-            messagebox.showinfo("Info", "Data dimuat dengan sukses")
+            # Data baru memulai analisis baru: hasil turunan dari data lama dikosongkan
+            data = load_data(file_path)
+            self.record("load", os.path.basename(file_path), data=data, corrected_data=None,
+                        peaks=None, functional_groups=None, peak_table_data=[], auto_groups=[])
+            # QC awal sebelum koreksi baseline dan analisis puncak
+            lane, reasons = screen_spectrum(data)
+            if lane == "pass":
+                messagebox.showinfo("Info", "Data dimuat dengan sukses")
+            elif lane == "warn":
+                messagebox.showwarning("Peringatan", f"Data dimuat, tetapi QC memberi peringatan: {reasons}")
+            else:
+                messagebox.showwarning("Peringatan", f"Data dimuat, tetapi QC menolak spektrum ini: {reasons}")
         else:
             messagebox.showwarning("Peringatan", "Tidak ada file yang dipilih")
         
+    def open_stream(self):
+        """Membuka jendela akuisisi streaming; templat instrumen simulasi dari data yang dimuat"""
+        try:
+            if self.data is not None:
+                x, y = self.data['wavenumber'].to_numpy(), self.data['%T'].to_numpy()
+            else:
+                x, y = synthetic_template()
+            StreamWindow(tk.Toplevel(self.master), x, y, lam=float(self.lam_entry.get()), p=float(self.p_entry.get()))
+        except Exception as e:
+            messagebox.showerror("Error", f"Terjadi kesalahan saat memulai streaming: {str(e)}")
+        
+    def load_band_library(self):
+        """Memuat pustaka pita referensi eksternal untuk identifikasi gugus"""
+        file_path = filedialog.askopenfilename(filetypes=[("File CSV", "*.csv"), ("File Teks", "*.txt *.tsv"),
+                                                          ("File Excel", "*.xlsx")])
+        if not file_path:
+            return
+        try:
+            self.band_index = load_band_library(file_path)
+            messagebox.showinfo("Info", f"{len(self.band_index['low'])} pita referensi dimuat")
+            if self.peaks is not None:
+                self.identify_peaks()
+        except Exception as e:
+            messagebox.showerror("Error", f"Terjadi kesalahan saat memuat pustaka gugus: {str(e)}")
+        
     def plot_raw(self):
         """Memplot data FTIR mentah menggunakan transmitansi"""
         if self.data is None:
@@ -147,45 +266,103 @@ class FtirWindow:
         try:
             plot_name = self.plot_name_entry.get() or "Spektrum FTIR Mentah"
             plot_raw_data(self.ax, self.data, plot_name)
+            self.spectrum_artists = None
             self.canvas.draw()
         except Exception as e:
             messagebox.showerror("Error", f"Terjadi kesalahan saat plotting data mentah: {str(e)}")
         
+    def compare_spectra(self):
+        """Memuat beberapa file lalu membandingkannya pada grid wavenumber bersama"""
+        file_paths = filedialog.askopenfilenames(filetypes=[("File Spektrum", "*.txt *.smf *.jdx *.dx")])
+        if not file_paths:
+            messagebox.showwarning("Peringatan", "Tidak ada file yang dipilih")
+            return
+        try:
+            self.comparison = compare_series([load_data(path) for path in file_paths])
+            self.plot_comparison()
+        except Exception as e:
+            messagebox.showerror("Error", f"Terjadi kesalahan saat membandingkan spektrum: {str(e)}")
+    
+    def plot_comparison(self):
+        """Memplot perbandingan spektrum sesuai mode (overlay, selisih, rasio)"""
+        if self.comparison is None:
+            return
+        plot_comparison(self.ax, self.comparison, mode=self.compare_mode.get(),
+                        plot_name=self.plot_name_entry.get() or None)
+        self.spectrum_artists = None
+        self.canvas.draw_idle()
+        
+    def confirm_qc(self):
+        """QC sebelum koreksi baseline: spektrum yang ditolak hanya diproses bila dikonfirmasi"""
+        lane, reasons = screen_spectrum(self.data)
+        if lane == "warn":
+            messagebox.showwarning("Peringatan", f"QC memberi peringatan untuk spektrum ini: {reasons}")
+        elif lane == "reject":
+            return messagebox.askyesno("Peringatan", f"QC menolak spektrum ini: {reasons}\n"
+                                                     "Tetap lakukan koreksi baseline?")
+        return True
+
     def baseline_correction(self):
         """Menerapkan koreksi baseline"""
         if self.data is None:
             messagebox.showwarning("Peringatan", "Silakan muat data terlebih dahulu")
             return
+        if not self.confirm_qc():
+            return
         try:
-            self.corrected_data = baseline_correction(self.data)
+            lam = float(self.lam_entry.get())
+            p = float(self.p_entry.get())
+            self.record("baseline", f"lam={lam:g}, p={p:g}",
+                        corrected_data=baseline_correction(self.data, lam=lam, p=p))
             messagebox.showinfo("Info", "Koreksi baseline diterapkan")
         except Exception as e:
             messagebox.showerror("Error", f"Terjadi kesalahan saat koreksi baseline: {str(e)}")
         
+    def auto_baseline_correction(self):
+        """Mencari lam dan p secara otomatis lalu menerapkan koreksi baseline"""
+        if self.data is None:
+            messagebox.showwarning("Peringatan", "Silakan muat data terlebih dahulu")
+            return
+        if not self.confirm_qc():
+            return
+        try:
+            corrected_data, result = auto_baseline_correction(self.data)
+            self.record("baseline", f"auto: lam={result['lam']:.3g}, p={result['p']:.3g}",
+                        corrected_data=corrected_data)
+            self.lam_entry.delete(0, tk.END)
+            self.lam_entry.insert(0, f"{result['lam']:.3g}")
+            self.p_entry.delete(0, tk.END)
+            self.p_entry.insert(0, f"{result['p']:.3g}")
+            messagebox.showinfo("Info", f"Koreksi baseline diterapkan (lam={result['lam']:.3g}, p={result['p']:.3g})")
+        except Exception as e:
+            messagebox.showerror("Error", f"Terjadi kesalahan saat tuning baseline: {str(e)}")
+        
     def identify_peaks(self):
         """Mengidentifikasi puncak pada data yang dikoreksi"""
         if self.corrected_data is None:
             messagebox.showwarning("Peringatan", "Silakan lakukan koreksi baseline terlebih dahulu")
             return
         try:
-            self.peaks = identify_peaks(self.corrected_data)
-            self.functional_groups = identify_functional_groups(self.corrected_data, self.peaks)
+            method = self.peak_method.get()
+            peaks = identify_peaks(self.corrected_data, method=method)
+            candidates = identify_functional_groups(self.corrected_data, peaks, self.band_index)
             
-            # Simpan data puncak untuk tabel
-            self.peak_table_data = []
-            for wavenumber, peak in [(self.corrected_data['wavenumber'].iloc[p], p) for p in self.peaks]:
-                groups = [fg['group'] for fg in self.functional_groups if fg['wavenumber'] == wavenumber]
-                dominant_group = groups[0] if groups else "Tidak Diketahui"
-                self.peak_table_data.append({"wavenumber": int(wavenumber), "group": dominant_group})
+            # Gugus dominan = kandidat pertama untuk tiap wavenumber
+            dominant_groups = {}
+            for fg in candidates:
+                dominant_groups.setdefault(fg['wavenumber'], fg['group'])
             
-            # Perbarui functional_groups agar sesuai dengan peak_table_data
-            self.functional_groups = [
-                {"wavenumber": entry["wavenumber"], "group": entry["group"]}
-                for entry in self.peak_table_data
-            ]
+            # Simpan data puncak untuk tabel
+            peak_table_data = []
+            for wavenumber in self.corrected_data['wavenumber'].to_numpy()[peaks]:
+                dominant_group = dominant_groups.get(wavenumber, "Tidak Diketahui")
+                peak_table_data.append({"wavenumber": int(wavenumber), "group": dominant_group})
             
-            # Buat checkbox untuk setiap gugus fungsional
-            self.create_group_checkboxes()
+            # Hasil otomatis disimpan agar pergantian mode tidak menghitung ulang;
+            # functional_groups berbagi entri (read-only) dengan peak_table_data
+            self.record("peaks", method, peaks=peaks, peak_table_data=peak_table_data,
+                        functional_groups=list(peak_table_data),
+                        auto_groups=[entry["group"] for entry in peak_table_data])
             
             self.update_table()
             messagebox.showinfo("Info", f"{len(self.peaks)} puncak diidentifikasi")
@@ -201,7 +378,8 @@ class FtirWindow:
         
         tk.Label(self.group_check_frame, text="Pilih Gugus untuk Ditampilkan:").pack(anchor=tk.W)
         
-        # Reset dictionary status centang
+        # Status centang yang sudah ada dipertahankan (mis. setelah edit satu puncak)
+        previous = {key: var.get() for key, var in self.group_check_vars.items()}
         self.group_check_vars = {}
         
         # Buat checkbox untuk setiap wavenumber dan gugus
@@ -210,7 +388,7 @@ class FtirWindow:
             group = entry["group"]
             key = f"{wavenumber}_{group}"
             # Centang secara default hanya jika wavenumber > 1500
-            self.group_check_vars[key] = tk.BooleanVar(value=(wavenumber > 1500))
+            self.group_check_vars[key] = tk.BooleanVar(value=previous.get(key, wavenumber > 1500))
             tk.Checkbutton(self.group_check_frame, 
                           text=f"{wavenumber} cm⁻¹: {group}",
                           variable=self.group_check_vars[key],
@@ -225,36 +403,50 @@ class FtirWindow:
             messagebox.showwarning("Peringatan", "Silakan identifikasi puncak terlebih dahulu")
             return
         try:
-            plot_name = self.plot_name_entry.get() or "Spektrum FTIR Dikoreksi"
-            # Filter gugus fungsional berdasarkan yang dicentang
-            filtered_groups = self.get_filtered_functional_groups()
-            plot_spectrum(self.ax, self.corrected_data, self.peaks, plot_name,
-                          show_legend=self.show_legend.get(),
-                          show_peaks=self.show_peaks.get(),
-                          show_groups=self.show_groups.get(),
-                          custom_functional_groups=filtered_groups)
+            self.draw_spectrum_artists()
+            self.refresh_spectrum_artists()
             self.canvas.draw()
         except Exception as e:
             messagebox.showerror("Error", f"Terjadi kesalahan saat plotting: {str(e)}")
         
+    def draw_spectrum_artists(self):
+        """Gambar ulang seluruh artist spektrum (hanya saat data atau puncak berubah)"""
+        plot_name = self.plot_name_entry.get() or "Spektrum FTIR Dikoreksi"
+        self.spectrum_artists = draw_spectrum_artists(self.ax, self.corrected_data, self.peaks, plot_name)
+        self.spectrum_source = (self.corrected_data, self.peaks)
+        self.hit_index = PeakHitIndex(self.spectrum_artists)
+        
+    def refresh_spectrum_artists(self):
+        """Terapkan opsi tampilan ke artist spektrum yang sudah ada"""
+        plot_name = self.plot_name_entry.get() or "Spektrum FTIR Dikoreksi"
+        # Filter gugus fungsional berdasarkan yang dicentang
+        filtered_groups = self.get_filtered_functional_groups()
+        update_spectrum_artists(self.spectrum_artists, plot_name,
+                                show_legend=self.show_legend.get(),
+                                show_peaks=self.show_peaks.get(),
+                                show_groups=self.show_groups.get(),
+                                functional_groups=filtered_groups)
+        # Teks/visibilitas label mungkin berubah, posisi hit test dihitung ulang saat dibutuhkan
+        self.hit_index.invalidate()
+        
     def update_plot(self):
         """Perbarui plot berdasarkan opsi tampilan"""
         if self.data is None:
             return
-        self.ax.clear()
         if self.corrected_data is not None and self.peaks is not None:
-            plot_name = self.plot_name_entry.get() or "Spektrum FTIR Dikoreksi"
-            # Filter gugus fungsional berdasarkan yang dicentang
-            filtered_groups = self.get_filtered_functional_groups()
-            plot_spectrum(self.ax, self.corrected_data, self.peaks, plot_name,
-                          show_legend=self.show_legend.get(),
-                          show_peaks=self.show_peaks.get(),
-                          show_groups=self.show_groups.get(),
-                          custom_functional_groups=filtered_groups)
+            # Artist lama dipakai ulang selama data dan puncaknya sama; toggle hanya
+            # mengubah visibilitas/teks lalu menjadwalkan satu kali render
+            source = self.spectrum_source or (None, None)
+            if (self.spectrum_artists is None or source[0] is not self.corrected_data
+                    or source[1] is not self.peaks):
+                self.draw_spectrum_artists()
+            self.refresh_spectrum_artists()
+            self.canvas.draw_idle()
         else:
             plot_name = self.plot_name_entry.get() or "Spektrum FTIR Mentah"
             plot_raw_data(self.ax, self.data, plot_name)
-        self.canvas.draw()
+            self.spectrum_artists = None
+            self.canvas.draw()
     
     def get_filtered_functional_groups(self):
         """Filter gugus fungsional berdasarkan checkbox yang dicentang"""
@@ -267,34 +459,26 @@ class FtirWindow:
                 filtered_groups.append({"wavenumber": wavenumber, "group": group})
         return filtered_groups
     
+    def change_mode(self):
+        """Catat pergantian mode identifikasi gugus sebagai langkah riwayat"""
+        mode = self.mode.get()
+        if mode == self.history.state["mode"]:
+            return
+        changes = {"mode": mode}
+        if mode == "auto" and self.peak_table_data:
+            # Dalam mode otomatis, gunakan gugus fungsi hasil identifikasi yang tersimpan
+            peak_table_data = [{"wavenumber": entry["wavenumber"], "group": auto_group}
+                               for entry, auto_group in zip(self.peak_table_data, self.auto_groups)]
+            changes.update(peak_table_data=peak_table_data, functional_groups=list(peak_table_data))
+        self.record("mode", f"mode {mode}", **changes)
+        self.update_table()
+    
     def update_table(self):
-        """Perbarui tabel berdasarkan mode identifikasi gugus dan perbarui plot"""
+        """Perbarui tabel, checkbox gugus dan plot dari peak_table_data"""
         # Kosongkan tabel
         for item in self.table.get_children():
             self.table.delete(item)
         
-        # Perbarui functional_groups berdasarkan peak_table_data
-        if self.peak_table_data:
-            if self.mode.get() == "auto":
-                # Dalam mode otomatis, gunakan gugus fungsi bawaan
-                temp_groups = identify_functional_groups(self.corrected_data, self.peaks)
-                self.functional_groups = []
-                for entry in self.peak_table_data:
-                    for fg in temp_groups:
-                        if fg['wavenumber'] == entry["wavenumber"]:
-                            entry["group"] = fg['group']
-                            break
-                    self.functional_groups.append({
-                        "wavenumber": entry["wavenumber"],
-                        "group": entry["group"]
-                    })
-            else:
-                # Dalam mode manual, gunakan gugus yang telah diedit
-                self.functional_groups = [
-                    {"wavenumber": entry["wavenumber"], "group": entry["group"]}
-                    for entry in self.peak_table_data
-                ]
-        
         # Isi tabel
         for entry in self.peak_table_data:
             self.table.insert("", tk.END, values=(entry["wavenumber"], entry["group"]))
@@ -315,39 +499,226 @@ class FtirWindow:
             return
         
         item = self.table.item(selected_item)
-        wavenumber = item['values'][0]
+        self.open_group_editor(item['values'][0], item['values'][1])
         
-        # Buat jendela input untuk mengedit gugus
+    def open_group_editor(self, wavenumber, group):
+        """Jendela input untuk mengedit gugus satu puncak"""
         edit_window = tk.Toplevel(self.master)
         edit_window.title(f"Edit Gugus untuk Wavenumber {wavenumber}")
         
         tk.Label(edit_window, text="Gugus Fungsional:").pack()
         entry = tk.Entry(edit_window)
-        entry.insert(0, item['values'][1])
+        entry.insert(0, group)
         entry.pack()
         
         def save_edit():
-            new_group = entry.get()
-            # Perbarui data tabel
-            for data_entry in self.peak_table_data:
-                if data_entry["wavenumber"] == wavenumber:
-                    data_entry["group"] = new_group
-                    break
-            # Perbarui functional_groups
-            for fg in self.functional_groups:
-                if fg["wavenumber"] == wavenumber:
-                    fg["group"] = new_group
-                    break
-            # Perbarui tabel
-            self.table.item(selected_item, values=(wavenumber, new_group))
-            # Perbarui checkbox gugus fungsional
-            self.create_group_checkboxes()
-            # Perbarui plot
-            self.update_plot()
+            self.set_peak_group(wavenumber, entry.get())
             edit_window.destroy()
         
         tk.Button(edit_window, text="Simpan", command=save_edit).pack()
         
+    def set_peak_group(self, wavenumber, new_group):
+        """Ubah gugus satu puncak; hanya baris tabel dan label puncak itu yang diperbarui"""
+        positions = [i for i, entry in enumerate(self.peak_table_data) if entry["wavenumber"] == wavenumber]
+        if not positions:
+            return
+        position = positions[0]
+        # Copy-on-write: hanya entri yang diedit yang dibuat baru, entri lain dibagi
+        peak_table_data = list(self.peak_table_data)
+        peak_table_data[position] = {"wavenumber": wavenumber, "group": new_group}
+        self.record("edit", f"{wavenumber} cm⁻¹: {new_group}", peak_table_data=peak_table_data,
+                    functional_groups=list(peak_table_data))
+        # Perbarui tabel
+        self.table.item(self.table.get_children()[position], values=(wavenumber, new_group))
+        # Perbarui checkbox gugus fungsional
+        self.create_group_checkboxes()
+        # Perbarui plot
+        self.update_plot()
+        
+    def on_canvas_click(self, event):
+        """Edit puncak dengan klik pada plot (hit test lewat KD-tree koordinat display)"""
+        source = self.spectrum_source or (None, None)
+        if (not self.edit_peaks.get() or self.spectrum_artists is None or self.toolbar.mode
+                or event.inaxes is not self.ax or source[0] is not self.corrected_data
+                or source[1] is not self.peaks):
+            return
+        # Tekan pertama dari klik ganda juga datang sebagai klik tunggal: batalkan penambahan tertunda
+        if self.pending_add is not None:
+            self.master.after_cancel(self.pending_add)
+            self.pending_add = None
+        hit = self.hit_index.query(event.x, event.y)
+        try:
+            if event.button == 3 and hit is not None:
+                self.remove_peak(int(hit["wavenumber"]))
+            elif event.button == 1 and hit is not None and event.dblclick:
+                if self.mode.get() != "manual":
+                    messagebox.showwarning("Peringatan", "Pilih mode Manual untuk mengubah gugus")
+                    return
+                wavenumber = int(hit["wavenumber"])
+                group = next(entry["group"] for entry in self.peak_table_data if entry["wavenumber"] == wavenumber)
+                self.open_group_editor(wavenumber, group)
+            elif event.button == 1 and hit is None and not event.dblclick:
+                # Ditunda sampai jelas bukan klik ganda
+                self.pending_add = self.master.after(DOUBLE_CLICK_DELAY, self.add_pending_peak, event.xdata, source)
+        except Exception as e:
+            messagebox.showerror("Error", f"Terjadi kesalahan saat mengedit puncak: {str(e)}")
+        
+    def add_pending_peak(self, x_click, source):
+        """Tambah puncak dari klik tunggal tertunda bila spektrum yang tampil belum berganti"""
+        self.pending_add = None
+        if not self.edit_peaks.get() or source[0] is not self.corrected_data or source[1] is not self.peaks:
+            return
+        try:
+            self.add_peak(x_click)
+        except Exception as e:
+            messagebox.showerror("Error", f"Terjadi kesalahan saat mengedit puncak: {str(e)}")
+        
+    def add_peak(self, x_click):
+        """Tambah puncak di minimum lokal terdekat dari posisi klik"""
+        x = self.corrected_data['wavenumber'].to_numpy()
+        index = snap_to_minimum(x, self.corrected_data['%T_corrected'].to_numpy(), x_click)
+        wavenumber = int(x[index])
+        if any(entry["wavenumber"] == wavenumber for entry in self.peak_table_data):
+            return
+        assignments = assign_functional_groups([x[index]], self.band_index)
+        group = assignments['group'].iloc[0] if len(assignments) else "Tidak Diketahui"
+        
+        # peak_table_data mengikuti urutan indeks pada peaks
+        position = int(np.searchsorted(self.peaks, index))
+        peak_table_data = list(self.peak_table_data)
+        peak_table_data.insert(position, {"wavenumber": wavenumber, "group": group})
+        auto_groups = list(self.auto_groups)
+        auto_groups.insert(position, group)
+        self.record("edit", f"tambah {wavenumber} cm⁻¹", peaks=np.insert(self.peaks, position, index),
+                    peak_table_data=peak_table_data, functional_groups=list(peak_table_data), auto_groups=auto_groups)
+        
+        add_peak_artist(self.spectrum_artists, self.corrected_data, index)
+        self.table.insert("", position, values=(wavenumber, group))
+        self.sync_peak_artists()
+        
+    def remove_peak(self, wavenumber):
+        """Hapus puncak beserta artist dan baris tabelnya"""
+        positions = [i for i, entry in enumerate(self.peak_table_data) if entry["wavenumber"] == wavenumber]
+        if not positions:
+            return
+        position = positions[0]
+        peak_table_data = self.peak_table_data[:position] + self.peak_table_data[position + 1:]
+        self.record("edit", f"hapus {wavenumber} cm⁻¹", peaks=np.delete(self.peaks, position),
+                    peak_table_data=peak_table_data, functional_groups=list(peak_table_data),
+                    auto_groups=self.auto_groups[:position] + self.auto_groups[position + 1:])
+        
+        remove_peak_artist(self.spectrum_artists, wavenumber)
+        self.table.delete(self.table.get_children()[position])
+        self.sync_peak_artists()
+        
+    def sync_peak_artists(self):
+        """Setelah tambah/hapus puncak: artist yang ada tetap dipakai, cukup satu render"""
+        self.spectrum_source = (self.corrected_data, self.peaks)
+        self.create_group_checkboxes()
+        self.refresh_spectrum_artists()
+        self.canvas.draw_idle()
+        
+    def record(self, step, label="", **changes):
+        """Catat langkah analisis di riwayat lalu terapkan state barunya ke jendela"""
+        self.history.record(step, label, **changes)
+        self.apply_state(self.history.state)
+        
+    def apply_state(self, state):
+        """Salin referensi field state riwayat ke atribut jendela (tanpa menyalin data)"""
+        for field, value in state.items():
+            if field == "mode":
+                self.mode.set(value)
+            else:
+                setattr(self, field, value)
+        self.refresh_history_window()
+        
+    def restore_state(self, state):
+        """Terapkan state hasil undo/redo/checkout lalu gambar ulang tabel dan plot"""
+        if state is None:
+            return
+        self.apply_state(state)
+        self.update_table()
+        if self.data is None:
+            self.ax.clear()
+            self.spectrum_artists = None
+            self.canvas.draw_idle()
+        
+    def undo(self):
+        """Kembali ke langkah analisis sebelumnya"""
+        self.restore_state(self.history.undo())
+        
+    def redo(self):
+        """Ulangi langkah analisis yang di-undo"""
+        self.restore_state(self.history.redo())
+        
+    def show_history(self):
+        """Jendela pohon riwayat: pindah ke langkah mana pun atau bandingkan dua cabang"""
+        if self.history_window is not None and self.history_window.winfo_exists():
+            self.history_window.lift()
+            return
+        self.history_window = tk.Toplevel(self.master)
+        self.history_window.title("Riwayat Analisis")
+        self.history_tree = ttk.Treeview(self.history_window, columns=("Langkah", "Keterangan", "Tambahan"))
+        self.history_tree.heading("#0", text="#")
+        self.history_tree.heading("Langkah", text="Langkah")
+        self.history_tree.heading("Keterangan", text="Keterangan")
+        self.history_tree.heading("Tambahan", text="Memori Tambahan (KB)")
+        self.history_tree.column("#0", width=80)
+        self.history_tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        self.history_tree.bind("<Double-1>", lambda event: self.checkout_history())
+        
+        button_frame = tk.Frame(self.history_window)
+        button_frame.pack(fill=tk.X, padx=10, pady=5)
+        tk.Button(button_frame, text="Pindah ke Langkah", command=self.checkout_history).pack(side=tk.LEFT, padx=5)
+        tk.Button(button_frame, text="Bandingkan 2 Langkah", command=self.compare_history).pack(side=tk.LEFT, padx=5)
+        self.history_memory = tk.Label(button_frame)
+        self.history_memory.pack(side=tk.RIGHT, padx=5)
+        self.refresh_history_window()
+        
+    def refresh_history_window(self):
+        """Isi ulang pohon riwayat bila jendelanya terbuka"""
+        if self.history_window is None or not self.history_window.winfo_exists():
+            return
+        self.history_tree.delete(*self.history_tree.get_children())
+        active = set(self.history.path())
+        for node in self.history.nodes:
+            parent = "" if node["parent"] is None else str(node["parent"])
+            marker = "● " if node["id"] == self.history.current else ""
+            self.history_tree.insert(parent, tk.END, iid=str(node["id"]), text=f"{marker}{node['id']}", open=True,
+                                     values=(node["step"], node["label"], f"{node['added_bytes'] / 1024:.1f}"))
+        for node_id in active:
+            self.history_tree.item(str(node_id), open=True)
+        self.history_tree.selection_set(str(self.history.current))
+        self.history_memory.config(text=f"Total: {self.history.memory_usage() / 1024:.1f} KB")
+        
+    def checkout_history(self):
+        """Pindah ke langkah yang dipilih di pohon riwayat"""
+        selection = self.history_tree.selection()
+        if selection:
+            self.restore_state(self.history.checkout(int(selection[0])))
+        
+    def compare_history(self):
+        """Tampilkan field yang berbeda antara dua langkah yang dipilih"""
+        selection = self.history_tree.selection()
+        if len(selection) != 2:
+            messagebox.showwarning("Peringatan", "Pilih tepat dua langkah untuk dibandingkan")
+            return
+        first, second = int(selection[0]), int(selection[1])
+        differences = self.history.compare(first, second)
+        if not differences:
+            messagebox.showinfo("Info", f"Langkah {first} dan {second} identik")
+            return
+        lines = []
+        for field, (a, b) in differences.items():
+            if field == "peaks" and a is not None and b is not None:
+                lines.append(f"peaks: {len(a)} vs {len(b)} puncak")
+            elif field == "peak_table_data":
+                changed = sum(1 for x, y in zip(a, b) if x is not y) + abs(len(a) - len(b))
+                lines.append(f"peak_table_data: {changed} entri berbeda")
+            else:
+                lines.append(field)
+        messagebox.showinfo("Perbandingan Riwayat", f"Langkah {first} vs {second}:\n" + "\n".join(lines))
+        
     def export_data(self):
         """Ekspor data ke Excel"""
         if self.corrected_data is None:
@@ -361,6 +732,79 @@ class FtirWindow:
             except Exception as e:
                 messagebox.showerror("Error", f"Terjadi kesalahan saat ekspor data: {str(e)}")
         
+    def export_columnar(self):
+        """Ekspor spektrum, puncak dan gugus ke format kolumnar (Parquet/Feather/HDF5)"""
+        if self.corrected_data is None:
+            messagebox.showwarning("Peringatan", "Silakan lakukan koreksi baseline terlebih dahulu")
+            return
+        file_path = filedialog.asksaveasfilename(defaultextension=".parquet",
+                                                 filetypes=[("File Parquet", "*.parquet"),
+                                                            ("File Feather", "*.feather"),
+                                                            ("File HDF5", "*.h5")])
+        if file_path:
+            # Nilai state dibaca di thread Tk; riwayat copy-on-write tidak mengubahnya in-place
+            sample = {
+                "name": self.plot_name_entry.get() or "sampel",
+                "data": self.corrected_data,
+                "peaks": self.peaks,
+                "functional_groups": self.functional_groups,
+            }
+            # Spektrum yang sedang dibuka sudah diperiksa QC saat dimuat dan dikoreksi
+            self.run_in_background(lambda: export_batch([sample], file_path, screen=False),
+                                   lambda summary: messagebox.showinfo("Info", "Data diekspor"),
+                                   "ekspor data")
+        
+    def export_jcamp(self):
+        """Ekspor spektrum hasil koreksi baseline ke file JCAMP-DX"""
+        if self.corrected_data is None:
+            messagebox.showwarning("Peringatan", "Silakan lakukan koreksi baseline terlebih dahulu")
+            return
+        file_path = filedialog.asksaveasfilename(defaultextension=".jdx", filetypes=[("File JCAMP-DX", "*.jdx *.dx")])
+        if file_path:
+            try:
+                export_jcamp(self.corrected_data, file_path, title=self.plot_name_entry.get() or None)
+                messagebox.showinfo("Info", "Data diekspor ke JCAMP-DX")
+            except Exception as e:
+                messagebox.showerror("Error", f"Terjadi kesalahan saat ekspor data: {str(e)}")
+        
+    def export_report(self):
+        """Membuat laporan PDF multi-halaman untuk seluruh spektrum dalam satu folder"""
+        folder = filedialog.askdirectory(title="Pilih folder spektrum")
+        if not folder:
+            return
+        file_path = filedialog.asksaveasfilename(defaultextension=".pdf", filetypes=[("File PDF", "*.pdf")])
+        if file_path:
+            try:
+                options = {"lam": float(self.lam_entry.get()), "p": float(self.p_entry.get()),
+                           "peak_method": self.peak_method.get()}
+            except Exception as e:
+                messagebox.showerror("Error", f"Terjadi kesalahan saat membuat laporan: {str(e)}")
+                return
+            self.run_in_background(lambda: generate_report(folder, file_path, **options),
+                                   lambda summary: messagebox.showinfo("Info", f"Laporan {len(summary)} sampel disimpan"),
+                                   "membuat laporan")
+        
+    def run_in_background(self, task, on_done, action):
+        """
+        Menjalankan task di thread pekerja lalu memeriksa hasilnya dengan after().
+
+        on_done dan pesan kesalahan selalu dipanggil di thread Tk.
+        """
+        future = self.executor.submit(task)
+        
+        def poll():
+            if not future.done():
+                self.master.after(BACKGROUND_POLL, poll)
+                return
+            try:
+                result = future.result()
+            except Exception as e:
+                messagebox.showerror("Error", f"Terjadi kesalahan saat {action}: {str(e)}")
+                return
+            on_done(result)
+        
+        self.master.after(BACKGROUND_POLL, poll)
+        
     def export_plot(self):
         """Ekspor plot ke file gambar"""
         if self.ax.get_lines() == []:
@@ -372,4 +816,103 @@ class FtirWindow:
                 export_plot(self.figure, file_path)
                 messagebox.showinfo("Info", "Plot diekspor")
             except Exception as e:
-                messagebox.showerror("Error", f"Terjadi kesalahan saat ekspor plot: {str(e)}")
\ No newline at end of file
+                messagebox.showerror("Error", f"Terjadi kesalahan saat ekspor plot: {str(e)}")
+
+class StreamWindow:
+    """
+    Jendela akuisisi streaming: frame dari instrumen (simulasi) di-co-add di ring buffer,
+    dikoreksi baseline secara inkremental dan digambar dengan blitting pada laju tampilan terbatas.
+    """
+
+    def __init__(self, master, x, y, lam=1e3, p=0.01, rate=30.0, max_fps=15, capacity=256, n_coadd=16):
+        self.master = master
+        master.title("Streaming FTIR")
+        self.interval = max(1, int(1000 / max_fps))
+
+        # Instrumen simulasi dan penerima berjalan di thread latar belakang
+        self.instrument = SimulatedInstrument(x, y, rate=rate).start()
+        self.receiver = StreamReceiver(self.instrument.address, capacity=capacity, n_coadd=n_coadd).start()
+        self.baseline = IncrementalBaseline(lam, p)
+        self.average = np.empty(len(self.receiver.axis))
+        self.last_sequence = -1
+        self.last_time = time.perf_counter()
+        self.last_received = 0
+
+        self.control_frame = tk.Frame(master)
+        self.control_frame.pack(fill=tk.X, padx=10, pady=5)
+        tk.Label(self.control_frame, text="Co-add:").pack(side=tk.LEFT)
+        self.coadd = tk.IntVar(value=n_coadd)
+        tk.Spinbox(self.control_frame, from_=1, to=capacity - 1, textvariable=self.coadd, width=6,
+                   command=self.set_coadd).pack(side=tk.LEFT, padx=5)
+        self.paused = tk.BooleanVar(value=False)
+        tk.Checkbutton(self.control_frame, text="Jeda Tampilan", variable=self.paused).pack(side=tk.LEFT, padx=5)
+        self.status = tk.Label(self.control_frame, text="Menunggu frame...")
+        self.status.pack(side=tk.LEFT, padx=10)
+
+        self.figure = plt.Figure(figsize=(8, 5), dpi=100)
+        self.ax = self.figure.add_subplot(111)
+        self.canvas = FigureCanvasTkAgg(self.figure, master=master)
+        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+
+        axis = self.receiver.axis
+        self.ax.set_xlim(axis[-1], axis[0])
+        margin = 0.1 * (np.max(y) - np.min(y)) + 5.0
+        self.ax.set_ylim(np.min(y) - margin, np.max(y) + margin)
+        self.ax.set_xlabel('Wavenumber (cm⁻¹)')
+        self.ax.set_ylabel('Transmittance (%)')
+        # Artist animated tidak ikut digambar ulang saat draw penuh; hanya di-blit
+        self.raw_line, = self.ax.plot(axis, np.full(len(axis), np.nan), color='tab:blue', lw=0.8,
+                                      animated=True, label='Co-add')
+        self.baseline_line, = self.ax.plot(axis, np.full(len(axis), np.nan), color='tab:red', lw=1.0,
+                                           animated=True, label='Baseline')
+        self.ax.legend(handles=[self.raw_line, self.baseline_line], loc='lower left')
+        self.background = None
+        self.canvas.mpl_connect('draw_event', self.on_draw)
+        self.canvas.draw()
+
+        master.protocol("WM_DELETE_WINDOW", self.close)
+        self.job = master.after(self.interval, self.refresh)
+
+    def on_draw(self, event):
+        """Simpan latar (sumbu, label) setelah draw penuh untuk dipakai blitting"""
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self.draw_lines()
+
+    def draw_lines(self):
+        self.ax.draw_artist(self.raw_line)
+        self.ax.draw_artist(self.baseline_line)
+
+    def set_coadd(self):
+        try:
+            self.receiver.buffer.set_coadd(int(self.coadd.get()))
+        except (ValueError, tk.TclError) as e:
+            messagebox.showerror("Error", f"Terjadi kesalahan saat mengubah co-add: {str(e)}")
+
+    def refresh(self):
+        """Satu tick tampilan: ambil rata-rata co-add terbaru, hitung baseline, lalu blit"""
+        if self.receiver.error is not None:
+            self.status.config(text=f"Aliran berhenti: {self.receiver.error}")
+            return
+        buffer = self.receiver.buffer
+        sequence, count = buffer.average(self.average)
+        if count and sequence != self.last_sequence and not self.paused.get() and self.background is not None:
+            self.last_sequence = sequence
+            self.raw_line.set_ydata(self.average)
+            self.baseline_line.set_ydata(self.baseline(self.average))
+            self.canvas.restore_region(self.background)
+            self.draw_lines()
+            self.canvas.blit(self.figure.bbox)
+
+        now = time.perf_counter()
+        if now - self.last_time >= 1.0:
+            rate = (buffer.received - self.last_received) / (now - self.last_time)
+            self.status.config(text=f"Frame: {buffer.received}  |  {rate:.1f} frame/s  |  "
+                                    f"Terlewat: {buffer.skipped}  |  Co-add: {count}")
+            self.last_time, self.last_received = now, buffer.received
+        self.job = self.master.after(self.interval, self.refresh)
+
+    def close(self):
+        self.master.after_cancel(self.job)
+        self.receiver.stop()
+        self.instrument.stop()
+        self.master.destroy()
@@ -0,0 +1,174 @@
+import sys
+from types import MappingProxyType
+import numpy as np
+import pandas as pd
+
+# Field state analisis FtirWindow yang dicatat di riwayat
+HISTORY_FIELDS = ('data', 'corrected_data', 'peaks', 'functional_groups', 'peak_table_data', 'auto_groups', 'mode')
+
+def _freeze(value):
+    """Array dibuat read-only agar nilai yang dibagi antar langkah tidak berubah diam-diam"""
+    if isinstance(value, np.ndarray):
+        value.setflags(write=False)
+
+def _buffers(value):
+    """
+    Buffer memori yang dipegang sebuah nilai: {kunci buffer: ukuran byte}.
+
+    Kolom DataFrame dan view array dipetakan ke buffer dasarnya, sehingga kolom
+    yang dibagi (mis. 'wavenumber' pada data dan corrected_data) hanya dihitung sekali.
+    """
+    if value is None:
+        return {}
+    if isinstance(value, np.ndarray):
+        base = value
+        while isinstance(base.base, np.ndarray):
+            base = base.base
+        return {('array', base.__array_interface__['data'][0]): base.nbytes}
+    if isinstance(value, pd.DataFrame):
+        buffers = {}
+        for column in value.columns:
+            buffers.update(_buffers(value[column].to_numpy()))
+        return buffers
+    buffers = {('object', id(value)): sys.getsizeof(value)}
+    if isinstance(value, (list, tuple)):
+        for item in value:
+            buffers.update(_buffers(item))
+    return buffers
+
+class AnalysisHistory:
+    """
+    Riwayat analisis copy-on-write berbentuk pohon (undo/redo dan cabang).
+
+    Setiap langkah hanya menyimpan field yang berubah; field lain dibagi dengan
+    langkah induknya berdasarkan referensi. Nilai yang sudah dicatat tidak boleh
+    diubah in-place: langkah berikutnya harus membuat objek baru (array baru,
+    list baru yang boleh berisi elemen lama).
+    """
+
+    def __init__(self, fields=HISTORY_FIELDS, **initial):
+        state = dict.fromkeys(fields)
+        state.update(initial)
+        self.nodes = [{
+            'id': 0,
+            'parent': None,
+            'children': [],
+            'step': 'awal',
+            'label': '',
+            'changes': {},
+            'state': MappingProxyType(state),
+            'added_bytes': 0,
+        }]
+        self.current = 0
+        # Anak yang terakhir ditinggalkan lewat undo, tujuan redo berikutnya
+        self._redo_child = {}
+
+    @property
+    def state(self):
+        """State langkah aktif (mapping read-only)"""
+        return self.nodes[self.current]['state']
+
+    def record(self, step, label='', **changes):
+        """
+        Mencatat langkah baru sebagai anak langkah aktif.
+
+        Bila langkah aktif bukan ujung riwayat (setelah undo), langkah baru
+        membentuk cabang; cabang lama tetap tersimpan.
+
+        Parameters:
+        - step: str, jenis langkah (mis. 'load', 'baseline', 'peaks', 'edit')
+        - label: str, keterangan singkat
+        - changes: field yang berubah beserta nilai barunya
+
+        Returns:
+        - node_id: int, id langkah baru
+        """
+        parent = self.nodes[self.current]
+        unknown = set(changes) - set(parent['state'])
+        if unknown:
+            raise ValueError(f"Field riwayat tidak dikenal: {', '.join(sorted(unknown))}")
+        for value in changes.values():
+            _freeze(value)
+
+        known = {}
+        for value in parent['state'].values():
+            known.update(_buffers(value))
+        new = {}
+        for value in changes.values():
+            new.update(_buffers(value))
+
+        node = {
+            'id': len(self.nodes),
+            'parent': parent['id'],
+            'children': [],
+            'step': step,
+            'label': label,
+            'changes': changes,
+            'state': MappingProxyType({**parent['state'], **changes}),
+            'added_bytes': sum(size for key, size in new.items() if key not in known),
+        }
+        self.nodes.append(node)
+        parent['children'].append(node['id'])
+        self.current = node['id']
+        return node['id']
+
+    def can_undo(self):
+        return self.nodes[self.current]['parent'] is not None
+
+    def can_redo(self):
+        return bool(self.nodes[self.current]['children'])
+
+    def undo(self):
+        """Kembali ke langkah induk; mengembalikan state baru atau None bila sudah di awal"""
+        parent = self.nodes[self.current]['parent']
+        if parent is None:
+            return None
+        self._redo_child[parent] = self.current
+        self.current = parent
+        return self.state
+
+    def redo(self):
+        """Maju ke anak yang terakhir di-undo (atau cabang terbaru); None bila tidak ada"""
+        children = self.nodes[self.current]['children']
+        if not children:
+            return None
+        self.current = self._redo_child.get(self.current, children[-1])
+        return self.state
+
+    def checkout(self, node_id):
+        """Pindah langsung ke langkah mana pun (mis. ujung cabang lain)"""
+        if not 0 <= node_id < len(self.nodes):
+            raise ValueError(f"Langkah riwayat tidak ditemukan: {node_id}")
+        self.current = node_id
+        return self.state
+
+    def path(self, node_id=None):
+        """Daftar id langkah dari awal sampai node_id (default: langkah aktif)"""
+        node_id = self.current if node_id is None else node_id
+        path = []
+        while node_id is not None:
+            path.append(node_id)
+            node_id = self.nodes[node_id]['parent']
+        return path[::-1]
+
+    def leaves(self):
+        """Id ujung tiap cabang"""
+        return [node['id'] for node in self.nodes if not node['children']]
+
+    def compare(self, first, second):
+        """
+        Field yang berbeda antara dua langkah (dibandingkan berdasarkan identitas objek).
+
+        Returns:
+        - differences: dict {field: (nilai di first, nilai di second)}
+        """
+        a, b = self.nodes[first]['state'], self.nodes[second]['state']
+        return {field: (a[field], b[field]) for field in a if a[field] is not b[field]}
+
+    def memory_usage(self):
+        """Total byte unik yang dipegang seluruh riwayat"""
+        buffers = {}
+        for node in self.nodes:
+            for value in node['state'].values() if node['parent'] is None else node['changes'].values():
+                buffers.update(_buffers(value))
+        return sum(buffers.values())
@@ -0,0 +1,83 @@
+import numpy as np
+from scipy.spatial import cKDTree
+
+def snap_to_minimum(x, y, x_click, half_window=10):
+    """
+    Mencari indeks minimum lokal %T terdekat dari posisi klik.
+
+    Parameters:
+    - x: np.ndarray, wavenumber (boleh tidak terurut)
+    - y: np.ndarray, intensitas (%T_corrected)
+    - x_click: float, posisi klik pada sumbu wavenumber
+    - half_window: int, jumlah titik di kiri/kanan posisi klik yang diperiksa
+
+    Returns:
+    - index: int, indeks titik pada urutan data asli
+    """
+    order = np.argsort(x, kind='mergesort')
+    position = int(np.clip(np.searchsorted(x[order], x_click), 0, len(x) - 1))
+    start, stop = max(position - half_window, 0), min(position + half_window + 1, len(x))
+    window = order[start:stop]
+    return int(window[np.argmin(y[window])])
+
+class PeakHitIndex:
+    """
+    Indeks spasial (KD-tree) posisi puncak dan label dalam koordinat display (piksel).
+
+    Tiap puncak diwakili titik ujung garis penunjuk; label vertikal diwakili titik-titik
+    sampel sepanjang bounding box-nya. Pohon dibangun ulang hanya bila tampilan
+    (xlim/ylim atau ukuran axes) berubah atau invalidate dipanggil setelah edit,
+    sehingga tiap hit test cukup satu query O(log n).
+    """
+
+    def __init__(self, artists, radius=8.0):
+        self.artists = artists
+        self.radius = radius
+        self._tree = None
+        self._owners = None
+        self._key = None
+
+    def invalidate(self):
+        """Tandai indeks usang (puncak ditambah/dihapus atau teks label berubah)"""
+        self._tree = None
+
+    def _view_key(self):
+        ax = self.artists["line"].axes
+        return ax.viewLim.bounds + ax.bbox.bounds
+
+    def _build(self):
+        ax = self.artists["line"].axes
+        points, owners = [], []
+        for i, entry in enumerate(self.artists["peaks"]):
+            if entry["tick"].get_visible():
+                points.append(ax.transData.transform(entry["tick"].get_xydata()[0]))
+                owners.append(i)
+            label = entry["label"]
+            if label.get_visible() and label.get_text():
+                box = label.get_window_extent()
+                n = max(int(np.ceil(max(box.height, box.width) / self.radius)), 1) + 1
+                if box.height >= box.width:
+                    samples = np.column_stack([np.full(n, 0.5 * (box.x0 + box.x1)), np.linspace(box.y0, box.y1, n)])
+                else:
+                    samples = np.column_stack([np.linspace(box.x0, box.x1, n), np.full(n, 0.5 * (box.y0 + box.y1))])
+                points.extend(samples)
+                owners.extend([i] * n)
+        self._owners = np.array(owners, dtype=np.int64)
+        self._tree = cKDTree(np.array(points).reshape(-1, 2)) if points else None
+        self._key = self._view_key()
+
+    def query(self, x, y):
+        """
+        Puncak yang garis atau labelnya berada dalam radius piksel dari (x, y) display.
+
+        Returns:
+        - entry: dict artist puncak ('wavenumber', 'tick', 'label') atau None
+        """
+        if self._tree is None or self._key != self._view_key():
+            self._build()
+        if self._tree is None:
+            return None
+        distance, index = self._tree.query((x, y), distance_upper_bound=self.radius)
+        if not np.isfinite(distance):
+            return None
+        return self.artists["peaks"][self._owners[index]]
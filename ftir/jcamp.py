@@ -0,0 +1,387 @@
+import os
+import re
+import numpy as np
+
+# Karakter ASDF (JCAMP-DX): SQZ = nilai dengan tanda pada digit pertama,
+# DIF = selisih terhadap nilai sebelumnya, DUP = jumlah pengulangan token sebelumnya
+_SQZ = {'@': '0', **{c: str(i) for i, c in enumerate('ABCDEFGHI', 1)},
+        **{c: str(-i) for i, c in enumerate('abcdefghi', 1)}}
+_DIF = {'%': '0', **{c: str(i) for i, c in enumerate('JKLMNOPQR', 1)},
+        **{c: str(-i) for i, c in enumerate('jklmnopqr', 1)}}
+_DUP = {c: str(i) for i, c in enumerate('STUVWXYZs', 1)}
+_TOKEN = re.compile(r'([@A-Ia-i%J-Rj-rS-Zs])?([0-9]*\.?[0-9]*(?:[Ee][+-][0-9]+)?)|([+-][0-9]*\.?[0-9]*(?:[Ee][+-][0-9]+)?)')
+
+_NUMERIC_LINE = re.compile(r'^[\s0-9.,;+\-Ee]+$')
+
+_SQZ_POSITIVE = '@ABCDEFGHI'
+_SQZ_NEGATIVE = '@abcdefghi'
+_DIF_POSITIVE = '%JKLMNOPQR'
+_DIF_NEGATIVE = '%jklmnopqr'
+_DUP_DIGITS = ' STUVWXYZs'
+
+JCAMP_EXTENSIONS = ('.jdx', '.dx', '.jcamp')
+JCAMP_LINE_LENGTH = 80
+
+def normalize_label(label):
+    """Normalisasi label JCAMP: huruf besar tanpa spasi, '-', '/' dan '_' (mis. 'DATA TYPE' -> 'DATATYPE')"""
+    return re.sub(r'[\s\-/_]', '', label).upper()
+
+def decode_asdf_line(line):
+    """
+    Mendekode satu baris data ASDF (AFFN/SQZ/DIF/DUP).
+
+    Returns:
+    - values: list float, nilai pertama adalah absis baris
+    - ends_with_dif: bool, True jika baris diakhiri bentuk DIF (baris berikutnya
+      diawali Y-check yang harus dibuang)
+    """
+    values = []
+    last_token = None
+    last_diff = 0.0
+    for match in _TOKEN.finditer(line):
+        prefix, digits, affn = match.groups()
+        if affn:
+            values.append(float(affn))
+            last_token = 'value'
+        elif prefix is None:
+            if not digits:
+                continue
+            values.append(float(digits))
+            last_token = 'value'
+        elif prefix in _SQZ:
+            values.append(float(_SQZ[prefix] + digits))
+            last_token = 'value'
+        elif prefix in _DIF:
+            if not values:
+                raise ValueError(f"Token DIF tanpa nilai awal pada baris: {line.strip()}")
+            last_diff = float(_DIF[prefix] + digits)
+            values.append(values[-1] + last_diff)
+            last_token = 'dif'
+        else:
+            if not values:
+                raise ValueError(f"Token DUP tanpa nilai awal pada baris: {line.strip()}")
+            for _ in range(int(_DUP[prefix] + digits) - 1):
+                values.append(values[-1] + last_diff if last_token == 'dif' else values[-1])
+    return values, last_token == 'dif'
+
+def _open_lines(source):
+    """Iterasi baris dari path atau objek file teks, tanpa memuat seluruh file"""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'r', encoding='latin-1') as f:
+            yield from f
+    else:
+        yield from source
+
+def iter_records(source):
+    """
+    Memecah file JCAMP-DX menjadi rekaman berlabel secara streaming.
+
+    Yields:
+    - (label, value, data_lines): label ternormalisasi, nilai pada baris label, dan
+      generator baris lanjutan (baris data atau lanjutan teks) sampai label berikutnya.
+      Baris data dibaca lazily; bila tidak dikonsumsi akan dilewati otomatis.
+    """
+    lines = iter(_open_lines(source))
+    pending = None
+
+    def continuation():
+        nonlocal pending
+        for line in lines:
+            if '$$' in line:
+                line = line[:line.index('$$')]
+            if line.lstrip().startswith('##'):
+                pending = line
+                return
+            if line.strip():
+                yield line
+        pending = None
+
+    # Baris sebelum label pertama (mis. file tanpa header) diperlakukan sebagai data
+    for line in lines:
+        if '$$' in line:
+            line = line[:line.index('$$')]
+        if line.lstrip().startswith('##'):
+            pending = line
+            break
+        if line.strip():
+            pending = None
+            yield None, '', _chain_first(line, continuation())
+            break
+
+    while pending is not None:
+        label, _, value = pending.lstrip()[2:].partition('=')
+        pending = None
+        data_lines = continuation()
+        yield normalize_label(label), value.strip(), data_lines
+        for _ in data_lines:
+            pass
+
+def _chain_first(first, rest):
+    """Generator yang diawali satu baris lalu melanjutkan generator lain"""
+    yield first
+    yield from rest
+
+def _parse_float(metadata, key, default=None):
+    """Ambil nilai numerik dari metadata JCAMP"""
+    value = metadata.get(key)
+    if value in (None, ''):
+        return default
+    return float(value.split()[0].rstrip(','))
+
+def _read_xy_pairs(data_lines, n_columns=2):
+    """Membaca tabel (XY..XY) / (XYW..XYW) AFFN menjadi kolom x dan y"""
+    chunks = []
+    for line in data_lines:
+        values = np.fromstring(line.replace(',', ' ').replace(';', ' '), dtype=np.float64, sep=' ')
+        chunks.append(values)
+    values = np.concatenate(chunks) if chunks else np.empty(0)
+    if values.size % n_columns != 0:
+        raise ValueError("Jumlah nilai pada tabel (XY..XY) tidak lengkap")
+    values = values.reshape(-1, n_columns)
+    return values[:, 0], values[:, 1]
+
+def _read_asdf(data_lines):
+    """Membaca blok (X++(Y..Y)) terkompresi; absis tiap baris hanya dipakai sebagai cek"""
+    y = []
+    check_pending = False
+    for line in data_lines:
+        values, ends_with_dif = decode_asdf_line(line)
+        ordinates = values[1:]
+        if check_pending and ordinates:
+            # Y-check: ordinat pertama mengulang ordinat terakhir baris sebelumnya
+            ordinates = ordinates[1:]
+        y.extend(ordinates)
+        check_pending = ends_with_dif
+    return np.asarray(y, dtype=np.float64)
+
+def _finish_block(metadata, x, y):
+    """Terapkan XFACTOR/YFACTOR dan bangun sumbu x untuk (X++(Y..Y))"""
+    y = y * _parse_float(metadata, 'YFACTOR', 1.0)
+    if x is None:
+        first_x = _parse_float(metadata, 'FIRSTX')
+        last_x = _parse_float(metadata, 'LASTX')
+        n_points = int(_parse_float(metadata, 'NPOINTS', len(y)))
+        if n_points != len(y):
+            raise ValueError(f"Jumlah titik tidak sesuai NPOINTS ({len(y)} != {n_points}) "
+                             f"pada blok: {metadata.get('TITLE', '')}")
+        if first_x is None:
+            raise ValueError("Label FIRSTX wajib ada untuk data (X++(Y..Y))")
+        if last_x is None:
+            last_x = first_x + _parse_float(metadata, 'DELTAX', 1.0) * (n_points - 1)
+        x = np.linspace(first_x, last_x, n_points)
+    else:
+        x = x * _parse_float(metadata, 'XFACTOR', 1.0)
+    return np.ascontiguousarray(x), np.ascontiguousarray(y)
+
+def iter_jcamp(source):
+    """
+    Membaca spektrum dari file JCAMP-DX (termasuk file multi-blok/LINK) satu per satu.
+
+    Parser berbasis generator: file dibaca per baris dan setiap blok langsung
+    dikembalikan, sehingga arsip berisi banyak spektrum tidak pernah dimuat utuh.
+
+    Parameters:
+    - source: str (path) atau objek file teks
+
+    Yields:
+    - (x, y, metadata): seperti read_spectrum_txt; metadata berisi label blok
+      (huruf besar ternormalisasi, mis. 'TITLE', 'YUNITS', 'DATATYPE')
+    """
+    stack = []
+    for label, value, data_lines in iter_records(source):
+        if label == 'TITLE' or not stack:
+            stack.append({'metadata': {}, 'x': None, 'y': None})
+        block = stack[-1]
+        metadata = block['metadata']
+
+        if label is None or label in ('XYDATA', 'XYPOINTS', 'PEAKTABLE'):
+            variables = value.replace(' ', '').upper()
+            if label is None or variables.startswith('(XY..') or variables.startswith('(XYW..'):
+                n_columns = 3 if variables.startswith('(XYW') else 2
+                block['x'], block['y'] = _read_xy_pairs(data_lines, n_columns)
+            elif variables.startswith('(X++('):
+                block['x'], block['y'] = None, _read_asdf(data_lines)
+            else:
+                raise ValueError(f"Bentuk data JCAMP tidak didukung: {value}")
+            if label is not None:
+                metadata[label] = value
+        elif label == 'END':
+            stack.pop()
+            if block['y'] is not None:
+                yield (*_finish_block(metadata, block['x'], block['y']), metadata)
+        else:
+            first = next(data_lines, None)
+            if first is not None and block['y'] is None and _NUMERIC_LINE.match(first):
+                # Ekspor teks instrumen: header lalu pasangan "x y" tanpa label ##XYDATA
+                metadata[label] = value
+                block['x'], block['y'] = _read_xy_pairs(_chain_first(first, data_lines))
+                continue
+            # Nilai teks boleh berlanjut ke baris berikutnya
+            extra = [line.rstrip('\r\n') for line in _chain_first(first, data_lines)] if first else []
+            metadata[label] = '\n'.join([value] + extra) if extra else value
+
+    # File tanpa ##END (mis. ekspor teks instrumen) tetap menghasilkan bloknya
+    for block in reversed(stack):
+        if block['y'] is not None:
+            yield (*_finish_block(block['metadata'], block['x'], block['y']), block['metadata'])
+
+def read_spectrum_jcamp(file_path, block=0):
+    """Membaca satu spektrum (blok ke-'block') dari file JCAMP-DX"""
+    for i, (x, y, metadata) in enumerate(iter_jcamp(file_path)):
+        if i == block:
+            metadata['FILE'] = os.path.basename(file_path)
+            return x, y, metadata
+    raise ValueError(f"Blok spektrum {block} tidak ditemukan di file: {file_path}")
+
+def _sqz(value):
+    """Format SQZ untuk bilangan bulat"""
+    text = str(abs(value))
+    return (_SQZ_POSITIVE if value >= 0 else _SQZ_NEGATIVE)[int(text[0])] + text[1:]
+
+def _dif(value):
+    """Format DIF untuk bilangan bulat"""
+    text = str(abs(value))
+    return (_DIF_POSITIVE if value >= 0 else _DIF_NEGATIVE)[int(text[0])] + text[1:]
+
+def _dup(count):
+    """Format DUP untuk jumlah pengulangan (>= 2)"""
+    text = str(count)
+    return _DUP_DIGITS[int(text[0])] + text[1:]
+
+def iter_difdup_lines(x, ordinates, line_length=JCAMP_LINE_LENGTH):
+    """
+    Mengodekan ordinat bilangan bulat menjadi baris (X++(Y..Y)) bentuk DIFDUP.
+
+    Setiap baris diawali absis, ordinat pertama dalam SQZ lalu selisih DIF dengan
+    DUP untuk selisih berulang; baris berikutnya mengulang ordinat terakhir (Y-check).
+    """
+    n_points = len(ordinates)
+    diffs = np.diff(ordinates)
+    start = 0
+    while True:
+        line = f"{x[start]:.6f}{_sqz(int(ordinates[start]))}"
+        j = start
+        while j < n_points - 1:
+            run = 1
+            while j + run < n_points - 1 and diffs[j + run] == diffs[j]:
+                run += 1
+            token = _dif(int(diffs[j]))
+            while run > 1 and len(line) + len(token) + len(_dup(run)) > line_length:
+                run -= 1
+            token += _dup(run) if run > 1 else ''
+            if len(line) + len(token) > line_length and j > start:
+                break
+            line += token
+            j += run
+        yield line
+        if j >= n_points - 1:
+            if j > start:
+                # Baris cek terakhir agar pembaca dapat memverifikasi ordinat akhir
+                yield f"{x[j]:.6f}{_sqz(int(ordinates[j]))}"
+            return
+        start = j
+
+def _is_evenly_spaced(x):
+    """Cek apakah sumbu x berjarak sama (syarat bentuk (X++(Y..Y)))"""
+    if len(x) < 2:
+        return False
+    step = (x[-1] - x[0]) / (len(x) - 1)
+    return step != 0 and np.allclose(np.diff(x), step, rtol=1e-6, atol=abs(step) * 1e-6)
+
+def iter_jcamp_block(x, y, metadata=None, title="FTIR", yunits='%T', compression='DIFDUP', y_decimals=6):
+    """
+    Menghasilkan baris-baris satu blok JCAMP-DX untuk satu spektrum.
+
+    Parameters:
+    - x, y: np.ndarray, wavenumber dan intensitas
+    - metadata: dict, label tambahan (kunci yang tidak standar ditulis sebagai label '$')
+    - title: str, judul blok
+    - yunits: str, satuan sumbu y
+    - compression: 'DIFDUP' (X++(Y..Y) terkompresi) atau 'AFFN' (pasangan XY apa adanya)
+    - y_decimals: int, jumlah desimal ordinat yang dipertahankan (YFACTOR = 10^-y_decimals)
+    """
+    if compression not in ('DIFDUP', 'AFFN'):
+        raise ValueError(f"Kompresi JCAMP tidak dikenal: {compression}. Pilih 'DIFDUP' atau 'AFFN'.")
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if x.shape != y.shape or x.ndim != 1 or len(x) == 0:
+        raise ValueError("x dan y harus berupa array 1 dimensi dengan panjang sama")
+
+    yield f"##TITLE={title}"
+    yield "##JCAMP-DX=4.24"
+    yield "##DATA TYPE=INFRARED SPECTRUM"
+    yield "##XUNITS=1/CM"
+    yield f"##YUNITS={yunits}"
+    written = {'TITLE', 'JCAMPDX', 'DATATYPE', 'XUNITS', 'YUNITS', 'FILE', 'XYDATA', 'XYPOINTS', 'END',
+               'FIRSTX', 'LASTX', 'DELTAX', 'NPOINTS', 'XFACTOR', 'YFACTOR', 'FIRSTY', 'MINY', 'MAXY'}
+    for key, value in (metadata or {}).items():
+        label = normalize_label(str(key))
+        if label in written:
+            continue
+        name = str(key) if str(key).startswith('$') or label in ('ORIGIN', 'OWNER', 'DATE', 'TIME') else f"${key}"
+        yield f"##{name}={value}"
+
+    yield "##XFACTOR=1"
+    yield f"##FIRSTX={x[0]:.6f}"
+    yield f"##LASTX={x[-1]:.6f}"
+    yield f"##NPOINTS={len(x)}"
+    yield f"##FIRSTY={y[0]:.{y_decimals}f}"
+    yield f"##MINY={y.min():.{y_decimals}f}"
+    yield f"##MAXY={y.max():.{y_decimals}f}"
+    if compression == 'DIFDUP' and _is_evenly_spaced(x):
+        y_factor = 10.0 ** -y_decimals
+        yield f"##DELTAX={(x[-1] - x[0]) / (len(x) - 1):.6f}"
+        yield f"##YFACTOR={y_factor:g}"
+        yield "##XYDATA=(X++(Y..Y))"
+        yield from iter_difdup_lines(x, np.rint(y / y_factor).astype(np.int64))
+    else:
+        # Sumbu x yang tidak berjarak sama ditulis sebagai pasangan XY
+        yield "##YFACTOR=1"
+        yield "##XYPOINTS=(XY..XY)"
+        for xi, yi in zip(x, y):
+            yield f"{xi:.6f}, {yi:.{y_decimals}f}"
+    yield "##END="
+
+def write_jcamp(file_path, spectra, compression='DIFDUP', y_decimals=6):
+    """
+    Menulis satu atau banyak spektrum ke file JCAMP-DX secara streaming.
+
+    Parameters:
+    - file_path: str, file tujuan (.jdx/.dx)
+    - spectra: iterable (x, y, metadata) (boleh generator, mis. dari iter_jcamp);
+      judul blok diambil dari metadata['TITLE'] dan satuan y dari metadata['YUNITS']
+    - compression: 'DIFDUP' atau 'AFFN'
+    - y_decimals: int, presisi ordinat
+
+    Returns:
+    - n_blocks: int, jumlah blok yang ditulis (tiap spektrum satu blok ##TITLE..##END)
+    """
+    n_blocks = 0
+    with open(file_path, 'w', encoding='latin-1', newline='\n') as f:
+        for x, y, metadata in spectra:
+            metadata = metadata or {}
+            title = metadata.get('TITLE') or f"Spektrum {n_blocks + 1}"
+            lines = iter_jcamp_block(x, y, metadata, title=title, yunits=metadata.get('YUNITS', '%T'),
+                                     compression=compression, y_decimals=y_decimals)
+            for line in lines:
+                f.write(line + '\n')
+            n_blocks += 1
+    return n_blocks
+
+def export_jcamp(data, file_path, column='%T_corrected', title=None, compression='DIFDUP'):
+    """
+    Ekspor satu kolom spektrum (default: hasil koreksi baseline) ke file JCAMP-DX.
+
+    Parameters:
+    - data: DataFrame dengan kolom 'wavenumber' dan 'column'
+    - file_path: str, file tujuan
+    - column: str, kolom intensitas yang diekspor
+    - title: str, judul blok (default: TITLE metadata atau nama file)
+    """
+    if column not in data.columns:
+        raise ValueError(f"Kolom '{column}' tidak ada pada data")
+    metadata = dict(data.attrs.get('metadata', {}))
+    metadata['TITLE'] = title or metadata.get('TITLE') or os.path.splitext(os.path.basename(file_path))[0]
+    metadata.setdefault('YUNITS', '%T')
+    return write_jcamp(file_path, [(data['wavenumber'].to_numpy(), data[column].to_numpy(), metadata)],
+                       compression=compression)
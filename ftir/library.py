@@ -0,0 +1,136 @@
+import os
+import json
+import numpy as np
+from ftir.processing import find_spectrum_files, read_spectrum_file
+
+LIBRARY_MATRIX = "spectra.npy"
+LIBRARY_GRID = "grid.npy"
+LIBRARY_INFO = "library.json"
+LIBRARY_METRICS = ('cosine', 'correlation')
+
+def make_grid(start=400.0, stop=4000.0, step=2.0):
+    """Membuat grid wavenumber bersama untuk pustaka"""
+    return np.arange(start, stop + step / 2, step)
+
+def prepare_spectra(x, Y, grid, metric='correlation'):
+    """
+    Resampling spektrum ke grid pustaka lalu normalisasi sesuai metrik.
+
+    Parameters:
+    - x: np.ndarray (n_titik,), wavenumber spektrum
+    - Y: np.ndarray (n_titik,) atau (n_spektrum x n_titik), intensitas
+    - grid: np.ndarray, grid wavenumber pustaka
+    - metric: 'cosine' (dibagi norma) atau 'correlation' (dikurangi rata-rata lalu dibagi norma)
+
+    Returns:
+    - prepared: np.ndarray float32 (n_spektrum x n_grid), baris bernorma satu sehingga
+      skor kemiripan cukup dihitung dengan perkalian matriks
+    """
+    if metric not in LIBRARY_METRICS:
+        raise ValueError(f"Metrik tidak dikenal: {metric}. Pilih salah satu dari {', '.join(LIBRARY_METRICS)}.")
+    x = np.asarray(x, dtype=np.float64)
+    Y = np.atleast_2d(np.asarray(Y, dtype=np.float64))
+    order = np.argsort(x, kind='mergesort')
+    x, Y = x[order], Y[:, order]
+
+    prepared = np.empty((len(Y), len(grid)))
+    for i, y in enumerate(Y):
+        prepared[i] = np.interp(grid, x, y)
+    if metric == 'correlation':
+        prepared -= prepared.mean(axis=1, keepdims=True)
+    norms = np.linalg.norm(prepared, axis=1, keepdims=True)
+    prepared /= np.where(norms > 0, norms, 1.0)
+    return prepared.astype(np.float32)
+
+def build_library(source, library_dir, grid=None, metric='correlation', extension='.txt'):
+    """
+    Membangun pustaka referensi dari folder atau pola glob file FTIR (.txt atau .smf).
+
+    File dibaca satu per satu dan langsung ditulis ke matriks memory-mapped,
+    sehingga pemakaian memori tidak bergantung pada ukuran pustaka.
+
+    Parameters:
+    - source: str, folder atau pola glob file referensi
+    - library_dir: str, folder tujuan pustaka
+    - grid: np.ndarray, grid wavenumber (default: make_grid())
+    - metric: 'cosine' atau 'correlation'
+    - extension: str, ekstensi file referensi bila source berupa folder
+
+    Returns:
+    - library: dict hasil open_library
+    """
+    paths = find_spectrum_files(source, extension)
+    if not paths:
+        raise FileNotFoundError(f"Tidak ada file spektrum ditemukan di: {source}")
+    grid = make_grid() if grid is None else np.asarray(grid, dtype=np.float64)
+    os.makedirs(library_dir, exist_ok=True)
+
+    matrix = np.lib.format.open_memmap(os.path.join(library_dir, LIBRARY_MATRIX), mode='w+',
+                                       dtype=np.float32, shape=(len(paths), len(grid)))
+    names = []
+    for i, path in enumerate(paths):
+        x, y, _ = read_spectrum_file(path)
+        matrix[i] = prepare_spectra(x, y, grid, metric)[0]
+        names.append(os.path.splitext(os.path.basename(path))[0])
+    matrix.flush()
+    del matrix
+
+    np.save(os.path.join(library_dir, LIBRARY_GRID), grid)
+    with open(os.path.join(library_dir, LIBRARY_INFO), 'w', encoding='utf-8') as f:
+        json.dump({"metric": metric, "names": names, "paths": paths}, f, ensure_ascii=False, indent=1)
+    return open_library(library_dir)
+
+def open_library(library_dir):
+    """Membuka pustaka tanpa memuat matriks spektrum ke RAM (memory-mapped, read-only)"""
+    with open(os.path.join(library_dir, LIBRARY_INFO), 'r', encoding='utf-8') as f:
+        info = json.load(f)
+    return {
+        "matrix": np.load(os.path.join(library_dir, LIBRARY_MATRIX), mmap_mode='r'),
+        "grid": np.load(os.path.join(library_dir, LIBRARY_GRID)),
+        "names": info["names"],
+        "metric": info["metric"],
+    }
+
+def search_library(library, x, Y, k=5, chunk_size=65536):
+    """
+    Mencari k spektrum referensi paling mirip untuk satu atau banyak spektrum.
+
+    Parameters:
+    - library: dict dari open_library/build_library
+    - x: np.ndarray, wavenumber spektrum kueri
+    - Y: np.ndarray, satu spektrum atau (n_kueri x n_titik), mis. kolom '%T_corrected'
+    - k: int, jumlah hasil teratas
+    - chunk_size: int, jumlah baris pustaka per perkalian matriks; membatasi
+      halaman memory-map yang aktif sekaligus
+
+    Returns:
+    - matches: dict dengan 'indices' dan 'scores' (n_kueri x k, terurut dari skor tertinggi)
+      serta 'names' (list nama referensi per kueri)
+    """
+    queries = prepare_spectra(x, Y, library["grid"], library["metric"])
+    matrix = library["matrix"]
+    k = min(k, len(matrix))
+    best_scores = np.full((len(queries), 0), -np.inf, dtype=np.float32)
+    best_indices = np.empty((len(queries), 0), dtype=np.int64)
+
+    for start in range(0, len(matrix), chunk_size):
+        # Skor cosine/korelasi = perkalian matriks baris-baris bernorma satu
+        scores = queries @ np.asarray(matrix[start:start + chunk_size]).T
+        indices = np.broadcast_to(np.arange(start, start + scores.shape[1]), scores.shape)
+        # Gabungkan kandidat chunk ini dengan k terbaik sebelumnya
+        scores = np.concatenate([best_scores, scores], axis=1)
+        indices = np.concatenate([best_indices, indices], axis=1)
+        if scores.shape[1] > k:
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            scores = np.take_along_axis(scores, top, axis=1)
+            indices = np.take_along_axis(indices, top, axis=1)
+        best_scores, best_indices = scores, indices
+
+    order = np.argsort(-best_scores, axis=1)
+    best_scores = np.take_along_axis(best_scores, order, axis=1)
+    best_indices = np.take_along_axis(best_indices, order, axis=1)
+    return {
+        "indices": best_indices,
+        "scores": best_scores,
+        "names": [[library["names"][i] for i in row] for row in best_indices],
+    }
@@ -1,15 +1,22 @@
+import numpy as np
+from matplotlib import colormaps
+from matplotlib.collections import LineCollection
+from matplotlib.lines import Line2D
 from ftir.utils import identify_functional_groups
+from ftir.compare import COMPARE_LABELS
+from common.plotting import decimate_minmax, attach_decimation, layout_labels
 
 def plot_raw_data(ax, data, plot_name):
     """Memplot data FTIR mentah menggunakan transmitansi"""
     if '%T' not in data.columns:
         raise ValueError("Data tidak memiliki kolom '%T'. Pastikan data telah dimuat dengan benar.")
     ax.clear()
-    ax.plot(data['wavenumber'], data['%T'], label='Data Mentah', color='blue', linewidth=1.0)
+    line, = ax.plot(data['wavenumber'], data['%T'], label='Data Mentah', color='blue', linewidth=1.0)
     ax.set_xlabel('Wavenumber (cm⁻¹)')
     ax.set_ylabel('% Transmittance')
     ax.set_title(plot_name)
     ax.invert_xaxis()  # Membalik sumbu x agar 4000 cm⁻¹ di kiri dan 400 cm⁻¹ di kanan
+    attach_decimation(ax, line, data['wavenumber'], data['%T'])
     
     # Atur rentang sumbu y dari 10 hingga maksimum
     y_min = 10
@@ -19,98 +26,179 @@ def plot_raw_data(ax, data, plot_name):
     ax.legend()
     ax.grid(True)
 
-def plot_spectrum(ax, data, peaks, plot_name, show_legend=True, show_peaks=True, show_groups=True, custom_functional_groups=None):
-    """Memplot spektrum FTIR dengan puncak dan label gabungan (angka gelombang + gugus fungsi) di bawah garis spektrum"""
+# Parameter posisi garis penunjuk dan label puncak
+LINE_LENGTH = -3  # Panjang garis penunjuk dalam satuan %T
+LABEL_OFFSET = -5  # Jarak label dari ujung garis
+
+def _draw_peak_artist(ax, data, peak, label_x_position):
+    """Garis penunjuk dan label (teks kosong) untuk satu puncak"""
+    wavenumber = data['wavenumber'].iloc[peak]
+    # Mulai dari posisi di bawah garis spektrum
+    y_start = data['%T_corrected'].iloc[peak] - 1
+    y_end = y_start + LINE_LENGTH  # Panjang garis pendek
+    tick, = ax.plot([wavenumber, wavenumber], [y_start, y_end], color='black', linestyle='-', alpha=0.5)
+    
+    # Tentukan posisi label
+    label_y_position = y_end + LABEL_OFFSET
+    
+    # Label ditampilkan secara vertikal; teksnya diisi oleh update_spectrum_artists
+    label = ax.text(label_x_position, label_y_position, "", rotation=270, fontsize=8, color='black',
+                    verticalalignment='top', horizontalalignment='center')
+    return {"wavenumber": wavenumber, "tick": tick, "label": label}
+
+def draw_spectrum_artists(ax, data, peaks, plot_name):
+    """
+    Menggambar spektrum yang dikoreksi beserta semua garis penunjuk dan label puncak satu kali.
+
+    Returns:
+    - artists: dict berisi 'line' (garis spektrum), 'peaks' (list dict per puncak dengan
+      'wavenumber', 'tick' dan 'label'), 'legend', 'decimation' (lihat attach_decimation)
+      dan 'y_data_max'. Artist ini kemudian
+      hanya diubah visibilitas/teksnya oleh update_spectrum_artists.
+    """
     if '%T_corrected' not in data.columns:
         raise ValueError("Data tidak memiliki kolom '%T_corrected'. Pastikan koreksi baseline telah dilakukan.")
     ax.clear()
-    ax.plot(data['wavenumber'], data['%T_corrected'], label='Spektrum Dikoreksi', color='blue', linewidth=1.0)
+    line, = ax.plot(data['wavenumber'], data['%T_corrected'], label='Spektrum Dikoreksi', color='blue', linewidth=1.0)
     ax.set_xlabel('Wavenumber (cm⁻¹)')
     ax.set_ylabel('% Transmittance')
     ax.set_title(plot_name)
     
-    # Gunakan custom_functional_groups jika ada, jika tidak gunakan identify_functional_groups
-    functional_groups = custom_functional_groups if custom_functional_groups is not None else identify_functional_groups(data, peaks)
-    
-    # Kelompokkan gugus fungsi berdasarkan wavenumber
-    grouped_groups = {}
-    for fg in functional_groups:
-        wavenumber = fg['wavenumber']
-        if wavenumber not in grouped_groups:
-            grouped_groups[wavenumber] = []
-        grouped_groups[wavenumber].append(fg)
-    
     # Urutkan puncak berdasarkan wavenumber untuk menangani tumpang tindih
     peak_info = [(data['wavenumber'].iloc[peak], peak) for peak in peaks]
     peak_info.sort(key=lambda x: x[0], reverse=True)  # Urutkan dari besar ke kecil (karena sumbu x terbalik)
     
-    # Tentukan parameter untuk posisi garis dan label
-    y_data_min = data['%T_corrected'].min()
-    y_data_max = data['%T_corrected'].max()
-    line_length = -3  # Panjang garis penunjuk dalam satuan %T
-    label_offset = -5  # Jarak label dari ujung garis
+    # Geser label yang tumpang tindih ke kiri (karena sumbu x terbalik)
+    label_width = 50  # Perkiraan lebar label dalam satuan wavenumber
+    label_x_positions, _ = layout_labels([wavenumber for wavenumber, _ in peak_info], label_width)
+    
+    # Tandai puncak dengan garis pendek dan label; visibilitas diatur kemudian
+    peak_artists = [_draw_peak_artist(ax, data, peak, label_x_position)
+                    for (_, peak), label_x_position in zip(peak_info, label_x_positions)]
+    
+    ax.invert_xaxis()  # Membalik sumbu x agar 4000 cm⁻¹ di kiri dan 400 cm⁻¹ di kanan
+    # Titik puncak selalu ikut digambar walaupun garis di-decimate
+    decimation = attach_decimation(ax, line, data['wavenumber'], data['%T_corrected'], keep=peaks)
+    legend = ax.legend(handles=[line])
+    ax.grid(True)
+    return {
+        "line": line,
+        "peaks": peak_artists,
+        "legend": legend,
+        "decimation": decimation,
+        "y_data_max": data['%T_corrected'].max(),
+    }
+
+def add_peak_artist(artists, data, peak):
+    """
+    Menambahkan artist satu puncak baru ke artist spektrum yang sudah ada.
+
+    Artist puncak lain tidak disentuh; label diletakkan tepat di posisi puncak
+    (tanpa menata ulang label lain). Titik puncak ikut daftar keep decimation agar
+    tetap tergambar saat zoom keluar.
+    """
+    ax = artists["line"].axes
+    entry = _draw_peak_artist(ax, data, peak, data['wavenumber'].iloc[peak])
+    artists["decimation"]["add_keep"](peak)
+    # Pertahankan urutan wavenumber menurun seperti draw_spectrum_artists
+    position = sum(1 for existing in artists["peaks"] if existing["wavenumber"] > entry["wavenumber"])
+    artists["peaks"].insert(position, entry)
+    return entry
+
+def remove_peak_artist(artists, wavenumber):
+    """Menghapus artist puncak dengan wavenumber (dibulatkan ke int) tertentu dari axes"""
+    for position, entry in enumerate(artists["peaks"]):
+        if int(entry["wavenumber"]) == int(wavenumber):
+            entry["tick"].remove()
+            entry["label"].remove()
+            return artists["peaks"].pop(position)
+    return None
+
+def update_spectrum_artists(artists, plot_name=None, show_legend=True, show_peaks=True, show_groups=True,
+                            functional_groups=None):
+    """Perbarui visibilitas dan teks artist spektrum tanpa menggambar ulang seluruh axes"""
+    ax = artists["line"].axes
+    if plot_name is not None:
+        ax.set_title(plot_name)
     
-    # Tentukan posisi dasar di bawah garis spektrum
-    base_y_positions = {}
-    for wavenumber, peak in peak_info:
-        transmittance = data['%T_corrected'].iloc[peak]
-        base_y_positions[wavenumber] = transmittance - 1  # Mulai dari posisi di bawah garis
+    # Kelompokkan gugus fungsi berdasarkan wavenumber (dibulatkan seperti pada label)
+    grouped_groups = {}
+    for fg in functional_groups or []:
+        grouped_groups.setdefault(int(fg['wavenumber']), fg['group'])
     
-    # Tandai puncak dengan garis pendek dan label gabungan jika diaktifkan
-    label_positions = []  # Simpan posisi label untuk mendeteksi tumpang tindih
-    if show_peaks or show_groups:
-        for wavenumber, peak in peak_info:
-            # Ambil posisi dasar di bawah garis
-            y_start = base_y_positions[wavenumber]
-            y_end = y_start + line_length  # Panjang garis pendek
-            
-            # Gambar garis pendek di bawah garis spektrum jika show_peaks aktif
-            if show_peaks:
-                ax.plot([wavenumber, wavenumber], [y_start, y_end], color='black', linestyle='-', alpha=0.5)
-            
-            # Tentukan posisi label
-            label_y_position = y_end + label_offset
-            label_x_position = wavenumber
-            
-            # Cek tumpang tindih dengan label sebelumnya
-            label_width = 50  # Perkiraan lebar label dalam satuan wavenumber
-            overlap = True
-            offset_idx = 0
-            while overlap:
-                overlap = False
-                for prev_x, prev_idx in label_positions:
-                    if abs(label_x_position - prev_x) < label_width:
-                        # Jika tumpang tindih, geser ke samping (ke kiri, karena sumbu x terbalik)
-                        offset_idx += 1
-                        label_x_position = wavenumber - offset_idx * label_width
-                        overlap = True
-                        break
-            
-            # Buat label gabungan (wavenumber dan gugus fungsi)
-            if show_peaks:
-                label_text = f"{int(wavenumber)} cm⁻¹"
-                if show_groups:
-                    # Cari gugus untuk wavenumber ini
-                    matching_groups = grouped_groups.get(wavenumber, [])
-                    if matching_groups:
-                        dominant_group = matching_groups[0]['group']  # Ambil gugus pertama
-                        if dominant_group:
-                            label_text = f"{int(wavenumber)} cm⁻¹: {dominant_group}"
-                
-                # Tampilkan label gabungan secara vertikal
-                ax.text(label_x_position, label_y_position, label_text, rotation=270, fontsize=8, color='black',
-                        verticalalignment='top', horizontalalignment='center')
-            
-            # Simpan posisi label untuk pemeriksaan tumpang tindih berikutnya
-            label_positions.append((label_x_position, peak))
+    for peak in artists["peaks"]:
+        peak["tick"].set_visible(show_peaks)
+        peak["label"].set_visible(show_peaks)
+        if not show_peaks:
+            continue
+        # Buat label gabungan (wavenumber dan gugus fungsi)
+        label_text = f"{int(peak['wavenumber'])} cm⁻¹"
+        dominant_group = grouped_groups.get(int(peak['wavenumber'])) if show_groups else None
+        if dominant_group:
+            label_text = f"{int(peak['wavenumber'])} cm⁻¹: {dominant_group}"
+        if peak["label"].get_text() != label_text:
+            peak["label"].set_text(label_text)
     
-    # Atur rentang sumbu y dari 10 hingga maksimum
+    # Atur rentang sumbu y dari 10 hingga maksimum (sumbu x tetap terbalik)
     y_min = 10
-    y_max = y_data_max + 5
-    max_label_space = 15 + abs(label_offset) if (show_peaks and show_groups) else 10 if show_peaks else 0
+    y_max = artists["y_data_max"] + 5
+    max_label_space = 15 + abs(LABEL_OFFSET) if (show_peaks and show_groups) else 10 if show_peaks else 0
     ax.set_ylim(y_min - max_label_space, y_max)
     
-    ax.invert_xaxis()  # Membalik sumbu x agar 4000 cm⁻¹ di kiri dan 400 cm⁻¹ di kanan
-    if show_legend:
-        ax.legend()
-    ax.grid(True)
\ No newline at end of file
+    artists["legend"].set_visible(show_legend)
+
+def plot_spectrum(ax, data, peaks, plot_name, show_legend=True, show_peaks=True, show_groups=True, custom_functional_groups=None):
+    """Memplot spektrum FTIR dengan puncak dan label gabungan (angka gelombang + gugus fungsi) di bawah garis spektrum"""
+    artists = draw_spectrum_artists(ax, data, peaks, plot_name)
+    # Gunakan custom_functional_groups jika ada, jika tidak gunakan identify_functional_groups
+    functional_groups = custom_functional_groups if custom_functional_groups is not None else identify_functional_groups(data, peaks)
+    update_spectrum_artists(artists, show_legend=show_legend, show_peaks=show_peaks, show_groups=show_groups,
+                            functional_groups=functional_groups)
+    return artists
+
+def plot_comparison(ax, comparison, mode='overlay', offset=0.0, plot_name=None):
+    """
+    Memplot hasil compare_series (overlay, selisih atau rasio) sebagai satu LineCollection.
+
+    Seluruh spektrum digambar oleh satu artist sehingga seri dengan puluhan anggota
+    tetap dirender dalam satu kali draw canvas.
+
+    Parameters:
+    - ax: matplotlib Axes
+    - comparison: dict hasil ftir.compare.compare_series
+    - mode: 'overlay', 'difference' atau 'ratio'
+    - offset: float, pergeseran vertikal antar spektrum (tampilan bertumpuk)
+    - plot_name: str, judul plot
+
+    Returns:
+    - collection: LineCollection yang digambar
+    """
+    if mode not in COMPARE_LABELS:
+        raise ValueError(f"Mode perbandingan tidak dikenal: {mode}. Pilih salah satu dari {', '.join(COMPARE_LABELS)}.")
+    key = 'spectra' if mode == 'overlay' else mode
+    values = comparison[key] + offset * np.arange(len(comparison[key]))[:, None]
+    grid = comparison['grid']
+    segments = np.stack([np.broadcast_to(grid, values.shape), values], axis=-1)
+
+    ax.clear()
+    colors = colormaps['viridis'](np.linspace(0, 0.9, len(values)))
+    collection = LineCollection(segments, colors=colors, linewidths=1.0)
+    ax.add_collection(collection)
+    ax.set_xlim(grid.max(), grid.min())  # 4000 cm⁻¹ di kiri seperti plot spektrum
+    finite = values[np.isfinite(values)]
+    if finite.size:
+        margin = 0.05 * (finite.max() - finite.min() or 1.0)
+        ax.set_ylim(finite.min() - margin, finite.max() + margin)
+    if mode != 'overlay':
+        ax.axhline(0.0 if mode == 'difference' else 1.0, color='gray', linewidth=0.8, linestyle='--')
+
+    # Legend memakai handle proxy; tidak menambah artist pada axes
+    handles = [Line2D([], [], color=color, linewidth=1.5) for color in colors]
+    labels = list(comparison['names'])
+    if mode != 'overlay':
+        labels[comparison['reference']] += " (acuan)"
+    ax.legend(handles, labels, fontsize='small', ncol=max(1, len(labels) // 12))
+    ax.set_xlabel('Wavenumber (cm⁻¹)')
+    ax.set_ylabel(COMPARE_LABELS[mode])
+    ax.set_title(plot_name or "Perbandingan Spektrum")
+    return collection
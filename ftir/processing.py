@@ -1,33 +1,559 @@
+import os
+import glob
+import hashlib
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 import pandas as pd
 import numpy as np
-from pybaselines import Baseline
+from scipy import sparse
+from scipy.linalg import solveh_banded
+from ftir.smf import read_spectrum_smf
+from ftir.jcamp import read_spectrum_jcamp
+
+def parse_header(lines):
+    """Mengurai baris header bergaya JCAMP (##KEY=VALUE) menjadi dictionary"""
+    metadata = {}
+    for line in lines:
+        line = line.strip()
+        if not line.startswith('##'):
+            continue
+        key, _, value = line[2:].partition('=')
+        metadata[key.strip().upper()] = value.strip()
+    return metadata
+
+def read_spectrum_txt(file_path):
+    """
+    Membaca satu file ekspor FTIR (.txt) dengan parser numerik format tetap.
+
+    Parameters:
+    - file_path: str, path ke file .txt
+
+    Returns:
+    - x: np.ndarray float64, wavenumber
+    - y: np.ndarray float64, %T
+    - metadata: dict, isi header (mis. {'YUNITS': '%T'})
+    """
+    with open(file_path, 'r', encoding='latin-1') as f:
+        text = f.read()
+
+    # Pisahkan baris header '##' di awal file dari blok angka
+    header_lines = []
+    start = 0
+    while text.startswith('##', start):
+        end = text.find('\n', start)
+        if end == -1:
+            end = len(text)
+        header_lines.append(text[start:end])
+        start = end + 1
+
+    # Blok angka hanya berisi pasangan "x y" yang dipisahkan spasi/baris baru,
+    # sehingga bisa dibaca langsung tanpa tokenizer pandas
+    values = np.fromstring(text[start:], dtype=np.float64, sep=' ')
+    if values.size % 2 != 0:
+        raise ValueError(f"Format data tidak valid pada file: {file_path}")
+    values = values.reshape(-1, 2)
+
+    metadata = parse_header(header_lines)
+    metadata['FILE'] = os.path.basename(file_path)
+    return np.ascontiguousarray(values[:, 0]), np.ascontiguousarray(values[:, 1]), metadata
+
+# Pembaca per ekstensi file; semuanya mengembalikan (x, y, metadata)
+SPECTRUM_READERS = {
+    '.txt': read_spectrum_txt,
+    '.smf': read_spectrum_smf,
+    '.jdx': read_spectrum_jcamp,
+    '.dx': read_spectrum_jcamp,
+    '.jcamp': read_spectrum_jcamp,
+}
+
+def read_spectrum_file(file_path):
+    """Membaca satu file spektrum FTIR dengan pembaca yang sesuai ekstensinya"""
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension not in SPECTRUM_READERS:
+        raise ValueError(f"Format file tidak didukung: {file_path}")
+    return SPECTRUM_READERS[extension](file_path)
 
 def load_data(file_path):
-    """Memuat data FTIR dari file .txt"""
-    data = pd.read_csv(file_path, sep='\s+', skiprows=1, header=None, names=['wavenumber', '%T'])
+    """Memuat data FTIR dari file .txt, .smf atau JCAMP-DX (.jdx/.dx)"""
+    x, y, metadata = read_spectrum_file(file_path)
+    data = pd.DataFrame({'wavenumber': x, '%T': y})
+    data.attrs['metadata'] = metadata
     return data
 
-def baseline_correction(data):
-    """Menerapkan koreksi baseline menggunakan pybaselines"""
+def find_spectrum_files(source, extension='.txt'):
+    """Mencari file spektrum dari folder atau pola glob, terurut berdasarkan nama"""
+    if os.path.isdir(source):
+        pattern = os.path.join(source, f"*{extension}")
+    else:
+        pattern = source
+    return sorted(glob.glob(pattern))
+
+def load_folder(source, max_workers=None, extension='.txt'):
+    """
+    Memuat banyak file FTIR sekaligus dari folder atau pola glob secara paralel.
+
+    Parameters:
+    - source: str, path folder (semua file berekstensi 'extension' di dalamnya) atau pola glob
+    - max_workers: int, jumlah proses (default: jumlah CPU)
+    - extension: str, '.txt' (ekspor teks), '.smf' (file biner instrumen) atau '.jdx'/'.dx' (JCAMP-DX)
+
+    Returns:
+    - batch: dict dengan kunci
+        'paths': list path file
+        'names': list nama sampel (nama file tanpa ekstensi)
+        'wavenumber': np.ndarray (n_spektrum x n_titik) float64 kontigu
+        '%T': np.ndarray (n_spektrum x n_titik) float64 kontigu
+        'lengths': np.ndarray jumlah titik asli tiap spektrum
+        'metadata': list dictionary header tiap file
+      Spektrum yang lebih pendek diisi NaN di bagian akhir.
+    """
+    paths = find_spectrum_files(source, extension)
+    if not paths:
+        raise FileNotFoundError(f"Tidak ada file spektrum ditemukan di: {source}")
+
+    # Untuk file sedikit, biaya membuat process pool lebih besar daripada parsing
+    if len(paths) == 1 or max_workers == 1:
+        results = [read_spectrum_file(path) for path in paths]
+    else:
+        chunksize = max(1, len(paths) // (4 * (max_workers or os.cpu_count() or 1)))
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(read_spectrum_file, paths, chunksize=chunksize))
+    return stack_spectra(paths, results)
+
+def stack_spectra(paths, results):
+    """
+    Menyusun hasil read_spectrum_file menjadi batch seperti load_folder.
+
+    Parameters:
+    - paths: list path file
+    - results: list (wavenumber, %T, metadata) sesuai urutan paths
+
+    Returns:
+    - batch: dict dengan kunci yang sama seperti load_folder
+    """
+    lengths = np.array([len(x) for x, _, _ in results], dtype=np.int64)
+    n_points = int(lengths.max())
+    wavenumber = np.full((len(paths), n_points), np.nan)
+    transmittance = np.full((len(paths), n_points), np.nan)
+    for i, (x, y, _) in enumerate(results):
+        wavenumber[i, :len(x)] = x
+        transmittance[i, :len(y)] = y
+
+    return {
+        'paths': paths,
+        'names': [os.path.splitext(os.path.basename(path))[0] for path in paths],
+        'wavenumber': wavenumber,
+        '%T': transmittance,
+        'lengths': lengths,
+        'metadata': [metadata for _, _, metadata in results],
+    }
+
+# Cache matriks penalti AsLS (bentuk banded bawah) per (jumlah titik, orde diferensial)
+_PENALTY_CACHE = {}
+# Cache hasil baseline per (hash data, lam, p) dan bobot terakhir per hash data
+_BASELINE_CACHE = OrderedDict()
+_WARM_START_CACHE = OrderedDict()
+_CACHE_SIZE = 64
+
+def cache_put(cache, key, value):
+    """Simpan nilai ke cache LRU dan buang entri tertua jika penuh"""
+    cache[key] = value
+    cache.move_to_end(key)
+    while len(cache) > _CACHE_SIZE:
+        cache.popitem(last=False)
+
+def clear_caches():
+    """Mengosongkan cache matriks penalti, hasil baseline dan bobot warm start"""
+    _PENALTY_CACHE.clear()
+    _BASELINE_CACHE.clear()
+    _WARM_START_CACHE.clear()
+
+def data_hash(y):
+    """Hash isi array untuk kunci cache"""
+    return hashlib.blake2b(np.ascontiguousarray(y, dtype=np.float64).tobytes(), digest_size=16).hexdigest()
+
+def penalty_matrix(n_points, diff_order=2):
+    """
+    Mengambil matriks penalti D'D untuk AsLS dalam bentuk banded bawah (untuk solveh_banded).
+
+    Penalti hanya bergantung pada jumlah titik dan orde diferensial, sehingga
+    dibangun sekali dan dipakai ulang untuk semua spektrum dengan panjang yang sama.
+    """
+    key = (n_points, diff_order)
+    if key not in _PENALTY_CACHE:
+        D = sparse.eye(n_points, format='csr')
+        for _ in range(diff_order):
+            D = D[1:] - D[:-1]
+        DtD = (D.T @ D).tocsr()
+        banded = np.zeros((diff_order + 1, n_points))
+        for k in range(diff_order + 1):
+            banded[k, :n_points - k] = DtD.diagonal(k)
+        banded.setflags(write=False)
+        _PENALTY_CACHE[key] = banded
+    return _PENALTY_CACHE[key]
+
+def _asls(Y, lam, p, weights=None, max_iter=50, tol=1e-3):
+    """
+    Iterasi AsLS (Eilers) untuk satu atau banyak spektrum sekaligus; hasil sama dengan pybaselines.asls.
+
+    Semua spektrum aktif disusun menjadi satu sistem banded blok-diagonal sehingga
+    tiap iterasi cukup satu pemanggilan solveh_banded. Spektrum yang sudah konvergen
+    dikeluarkan dari sistem pada iterasi berikutnya.
+    """
+    n_spectra, n_points = Y.shape
+    penalty = lam * penalty_matrix(n_points)
+    if weights is not None and np.shape(weights) != Y.shape:
+        raise ValueError(f"Ukuran bobot {np.shape(weights)} tidak sesuai dengan data {Y.shape}.")
+    W = np.ones_like(Y) if weights is None else np.array(weights, dtype=np.float64)
+    Z = np.empty_like(Y)
+    active = np.arange(n_spectra)
+    for _ in range(max_iter + 1):
+        y = Y[active]
+        w = W[active]
+        # Penalti yang di-tile otomatis tidak mengkopel blok yang bersebelahan,
+        # karena diagonal bawah bentuk banded bernilai nol di akhir tiap blok
+        system = np.tile(penalty, len(active))
+        system[0] += w.ravel()
+        z = solveh_banded(system, (w * y).ravel(), overwrite_ab=True, overwrite_b=True,
+                          lower=True, check_finite=False).reshape(y.shape)
+        new_w = np.where(y > z, p, 1 - p)
+        difference = (np.linalg.norm(w - new_w, axis=1)
+                      / np.maximum(np.linalg.norm(w, axis=1), np.finfo(float).eps))
+        Z[active] = z
+        converged = difference < tol
+        W[active[~converged]] = new_w[~converged]
+        active = active[~converged]
+        if active.size == 0:
+            break
+    return Z, Y > Z
+
+def _sort_order(x):
+    """Urutan indeks untuk mengurutkan wavenumber naik, atau None jika sudah terurut"""
+    if x is None:
+        return None
+    order = np.argsort(x, kind='mergesort')
+    if np.all(order[1:] > order[:-1]):
+        return None
+    return order
+
+def asls_baseline(y, lam=1e3, p=0.01, x=None, weights=None, return_weights=False, max_iter=50):
+    """
+    Menghitung baseline AsLS dengan cache.
+
+    Parameters:
+    - y: np.ndarray, intensitas (%T)
+    - lam: float, parameter kehalusan
+    - p: float, faktor asimetri (0 < p < 1)
+    - x: np.ndarray, wavenumber (opsional); data diurutkan menurut x sebelum
+      dihitung, sama seperti pybaselines.Baseline(x_data=x)
+    - weights: np.ndarray (n_titik,), bobot awal warm start eksplisit (urutan data asli),
+      mis. bobot akhir spektrum sebelumnya pada aliran frame; cache tidak dipakai
+    - return_weights: bool, kembalikan juga bobot akhir untuk warm start berikutnya
+    - max_iter: int, batas iterasi reweighting
+
+    Returns:
+    - baseline: np.ndarray (read-only), hasil AsLS
+    - weights: np.ndarray (n_titik,) bobot akhir (urutan data asli), hanya bila
+      return_weights=True
+
+    Hasil untuk kombinasi (data, lam, p) yang sama diambil langsung dari cache.
+    Untuk data yang sama dengan lam/p berbeda, iterasi dimulai dari bobot hasil
+    perhitungan sebelumnya (warm start) sehingga konvergen lebih cepat.
+    """
+    if not 0 < p < 1:
+        raise ValueError("Parameter p harus berada di antara 0 dan 1.")
+    y = np.asarray(y, dtype=np.float64)
+    order = _sort_order(x)
+    if order is not None:
+        y = y[order]
+    if weights is not None or return_weights:
+        # Warm start eksplisit: data berubah tiap panggilan sehingga cache tidak berguna
+        if weights is not None:
+            weights = np.asarray(weights, dtype=np.float64)
+            weights = (weights[order] if order is not None else weights)[np.newaxis]
+        baseline, above = _asls(y[np.newaxis], lam, p, weights=weights, max_iter=max_iter)
+        baseline, final = baseline[0], np.where(above[0], p, 1 - p)
+        if order is not None:
+            baseline[order], final[order] = baseline.copy(), final.copy()
+        baseline.setflags(write=False)
+        return (baseline, final) if return_weights else baseline
+    data_key = data_hash(y)
+    key = (data_key, float(lam), float(p))
+    if key in _BASELINE_CACHE:
+        _BASELINE_CACHE.move_to_end(key)
+        baseline = _BASELINE_CACHE[key]
+    else:
+        # Warm start: titik yang sebelumnya berada di atas baseline mendapat bobot p
+        weights = None
+        if data_key in _WARM_START_CACHE:
+            weights = np.where(_WARM_START_CACHE[data_key], p, 1 - p)
+
+        # above disimpan berbentuk (1, n_titik) agar bobot warm start cocok dengan y[np.newaxis]
+        baseline, above = _asls(y[np.newaxis], lam, p, weights=weights, max_iter=max_iter)
+        baseline = baseline[0]
+        baseline.setflags(write=False)
+        cache_put(_BASELINE_CACHE, key, baseline)
+        cache_put(_WARM_START_CACHE, data_key, above)
+
+    if order is not None:
+        # Kembalikan ke urutan data asli
+        unsorted = np.empty_like(baseline)
+        unsorted[order] = baseline
+        unsorted.setflags(write=False)
+        return unsorted
+    return baseline
+
+def baseline_correction_many(x, Y, lam=1e3, p=0.01, max_workers=None):
+    """
+    Koreksi baseline AsLS untuk banyak spektrum dengan sumbu wavenumber yang sama.
+
+    Parameters:
+    - x: np.ndarray (n_titik,), wavenumber bersama
+    - Y: np.ndarray (n_spektrum x n_titik), %T tiap spektrum (mis. batch['%T'] dari load_folder)
+    - lam: float, parameter kehalusan
+    - p: float, faktor asimetri (0 < p < 1)
+    - max_workers: int, jumlah thread (default: jumlah CPU)
+
+    Returns:
+    - Y_corrected: np.ndarray (n_spektrum x n_titik), setara kolom '%T_corrected'
+      dari baseline_correction untuk tiap baris
+    """
+    if not 0 < p < 1:
+        raise ValueError("Parameter p harus berada di antara 0 dan 1.")
+    x = np.asarray(x, dtype=np.float64)
+    Y = np.atleast_2d(np.asarray(Y, dtype=np.float64))
+    if Y.shape[1] != len(x):
+        raise ValueError(f"Jumlah titik spektrum ({Y.shape[1]}) tidak sesuai dengan panjang wavenumber ({len(x)}).")
+    if np.any(np.isnan(Y)):
+        raise ValueError("Data mengandung nilai NaN. Pastikan semua spektrum memiliki panjang dan sumbu yang sama.")
+
+    order = _sort_order(x)
+    if order is not None:
+        Y = Y[:, order]
+    Y = np.ascontiguousarray(Y)
+
+    # Bagi baris ke beberapa thread; tiap blok diselesaikan sebagai satu sistem banded
+    n_workers = max_workers or os.cpu_count() or 1
+    n_chunks = min(n_workers, len(Y))
+    chunks = np.array_split(np.arange(len(Y)), n_chunks)
+    corrected = np.empty_like(Y)
+
+    def solve_chunk(rows):
+        corrected[rows] = _asls(Y[rows], lam, p)[0]
+
+    if n_chunks == 1:
+        solve_chunk(chunks[0])
+    else:
+        with ThreadPoolExecutor(max_workers=n_chunks) as executor:
+            list(executor.map(solve_chunk, chunks))
+
+    if order is not None:
+        unsorted = np.empty_like(corrected)
+        unsorted[:, order] = corrected
+        return unsorted
+    return corrected
+
+def baseline_correction_batch(batch, lam=1e3, p=0.01, max_workers=None):
+    """
+    Koreksi baseline untuk hasil load_folder; spektrum bersumbu sama diselesaikan bersama.
+
+    Returns:
+    - batch: dict baru berisi kunci yang sama ditambah '%T_corrected'
+      (n_spektrum x n_titik, diisi NaN di bagian akhir seperti '%T')
+    """
+    corrected = np.full_like(batch['%T'], np.nan)
+    groups = {}
+    for i, n in enumerate(batch['lengths']):
+        groups.setdefault(data_hash(batch['wavenumber'][i, :n]), []).append(i)
+    for members in groups.values():
+        n = batch['lengths'][members[0]]
+        corrected[members, :n] = baseline_correction_many(batch['wavenumber'][members[0], :n],
+                                                          batch['%T'][members, :n], lam=lam, p=p,
+                                                          max_workers=max_workers)
+    return {**batch, '%T_corrected': corrected}
+
+def baseline_correction(data, lam=1e3, p=0.01):
+    """Menerapkan koreksi baseline AsLS (lam=1e3 dan p=0.01 adalah parameter default yang umum untuk FTIR)"""
     # Ambil data %T dan pastikan tidak ada NaN
     y = data['%T'].values
     if np.any(np.isnan(y)):
         raise ValueError("Data mengandung nilai NaN. Pastikan data valid sebelum koreksi baseline.")
-    
+
     # Ambil wavenumber sebagai x_data untuk baseline correction
     x = data['wavenumber'].values
-    
-    # Inisialisasi objek Baseline
-    baseline_fitter = Baseline(x_data=x)
-    
-    # Terapkan koreksi baseline dengan asls
-    # lam=1e3 dan p=0.01 adalah parameter default yang umum untuk FTIR
-    y_corrected, baseline = baseline_fitter.asls(y, lam=1e3, p=0.01)
-    
-    # Pastikan panjang y_corrected sesuai dengan data asli
-    if len(y_corrected) != len(y):
-        raise ValueError(f"Panjang data yang dikoreksi ({len(y_corrected)}) tidak sesuai dengan data asli ({len(y)}).")
-    
-    corrected_data = data.copy()
-    corrected_data['%T_corrected'] = y_corrected
-    return corrected_data
\ No newline at end of file
+    y_corrected = asls_baseline(y, lam=lam, p=p, x=x)
+
+    # Salinan dangkal: kolom wavenumber dan %T dipakai bersama dengan data asli
+    corrected_data = data.copy(deep=False)
+    corrected_data['%T_corrected'] = y_corrected.copy()
+    return corrected_data
+
+TUNING_OBJECTIVES = ('bands', 'smoothness')
+
+def baseline_score(y, baseline, objective='bands', weight=1.0, band_weight=4.0):
+    """
+    Skor kualitas hasil AsLS (makin kecil makin baik), tanpa satuan.
+
+    Di repo ini kolom '%T_corrected' berisi keluaran AsLS itu sendiri, yaitu spektrum
+    yang dihaluskan dan tetap harus memuat pita serapan. Pita FTIR dalam %T mengarah
+    ke bawah, sehingga yang paling penting dipertahankan adalah titik-titik ber-%T
+    rendah (dasar pita), bukan kontinum di atasnya.
+
+    - fidelity: residual kuadrat rata-rata relatif terhadap varians data, dibobot
+      1 + band_weight * kedalaman (0 di %T maksimum, 1 di %T minimum)
+    - roughness: energi turunan kedua kurva relatif terhadap data (1 = ikut derau,
+      0 = sangat halus)
+    - 'bands': fidelity + weight * roughness
+    - 'smoothness': roughness + weight * fidelity
+    """
+    if objective not in TUNING_OBJECTIVES:
+        raise ValueError(f"Objektif tidak dikenal: {objective}. Pilih salah satu dari {', '.join(TUNING_OBJECTIVES)}.")
+    residual = y - baseline
+    scale = max(np.var(y), np.finfo(float).tiny)
+    depth = (np.max(y) - y) / max(np.ptp(y), np.finfo(float).tiny)
+    fidelity = np.mean((1 + band_weight * depth) * residual ** 2) / scale
+    roughness = np.sum(np.diff(baseline, 2) ** 2) / max(np.sum(np.diff(y, 2) ** 2), np.finfo(float).tiny)
+    if objective == 'bands':
+        return fidelity + weight * roughness
+    return roughness + weight * fidelity
+
+def _score_candidates(args):
+    """
+    Pekerja proses: menilai sederet kandidat (lam, p) untuk satu spektrum terurut.
+
+    Kandidat dievaluasi berurutan dan tiap solusi AsLS dimulai dari bobot kandidat
+    sebelumnya (warm start); matriks penalti diambil dari cache.
+    """
+    y, candidates, objective, weight = args
+    scores = []
+    above = None
+    for lam, p in candidates:
+        weights = None if above is None else np.where(above, p, 1 - p)
+        baseline, above = _asls(y[np.newaxis], lam, p, weights=weights)
+        scores.append(baseline_score(y, baseline[0], objective, weight))
+    return scores
+
+def _candidate_grid(lam_range, p_range, n_lam, n_p):
+    """Grid kandidat log-spasi, diurutkan per p lalu lam agar warm start efektif"""
+    lams = np.geomspace(lam_range[0], lam_range[1], n_lam)
+    ps = np.geomspace(p_range[0], p_range[1], n_p)
+    return [(float(lam), float(p)) for p in ps for lam in lams]
+
+def tune_baseline(y, x=None, lam_range=(1e2, 1e8), p_range=(1e-3, 1e-1), n_lam=7, n_p=5,
+                  objective='bands', weight=1.0, refine=2, max_workers=1):
+    """
+    Mencari parameter AsLS (lam, p) terbaik secara otomatis.
+
+    Pencarian dua tahap: grid kasar log-spasi, lalu beberapa putaran penghalusan 3x3 di
+    sekitar kandidat terbaik dengan langkah yang makin kecil. Kandidat di tepi grid kasar
+    tidak dipilih sebagai titik awal penghalusan: optimum di tepi berarti rentang
+    pencarian tidak memuat optimum sebenarnya, sehingga penghalusan dimulai dari kandidat
+    interior terbaik dan kandidat penghalusan dibatasi di dalam rentang (tidak di tepi).
+
+    Parameters:
+    - y: np.ndarray, intensitas (%T)
+    - x: np.ndarray, wavenumber (opsional; data diurutkan seperti asls_baseline)
+    - lam_range, p_range: tuple (min, max) ruang pencarian
+    - n_lam, n_p: int, ukuran grid kasar
+    - objective: 'bands' atau 'smoothness' (lihat baseline_score)
+    - weight: float, bobot suku kedua objektif
+    - refine: int, jumlah putaran penghalusan
+    - max_workers: int, jumlah proses untuk grid kasar (1 = tanpa process pool)
+
+    Returns:
+    - result: dict {'lam', 'p', 'score', 'baseline' (urutan data asli),
+      'candidates': DataFrame kolom lam, p, score}
+    """
+    if not (0 < p_range[0] <= p_range[1] < 1):
+        raise ValueError("Rentang p harus berada di antara 0 dan 1.")
+    if n_lam < 3 or n_p < 3:
+        raise ValueError("Grid kasar membutuhkan minimal 3 nilai lam dan 3 nilai p.")
+    y = np.asarray(y, dtype=np.float64)
+    if np.any(np.isnan(y)):
+        raise ValueError("Data mengandung nilai NaN. Pastikan data valid sebelum koreksi baseline.")
+    order = _sort_order(x)
+    y_sorted = y[order] if order is not None else y
+
+    candidates = _candidate_grid(lam_range, p_range, n_lam, n_p)
+    if max_workers == 1:
+        scores = _score_candidates((y_sorted, candidates, objective, weight))
+    else:
+        # Satu tugas per nilai p: kandidat lam di dalamnya saling warm start
+        tasks = [(y_sorted, candidates[i:i + n_lam], objective, weight) for i in range(0, len(candidates), n_lam)]
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            scores = [score for chunk in executor.map(_score_candidates, tasks) for score in chunk]
+
+    # Kandidat diurutkan per p lalu lam (lihat _candidate_grid); tepi grid tidak dipilih
+    grid_scores = np.reshape(scores, (n_p, n_lam))
+    interior = grid_scores[1:-1, 1:-1]
+    i_p, i_lam = np.unravel_index(int(np.argmin(interior)), interior.shape)
+    best = (i_p + 1) * n_lam + (i_lam + 1)
+
+    lam_step = np.log10(lam_range[1] / lam_range[0]) / (n_lam - 1)
+    p_step = np.log10(p_range[1] / p_range[0]) / (n_p - 1)
+    for _ in range(refine):
+        lam, p = candidates[best]
+        lam_step, p_step = lam_step / 2, p_step / 2
+        local = [(float(lam * 10 ** (i * lam_step)), float(p * 10 ** (j * p_step)))
+                 for j in (-1, 0, 1) for i in (-1, 0, 1)]
+        local = [(lam, p) for lam, p in dict.fromkeys(local)
+                 if lam_range[0] < lam < lam_range[1] and p_range[0] < p < p_range[1] and (lam, p) not in candidates]
+        local_scores = _score_candidates((y_sorted, local, objective, weight))
+        if local_scores and min(local_scores) < scores[best]:
+            best = len(candidates) + int(np.argmin(local_scores))
+        candidates += local
+        scores += local_scores
+
+    lam, p = candidates[best]
+    return {
+        'lam': lam,
+        'p': p,
+        'score': float(scores[best]),
+        'baseline': asls_baseline(y, lam=lam, p=p, x=x),
+        'candidates': pd.DataFrame(candidates, columns=['lam', 'p']).assign(score=scores),
+    }
+
+def _tune_row(args):
+    """Pekerja proses: tuning satu spektrum batch"""
+    x, y, options = args
+    result = tune_baseline(y, x, max_workers=1, **options)
+    return result['lam'], result['p'], result['score'], np.array(result['baseline'])
+
+def tune_baseline_many(x, Y, max_workers=None, **options):
+    """
+    Tuning (lam, p) untuk banyak spektrum secara paralel (satu spektrum per tugas).
+
+    Parameters:
+    - x: np.ndarray (n_titik,), wavenumber bersama
+    - Y: np.ndarray (n_spektrum x n_titik), %T
+    - max_workers: int, jumlah proses (default: jumlah CPU)
+    - options: argumen tune_baseline (lam_range, p_range, objective, ...)
+
+    Returns:
+    - result: dict {'lam', 'p', 'score' (array per spektrum), 'baselines' (n_spektrum x n_titik)}
+    """
+    Y = np.atleast_2d(np.asarray(Y, dtype=np.float64))
+    tasks = [(x, y, options) for y in Y]
+    if len(tasks) == 1 or max_workers == 1:
+        results = [_tune_row(task) for task in tasks]
+    else:
+        chunksize = max(1, len(tasks) // (4 * (max_workers or os.cpu_count() or 1)))
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(_tune_row, tasks, chunksize=chunksize))
+    return {
+        'lam': np.array([r[0] for r in results]),
+        'p': np.array([r[1] for r in results]),
+        'score': np.array([r[2] for r in results]),
+        'baselines': np.vstack([r[3] for r in results]),
+    }
+
+def auto_baseline_correction(data, **options):
+    """
+    Koreksi baseline dengan (lam, p) hasil tune_baseline.
+
+    Returns:
+    - corrected_data: DataFrame seperti baseline_correction
+    - result: dict hasil tune_baseline (lam, p, score, candidates)
+    """
+    result = tune_baseline(data['%T'].values, data['wavenumber'].values, **options)
+    return baseline_correction(data, lam=result['lam'], p=result['p']), result
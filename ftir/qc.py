@@ -0,0 +1,169 @@
+import numpy as np
+import pandas as pd
+from ftir.processing import load_folder
+
+QC_LANES = ('pass', 'warn', 'reject')
+
+# Batas (warn, reject) tiap metrik QC. Untuk 'coverage' nilai yang lebih kecil lebih buruk.
+QC_LIMITS = {
+    'noise': (0.1, 0.5),  # simpangan baku derau (%T), estimasi robust dari turunan kedua
+    'saturation': (0.01, 0.05),  # fraksi titik jenuh/terpotong
+    'coverage': (0.9, 0.6),  # fraksi rentang target yang tercakup sumbu wavenumber
+    'non_monotonic': (0.0, 0.01),  # fraksi langkah sumbu yang melawan arah dominan
+    'non_finite': (0.0, 0.0),  # fraksi titik NaN/inf (ditolak bila ada)
+}
+QC_RANGE = (400.0, 4000.0)
+SATURATION_LEVEL = 1.0  # %T di bawah nilai ini dianggap serapan jenuh
+MIN_POINTS = 16
+
+def qc_metrics(wavenumber, transmittance, lengths=None, target_range=QC_RANGE, saturation_level=SATURATION_LEVEL):
+    """
+    Menghitung metrik QC untuk seluruh batch bertumpuk dalam satu lintasan vektor.
+
+    Parameters:
+    - wavenumber: np.ndarray (n_spektrum x n_titik), boleh diisi NaN di bagian akhir
+    - transmittance: np.ndarray (n_spektrum x n_titik), %T
+    - lengths: np.ndarray, jumlah titik asli tiap baris (default: semua kolom)
+    - target_range: (min, max) rentang wavenumber yang diharapkan
+    - saturation_level: float, batas %T serapan jenuh
+
+    Returns:
+    - metrics: dict array per spektrum: 'n_points', 'noise', 'saturation', 'coverage',
+      'non_monotonic', 'non_finite'
+    """
+    X = np.atleast_2d(np.asarray(wavenumber, dtype=np.float64))
+    Y = np.atleast_2d(np.asarray(transmittance, dtype=np.float64))
+    n_spectra, n_columns = X.shape
+    lengths = np.full(n_spectra, n_columns) if lengths is None else np.asarray(lengths, dtype=np.int64)
+    inside = np.arange(n_columns) < lengths[:, None]
+    finite = inside & np.isfinite(X) & np.isfinite(Y)
+    n_finite = finite.sum(axis=1)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        # Sumbu monoton: langkah yang melawan arah dominan (atau nol) di dalam panjang asli
+        step = np.diff(X, axis=1)
+        step_valid = finite[:, 1:] & finite[:, :-1]
+        rising = (step > 0) & step_valid
+        falling = (step < 0) & step_valid
+        flat = (step == 0) & step_valid
+        reversed_steps = np.minimum(rising.sum(axis=1), falling.sum(axis=1)) + flat.sum(axis=1)
+        non_monotonic = reversed_steps / np.maximum(step_valid.sum(axis=1), 1)
+
+        # Urutkan tiap baris menurut wavenumber (titik tidak valid ke belakang) sebelum
+        # menghitung metrik yang bergantung pada tetangga
+        order = np.argsort(np.where(finite, X, np.inf), axis=1, kind='mergesort')
+        Xs = np.take_along_axis(np.where(finite, X, np.nan), order, axis=1)
+        Ys = np.take_along_axis(np.where(finite, Y, np.nan), order, axis=1)
+
+        low = np.nanmin(Xs, axis=1)
+        high = np.nanmax(Xs, axis=1)
+        covered = np.minimum(high, target_range[1]) - np.maximum(low, target_range[0])
+        coverage = np.clip(covered / (target_range[1] - target_range[0]), 0.0, 1.0)
+
+        # Derau: MAD turunan kedua (sinyal halus hampir hilang), diskalakan ke simpangan baku
+        d2 = Ys[:, 2:] - 2 * Ys[:, 1:-1] + Ys[:, :-2]
+        noise = 1.4826 * np.nanmedian(np.abs(d2 - np.nanmedian(d2, axis=1, keepdims=True)), axis=1) / np.sqrt(6)
+
+        # Saturasi: titik di bawah batas %T, ditambah dataran datar di nilai minimum/maksimum
+        # baris (detektor terpotong); satu-dua titik ekstrem dianggap wajar
+        y_min = np.nanmin(Ys, axis=1, keepdims=True)
+        y_max = np.nanmax(Ys, axis=1, keepdims=True)
+        at_min = (Ys == y_min).sum(axis=1)
+        at_max = (Ys == y_max).sum(axis=1)
+        below = (Ys <= saturation_level).sum(axis=1)
+        clipped = np.where(at_min > 2, at_min, 0) * (y_min[:, 0] > saturation_level) + np.where(at_max > 2, at_max, 0)
+        saturation = (below + clipped) / np.maximum(n_finite, 1)
+
+    return {
+        'n_points': lengths,
+        'noise': noise,
+        'saturation': saturation,
+        'coverage': np.where(n_finite > 0, coverage, 0.0),
+        'non_monotonic': non_monotonic,
+        'non_finite': (lengths - n_finite) / np.maximum(lengths, 1),
+    }
+
+def classify(metrics, limits=None, min_points=MIN_POINTS):
+    """
+    Menentukan lajur QC (pass/warn/reject) dan alasannya dari metrik qc_metrics.
+
+    Returns:
+    - lanes: np.ndarray str, lajur per spektrum
+    - reasons: list str, alasan dipisah '; ' (kosong untuk pass)
+    """
+    limits = {**QC_LIMITS, **(limits or {})}
+    n_spectra = len(metrics['n_points'])
+    severity = np.zeros(n_spectra, dtype=np.int64)
+    reasons = [[] for _ in range(n_spectra)]
+
+    checks = []
+    for name, (warn, reject) in limits.items():
+        values = np.nan_to_num(metrics[name], nan=np.inf if name != 'coverage' else 0.0)
+        if name == 'coverage':
+            checks.append((name, values, values < warn, values < reject))
+        else:
+            checks.append((name, values, values > warn, values > reject))
+    too_short = metrics['n_points'] < min_points
+    checks.append(('n_points', metrics['n_points'], too_short, too_short))
+
+    for name, values, warned, rejected in checks:
+        level = np.where(rejected, 2, np.where(warned, 1, 0))
+        severity = np.maximum(severity, level)
+        for i in np.flatnonzero(level):
+            reasons[i].append(f"{name}={values[i]:.3g}" + (" (tolak)" if level[i] == 2 else ""))
+    return np.array(QC_LANES)[severity], ["; ".join(reason) for reason in reasons]
+
+def screen_batch(batch, limits=None, target_range=QC_RANGE, saturation_level=SATURATION_LEVEL):
+    """
+    QC awal untuk hasil load_folder sebelum koreksi baseline dan analisis puncak.
+
+    Parameters:
+    - batch: dict hasil load_folder
+    - limits: dict {metrik: (warn, reject)} untuk mengganti sebagian QC_LIMITS
+    - target_range, saturation_level: lihat qc_metrics
+
+    Returns:
+    - report: DataFrame satu baris per spektrum (indeks nama sampel) dengan kolom metrik,
+      'lane' ('pass', 'warn' atau 'reject') dan 'reasons'
+    """
+    metrics = qc_metrics(batch['wavenumber'], batch['%T'], batch['lengths'], target_range, saturation_level)
+    lanes, reasons = classify(metrics, limits)
+    report = pd.DataFrame(metrics, index=pd.Index(batch['names'], name='sample'))
+    report['lane'] = lanes
+    report['reasons'] = reasons
+    return report
+
+def split_batch(batch, report, lanes=('pass', 'warn')):
+    """
+    Mengambil sub-batch berisi spektrum pada lajur tertentu (default: yang layak diproses).
+
+    Returns:
+    - subset: dict dengan kunci yang sama seperti load_folder
+    """
+    keep = np.flatnonzero(np.isin(report['lane'].to_numpy(), lanes))
+    subset = {key: [value[i] for i in keep] for key, value in batch.items() if isinstance(value, list)}
+    subset.update({key: value[keep] for key, value in batch.items() if isinstance(value, np.ndarray)})
+    if len(keep):
+        # Buang kolom padding yang tidak lagi dipakai baris mana pun
+        n_points = int(subset['lengths'].max())
+        subset['wavenumber'] = np.ascontiguousarray(subset['wavenumber'][:, :n_points])
+        subset['%T'] = np.ascontiguousarray(subset['%T'][:, :n_points])
+    return subset
+
+def screen_spectrum(data, limits=None):
+    """QC untuk satu DataFrame spektrum; mengembalikan (lane, reasons)"""
+    metrics = qc_metrics(data['wavenumber'].to_numpy(), data['%T'].to_numpy())
+    lanes, reasons = classify(metrics, limits)
+    return str(lanes[0]), reasons[0]
+
+def screen_folder(source, extension='.txt', max_workers=None, limits=None):
+    """
+    Memuat satu folder lalu memilah spektrum ke lajur pass/warn/reject.
+
+    Returns:
+    - lanes: dict {'pass': sub-batch, 'warn': sub-batch, 'reject': sub-batch}
+    - report: DataFrame hasil screen_batch
+    """
+    batch = load_folder(source, max_workers=max_workers, extension=extension)
+    report = screen_batch(batch, limits)
+    return {lane: split_batch(batch, report, (lane,)) for lane in QC_LANES}, report
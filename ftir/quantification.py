@@ -0,0 +1,133 @@
+import numpy as np
+import pandas as pd
+from ftir.processing import data_hash, load_folder
+from ftir.qc import screen_batch, split_batch
+
+# Jendela pita bawaan (cm⁻¹) untuk kuantifikasi cepat
+DEFAULT_WINDOWS = {
+    'O-H stretching': (3000.0, 3700.0),
+    'H-O-H bending': (1580.0, 1680.0),
+    'M-O lattice': (400.0, 700.0),
+}
+
+def to_absorbance(T, percent=True):
+    """Konversi transmitansi ke absorbansi A = -log10(T); nilai T <= 0 dipotong agar tetap terhingga"""
+    T = np.asarray(T, dtype=np.float64)
+    if percent:
+        T = T / 100.0
+    return -np.log10(np.clip(T, 1e-6, None))
+
+def cumulative_areas(x, A):
+    """
+    Prefix sum integrasi trapesium per spektrum.
+
+    Parameters:
+    - x: np.ndarray (n_titik,), wavenumber naik
+    - A: np.ndarray (n_spektrum x n_titik), absorbansi
+
+    Returns:
+    - prefix: np.ndarray (n_spektrum x n_titik); prefix[:, j] = integral dari x[0] sampai x[j]
+    """
+    segments = 0.5 * (A[:, 1:] + A[:, :-1]) * np.diff(x)
+    prefix = np.zeros_like(A)
+    np.cumsum(segments, axis=1, out=prefix[:, 1:])
+    return prefix
+
+def _integral_to(x, A, prefix, positions):
+    """Integral dari x[0] sampai tiap posisi (boleh di antara titik) untuk semua spektrum sekaligus"""
+    j = np.clip(np.searchsorted(x, positions, side='right') - 1, 0, len(x) - 2)
+    fraction = (positions - x[j]) / (x[j + 1] - x[j])
+    value = A[:, j] + (A[:, j + 1] - A[:, j]) * fraction
+    return prefix[:, j] + 0.5 * (A[:, j] + value) * (positions - x[j]), value
+
+def _normalize_windows(windows):
+    """Menyeragamkan jendela menjadi list nama dan array batas bawah/atas"""
+    items = windows.items() if isinstance(windows, dict) else [(name, (low, high)) for name, low, high in windows]
+    names, lows, highs = [], [], []
+    for name, (low, high) in items:
+        names.append(name)
+        lows.append(min(low, high))
+        highs.append(max(low, high))
+    return names, np.array(lows, dtype=np.float64), np.array(highs, dtype=np.float64)
+
+def band_areas(x, Y, windows=None, absorbance=True, local_baseline=True):
+    """
+    Luas pita terintegrasi untuk banyak spektrum dan banyak jendela sekaligus.
+
+    Prefix sum trapesium dihitung sekali per spektrum, lalu setiap jendela
+    cukup dua lookup (O(1)) ditambah koreksi interpolasi di kedua tepi.
+
+    Parameters:
+    - x: np.ndarray (n_titik,), wavenumber bersama (boleh tidak terurut)
+    - Y: np.ndarray (n_titik,) atau (n_spektrum x n_titik), %T
+    - windows: dict {nama: (batas1, batas2)} atau list (nama, batas1, batas2)
+      (default: DEFAULT_WINDOWS)
+    - absorbance: bool, konversi %T ke absorbansi sebelum integrasi
+    - local_baseline: bool, kurangi luas trapesium garis lurus di antara kedua tepi jendela
+      (luas tidak pernah negatif: bagian di bawah garis dihitung nol)
+
+    Returns:
+    - areas: np.ndarray (n_spektrum x n_pita), satuan A·cm⁻¹ (NaN untuk jendela di luar rentang
+      data; dengan local_baseline juga untuk jendela yang menyentuh ujung data)
+    - names: list nama pita
+    """
+    names, lows, highs = _normalize_windows(DEFAULT_WINDOWS if windows is None else windows)
+    x = np.asarray(x, dtype=np.float64)
+    Y = np.atleast_2d(np.asarray(Y, dtype=np.float64))
+    order = np.argsort(x, kind='mergesort')
+    x, Y = x[order], Y[:, order]
+    A = to_absorbance(Y) if absorbance else Y
+
+    prefix = cumulative_areas(x, A)
+    high_edge, low_edge = np.clip(highs, x[0], x[-1]), np.clip(lows, x[0], x[-1])
+    upper, value_high = _integral_to(x, A, prefix, high_edge)
+    lower, value_low = _integral_to(x, A, prefix, low_edge)
+    areas = upper - lower
+    missing = (highs < x[0]) | (lows > x[-1])
+    if local_baseline:
+        areas -= 0.5 * (value_low + value_high) * (high_edge - low_edge)
+        # Garis lurus hanya bermakna bila kedua tepi jendela masih punya titik data di
+        # luarnya; di ujung data pita sering terpotong sehingga garisnya sepihak
+        missing |= (lows <= x[1]) | (highs >= x[-2])
+        # Spektrum di bawah garis berarti tidak ada pita di atas baseline lokal
+        np.maximum(areas, 0.0, out=areas)
+    areas[:, missing] = np.nan
+    return areas, names
+
+def band_area_matrix(batch, windows=None, column='%T', absorbance=True, local_baseline=True):
+    """
+    Matriks luas pita (n_spektrum x n_pita) untuk hasil load_folder.
+
+    Spektrum dengan sumbu wavenumber yang sama diproses bersama dalam satu operasi.
+
+    Returns:
+    - areas: DataFrame, indeks nama sampel dan kolom nama pita
+    """
+    lengths = batch['lengths']
+    groups = {}
+    for i, n in enumerate(lengths):
+        groups.setdefault(data_hash(batch['wavenumber'][i, :n]), []).append(i)
+
+    areas = None
+    for members in groups.values():
+        n = lengths[members[0]]
+        values, names = band_areas(batch['wavenumber'][members[0], :n], batch[column][members, :n],
+                                   windows, absorbance=absorbance, local_baseline=local_baseline)
+        if areas is None:
+            areas = np.empty((len(lengths), len(names)))
+        areas[members] = values
+    return pd.DataFrame(areas, index=pd.Index(batch['names'], name='sample'), columns=names)
+
+def quantify_folder(source, windows=None, extension='.txt', max_workers=None, absorbance=True, local_baseline=True,
+                    screen=True):
+    """
+    Memuat satu folder spektrum lalu menghitung matriks luas pita (lihat band_area_matrix).
+
+    Dengan screen=True spektrum yang ditolak QC (ftir.qc.screen_batch) dibuang sebelum integrasi.
+    """
+    batch = load_folder(source, max_workers=max_workers, extension=extension)
+    if screen:
+        batch = split_batch(batch, screen_batch(batch))
+        if not batch['names']:
+            raise ValueError("Semua spektrum ditolak oleh QC")
+    return band_area_matrix(batch, windows, absorbance=absorbance, local_baseline=local_baseline)
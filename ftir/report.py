@@ -0,0 +1,162 @@
+import os
+from io import BytesIO
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.backends.backend_pdf import PdfPages
+from matplotlib.image import imread
+from ftir.processing import find_spectrum_files, load_data, load_folder, baseline_correction
+from ftir.analysis import identify_peaks
+from ftir.plotting import plot_spectrum
+from ftir.utils import identify_functional_groups
+from ftir.qc import screen_batch, split_batch
+
+# Ukuran halaman A4 tegak (inci)
+REPORT_PAGE_SIZE = (8.27, 11.69)
+SUMMARY_ROWS_PER_PAGE = 30
+
+def _render_sample(args):
+    """
+    Pekerja proses: olah satu file lalu render plot spektrumnya ke PNG di memori.
+
+    Figure dibuat langsung dengan kanvas Agg (tanpa pyplot), sehingga aman
+    dijalankan tanpa display di dalam process pool.
+    """
+    name, source, lam, p, peak_method, dpi = args
+    # source berupa path file, atau DataFrame yang sudah dimuat (tidak dibaca ulang)
+    data = load_data(source) if isinstance(source, str) else source
+    data = baseline_correction(data, lam=lam, p=p)
+    peaks = identify_peaks(data, method=peak_method)
+    groups = identify_functional_groups(data, peaks)
+
+    figure = Figure(figsize=(8, 5), dpi=dpi)
+    FigureCanvasAgg(figure)
+    plot_spectrum(figure.add_subplot(111), data, peaks, name, custom_functional_groups=groups)
+    buffer = BytesIO()
+    figure.savefig(buffer, format='png', dpi=dpi, bbox_inches='tight')
+
+    wavenumbers = data['wavenumber'].to_numpy()[peaks]
+    return {
+        'name': name,
+        'png': buffer.getvalue(),
+        'n_points': len(data),
+        'peaks': [float(w) for w in wavenumbers],
+        'groups': [(float(g['wavenumber']), g['group']) for g in groups],
+    }
+
+def _batch_spectra(batch):
+    """Pasangan (nama, DataFrame) dari hasil load_folder tanpa membaca file lagi"""
+    items = []
+    for i, (name, n) in enumerate(zip(batch['names'], batch['lengths'])):
+        data = pd.DataFrame({'wavenumber': batch['wavenumber'][i, :n], '%T': batch['%T'][i, :n]})
+        data.attrs['metadata'] = batch['metadata'][i] if 'metadata' in batch else {}
+        items.append((name, data))
+    return items
+
+def _summary_pages(pdf, summary, title):
+    """Halaman ringkasan: satu baris per sampel (jumlah puncak, posisi puncak, gugus)"""
+    table = summary[['sample', 'n_peaks', 'peaks', 'groups']]
+    for start in range(0, max(len(table), 1), SUMMARY_ROWS_PER_PAGE):
+        figure = Figure(figsize=REPORT_PAGE_SIZE)
+        figure.text(0.5, 0.96, title, ha='center', fontsize=16, weight='bold')
+        figure.text(0.5, 0.935, f"Ringkasan {len(table)} sampel", ha='center', fontsize=10)
+        ax = figure.add_axes([0.04, 0.05, 0.92, 0.86])
+        ax.axis('off')
+        rows = table.iloc[start:start + SUMMARY_ROWS_PER_PAGE]
+        if len(rows):
+            cells = [[str(value)[:90] for value in row] for row in rows.itertuples(index=False)]
+            grid = ax.table(cellText=cells, colLabels=['Sampel', 'Puncak', 'Posisi (cm⁻¹)', 'Gugus'],
+                            colWidths=[0.18, 0.07, 0.35, 0.40], loc='upper center', cellLoc='left')
+            grid.auto_set_font_size(False)
+            grid.set_fontsize(6)
+        pdf.savefig(figure)
+
+def _sample_page(pdf, result):
+    """Satu halaman per sampel: gambar spektrum dan tabel puncak/gugus"""
+    figure = Figure(figsize=REPORT_PAGE_SIZE)
+    figure.text(0.5, 0.96, result['name'], ha='center', fontsize=14, weight='bold')
+    image_ax = figure.add_axes([0.05, 0.5, 0.9, 0.44])
+    image_ax.imshow(imread(BytesIO(result['png']), format='png'))
+    image_ax.axis('off')
+
+    table_ax = figure.add_axes([0.1, 0.04, 0.8, 0.42])
+    table_ax.axis('off')
+    cells = [[f"{wavenumber:.1f}", group] for wavenumber, group in result['groups']][:40]
+    if cells:
+        grid = table_ax.table(cellText=cells, colLabels=['Wavenumber (cm⁻¹)', 'Gugus Fungsional'],
+                              colWidths=[0.25, 0.75], loc='upper center', cellLoc='left')
+        grid.auto_set_font_size(False)
+        grid.set_fontsize(7)
+    else:
+        table_ax.text(0.5, 0.9, "Tidak ada puncak terdeteksi", ha='center')
+    pdf.savefig(figure)
+
+def generate_report(source, file_path, extension='.txt', lam=1e3, p=0.01, peak_method='minima',
+                    dpi=120, max_workers=None, title="Laporan Analisis FTIR", screen=True):
+    """
+    Membuat laporan PDF multi-halaman untuk satu folder spektrum FTIR tanpa GUI.
+
+    Setiap spektrum diolah (koreksi baseline, puncak, gugus) dan dirender ke PNG
+    di memori secara paralel pada process pool dengan backend Agg; hasilnya
+    dirangkai menjadi satu PDF: halaman ringkasan lalu satu halaman per sampel.
+    Dengan screen=True spektrum yang ditolak QC (ftir.qc.screen_batch) tidak dilaporkan.
+
+    Parameters:
+    - source: str, folder atau pola glob file spektrum, atau dict hasil load_folder
+      (spektrum yang sudah dimuat dipakai langsung)
+    - file_path: str, file PDF tujuan
+    - extension: str, ekstensi file bila source berupa folder (.txt, .smf, .jdx)
+    - lam, p: parameter koreksi baseline AsLS
+    - peak_method: metode identify_peaks ('minima', 'derivative', 'fsd')
+    - dpi: int, resolusi gambar spektrum
+    - max_workers: int, jumlah proses (default: jumlah CPU)
+    - title: str, judul laporan
+    - screen: bool, buang spektrum yang ditolak QC
+
+    Returns:
+    - summary: DataFrame ringkasan per sampel (kolom 'qc' berisi lajur QC bila screen=True)
+    """
+    lanes = None
+    if isinstance(source, dict) or screen:
+        # Batch yang dimuat untuk QC langsung dikirim ke pekerja; file tidak dibaca dua kali
+        batch = source if isinstance(source, dict) else load_folder(source, max_workers=max_workers,
+                                                                     extension=extension)
+        if screen:
+            qc = screen_batch(batch)
+            lanes = [lane for lane in qc['lane'] if lane != 'reject']
+            batch = split_batch(batch, qc)
+            if not batch['names']:
+                raise ValueError("Semua spektrum ditolak oleh QC")
+        items = _batch_spectra(batch)
+    else:
+        paths = find_spectrum_files(source, extension)
+        if not paths:
+            raise FileNotFoundError(f"Tidak ada file spektrum ditemukan di: {source}")
+        items = [(os.path.splitext(os.path.basename(path))[0], path) for path in paths]
+    tasks = [(name, item, lam, p, peak_method, dpi) for name, item in items]
+
+    with PdfPages(file_path) as pdf:
+        if len(tasks) == 1 or max_workers == 1:
+            results = [_render_sample(task) for task in tasks]
+        else:
+            chunksize = max(1, len(tasks) // (4 * (max_workers or os.cpu_count() or 1)))
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(_render_sample, tasks, chunksize=chunksize))
+
+        summary = pd.DataFrame([{
+            'sample': result['name'],
+            'n_points': result['n_points'],
+            'n_peaks': len(result['peaks']),
+            'peaks': ", ".join(str(int(np.round(w))) for w in result['peaks']),
+            'groups': ", ".join(f"{int(w)}: {g}" for w, g in result['groups'] if g),
+        } for result in results])
+        if lanes is not None:
+            summary['qc'] = lanes
+        _summary_pages(pdf, summary, title)
+        for result in results:
+            _sample_page(pdf, result)
+        info = pdf.infodict()
+        info['Title'] = title
+    return summary
@@ -0,0 +1,248 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from scipy.cluster.hierarchy import fcluster
+from ftir.processing import find_spectrum_files, read_spectrum_file, stack_spectra, baseline_correction_many, data_hash
+from ftir.library import make_grid, prepare_spectra
+from ftir.qc import screen_batch, split_batch
+
+# Hanya single linkage yang bisa dihitung out-of-core (RAM O(n)); average/complete/weighted
+# SciPy membutuhkan vektor jarak terkondensasi n(n-1)/2 di RAM
+LINKAGE_METHODS = ('single',)
+
+def _shrink_rows(file_path, n_rows, chunk_size):
+    """Memotong file .npy menjadi n_rows baris pertama (disalin per blok lewat file sementara)"""
+    source = np.load(file_path, mmap_mode='r')
+    temporary = f"{file_path}.tmp.npy"
+    target = np.lib.format.open_memmap(temporary, mode='w+', dtype=source.dtype, shape=(n_rows, source.shape[1]))
+    for start in range(0, n_rows, chunk_size):
+        target[start:start + chunk_size] = source[start:start + chunk_size]
+    target.flush()
+    del target, source
+    os.replace(temporary, file_path)
+
+def collection_matrix(source, file_path, grid=None, extension='.txt', lam=1e3, p=0.01,
+                      metric='correlation', chunk_size=256, screen=True, subtract_baseline=False):
+    """
+    Menyusun matriks spektrum terkoreksi (memory-mapped float32) untuk koleksi besar.
+
+    File dibaca per blok chunk_size, dikoreksi baseline dengan baseline_correction_many
+    (spektrum bersumbu sama diselesaikan bersama; hasilnya setara kolom '%T_corrected'
+    seperti di seluruh aplikasi), lalu di-resample dan dinormalisasi seperti pustaka
+    (prepare_spectra) sebelum ditulis ke disk. Pemakaian RAM hanya
+    sebanding dengan satu blok, berapa pun jumlah file. Dengan screen=True tiap blok
+    disaring QC (ftir.qc.screen_batch) dan spektrum yang ditolak tidak ditulis.
+
+    Parameters:
+    - source: str, folder atau pola glob file spektrum
+    - file_path: str, file .npy tujuan
+    - grid: np.ndarray, grid wavenumber (default: make_grid())
+    - extension: str, ekstensi file bila source berupa folder
+    - lam, p: parameter koreksi baseline AsLS
+    - metric: 'cosine' atau 'correlation'; dengan 'correlation' perkalian dua baris
+      adalah koefisien korelasi Pearson
+    - chunk_size: int, jumlah file per blok
+    - screen: bool, buang spektrum yang ditolak QC
+    - subtract_baseline: bool, bandingkan residu %T - '%T_corrected' (hanya pita, tanpa
+      bentuk kontinum) alih-alih '%T_corrected'; hasilnya tidak sebanding dengan pustaka
+      dan analisis lain yang memakai '%T_corrected'
+
+    Returns:
+    - collection: dict dengan 'matrix' (memmap read-only n_spektrum x n_grid), 'grid',
+      'names' dan 'paths' (hanya spektrum yang lolos QC), serta 'qc' (DataFrame hasil
+      screen_batch untuk semua file, None bila screen=False)
+    """
+    paths = find_spectrum_files(source, extension)
+    if not paths:
+        raise FileNotFoundError(f"Tidak ada file spektrum ditemukan di: {source}")
+    grid = make_grid() if grid is None else np.asarray(grid, dtype=np.float64)
+
+    matrix = np.lib.format.open_memmap(file_path, mode='w+', dtype=np.float32, shape=(len(paths), len(grid)))
+    kept, reports = [], []
+    for start in range(0, len(paths), chunk_size):
+        chunk = paths[start:start + chunk_size]
+        batch = stack_spectra(chunk, [read_spectrum_file(path) for path in chunk])
+        if screen:
+            reports.append(screen_batch(batch))
+            batch = split_batch(batch, reports[-1])
+        # Baris ditulis berurutan mulai dari jumlah spektrum yang sudah lolos
+        offset = len(kept)
+        kept += batch['paths']
+        # Kelompokkan per isi sumbu (bukan hanya panjang dan ujungnya): sumbu yang tidak
+        # monoton bisa sama panjang dan ujungnya tetapi berbeda urutan di tengah
+        groups = {}
+        for i, n in enumerate(batch['lengths']):
+            groups.setdefault(data_hash(batch['wavenumber'][i, :n]), []).append(i)
+        for members in groups.values():
+            n = batch['lengths'][members[0]]
+            x = batch['wavenumber'][members[0], :n]
+            Y = batch['%T'][members, :n]
+            corrected = baseline_correction_many(x, Y, lam=lam, p=p)
+            if subtract_baseline:
+                corrected = Y - corrected
+            matrix[[offset + i for i in members]] = prepare_spectra(x, corrected, grid, metric)
+    matrix.flush()
+    del matrix
+    if not kept:
+        os.remove(file_path)
+        raise ValueError("Semua spektrum ditolak oleh QC")
+    if len(kept) < len(paths):
+        _shrink_rows(file_path, len(kept), chunk_size)
+
+    return {
+        'matrix': np.load(file_path, mmap_mode='r'),
+        'grid': grid,
+        'names': [os.path.splitext(os.path.basename(path))[0] for path in kept],
+        'paths': kept,
+        'qc': pd.concat(reports) if reports else None,
+    }
+
+def similarity_matrix(X, file_path, block_size=1024, max_workers=None):
+    """
+    Matriks kemiripan sampel x sampel secara blockwise, ditulis ke memmap float32.
+
+    Baris X harus sudah bernorma satu (hasil prepare_spectra, collection_matrix atau
+    matrix pustaka), sehingga setiap tile cukup satu perkalian matriks BLAS
+    X[i] @ X[j].T. Hanya tile segitiga atas yang dihitung; transposnya ditulis ke
+    tile simetris. Tile dikerjakan thread pool (BLAS melepas GIL) dan pemakaian RAM
+    per thread hanya dua blok baris ditambah satu tile block_size x block_size.
+
+    Parameters:
+    - X: np.ndarray atau memmap (n_spektrum x n_grid)
+    - file_path: str, file .npy tujuan
+    - block_size: int, jumlah baris per blok
+    - max_workers: int, jumlah thread (default: jumlah CPU)
+
+    Returns:
+    - S: memmap read-only (n_spektrum x n_spektrum) float32, nilai dalam [-1, 1]
+    """
+    n = len(X)
+    if n == 0:
+        raise ValueError("Koleksi spektrum kosong")
+    S = np.lib.format.open_memmap(file_path, mode='w+', dtype=np.float32, shape=(n, n))
+    starts = range(0, n, block_size)
+    tiles = [(i, j) for i in starts for j in starts if j >= i]
+
+    def compute_tile(tile):
+        i, j = tile
+        rows = np.asarray(X[i:i + block_size], dtype=np.float32)
+        cols = rows if i == j else np.asarray(X[j:j + block_size], dtype=np.float32)
+        block = np.clip(rows @ cols.T, -1.0, 1.0)
+        S[i:i + block_size, j:j + block_size] = block
+        if i != j:
+            S[j:j + block_size, i:i + block_size] = block.T
+
+    n_workers = min(max_workers or os.cpu_count() or 1, len(tiles))
+    if n_workers == 1:
+        for tile in tiles:
+            compute_tile(tile)
+    else:
+        with ThreadPoolExecutor(max_workers=n_workers) as executor:
+            list(executor.map(compute_tile, tiles))
+    S.flush()
+    del S
+    return np.load(file_path, mmap_mode='r')
+
+def find_duplicates(S, names=None, threshold=0.999, block_size=1024):
+    """
+    Mencari pasangan spektrum dengan kemiripan >= threshold (kandidat duplikat).
+
+    S dibaca per blok baris sehingga matriks penuh tidak pernah dimuat ke RAM.
+
+    Returns:
+    - pairs: DataFrame kolom 'sample_a', 'sample_b', 'score', terurut dari skor tertinggi
+    """
+    n = len(S)
+    names = list(range(n)) if names is None else names
+    first, second, scores = [], [], []
+    for start in range(0, n, block_size):
+        block = np.asarray(S[start:start + block_size])
+        rows, cols = np.nonzero(block >= threshold)
+        # Hanya segitiga atas (tanpa diagonal) agar tiap pasangan muncul sekali
+        upper = cols > rows + start
+        first.append(rows[upper] + start)
+        second.append(cols[upper])
+        scores.append(block[rows[upper], cols[upper]])
+    first, second, scores = np.concatenate(first), np.concatenate(second), np.concatenate(scores)
+    order = np.argsort(-scores, kind='mergesort')
+    return pd.DataFrame({
+        'sample_a': [names[i] for i in first[order]],
+        'sample_b': [names[j] for j in second[order]],
+        'score': scores[order],
+    })
+
+def single_linkage(S):
+    """
+    Linkage single hierarkis dengan jarak 1 - S tanpa membentuk matriks jarak.
+
+    Pohon rentang minimum dibangun dengan algoritma Prim yang membaca satu baris S
+    per langkah (RAM O(n)), lalu diubah ke format linkage SciPy.
+
+    Returns:
+    - Z: np.ndarray ((n-1) x 4), format scipy.cluster.hierarchy.linkage
+    """
+    n = len(S)
+    in_tree = np.zeros(n, dtype=bool)
+    distance = np.full(n, np.inf)
+    parent = np.zeros(n, dtype=np.int64)
+    edges = np.empty((n - 1, 3))
+    current = 0
+    in_tree[0] = True
+    for k in range(n - 1):
+        row = 1.0 - np.asarray(S[current], dtype=np.float64)
+        closer = ~in_tree & (row < distance)
+        distance[closer] = row[closer]
+        parent[closer] = current
+        current = int(np.argmin(distance))
+        edges[k] = parent[current], current, max(distance[current], 0.0)
+        in_tree[current] = True
+        distance[current] = np.inf
+
+    # Gabungkan sisi MST dari yang terpendek dengan union-find (id klaster baru = n + k)
+    edges = edges[np.argsort(edges[:, 2], kind='mergesort')]
+    root = np.arange(2 * n - 1)
+    size = np.ones(2 * n - 1)
+    Z = np.empty((n - 1, 4))
+
+    def find(i):
+        while root[i] != i:
+            root[i] = root[root[i]]
+            i = root[i]
+        return i
+
+    for k, (a, b, d) in enumerate(edges):
+        a, b = find(int(a)), find(int(b))
+        Z[k] = min(a, b), max(a, b), d, size[a] + size[b]
+        root[a] = root[b] = n + k
+        size[n + k] = size[a] + size[b]
+    return Z
+
+def cluster_spectra(S, method='single', threshold=None, n_clusters=None):
+    """
+    Klastering hierarkis koleksi spektrum dari matriks kemiripan.
+
+    Parameters:
+    - S: matriks kemiripan (mis. memmap dari similarity_matrix)
+    - method: 'single' (out-of-core, RAM O(n)); metode lain ditolak karena membutuhkan
+      vektor jarak terkondensasi n(n-1)/2 di RAM
+    - threshold: float, potong dendrogram pada jarak 1 - kemiripan ini
+    - n_clusters: int, alternatif threshold: jumlah klaster maksimum
+
+    Returns:
+    - result: dict dengan 'linkage' (Z) dan 'labels' (np.ndarray label klaster mulai 1,
+      None bila threshold dan n_clusters tidak diberikan)
+    """
+    if method not in LINKAGE_METHODS:
+        raise ValueError(f"Metode linkage tidak didukung: {method}. Hanya {', '.join(LINKAGE_METHODS)} "
+                         "yang dapat dihitung tanpa memuat matriks jarak ke RAM.")
+    if len(S) < 2:
+        raise ValueError("Klastering membutuhkan minimal 2 spektrum")
+    Z = single_linkage(S)
+
+    labels = None
+    if n_clusters is not None:
+        labels = fcluster(Z, n_clusters, criterion='maxclust')
+    elif threshold is not None:
+        labels = fcluster(Z, threshold, criterion='distance')
+    return {'linkage': Z, 'labels': labels}
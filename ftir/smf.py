@@ -0,0 +1,157 @@
+import os
+import re
+import struct
+import numpy as np
+
+# File .smf (Shimadzu IRsolution) tersusun atas halaman 8192 byte. Setiap halaman diawali
+# header 24 byte + 2 byte penanda rekaman; halaman data (jenis 1) membentuk rantai yang
+# dibaca dari halaman 'next' = 0 mundur mengikuti pointer 'prev'.
+SMF_PAGE_SIZE = 8192
+SMF_PAGE_DTYPE = np.dtype([
+    ('reserved', '<u4', 2),
+    ('page', '<u4'),
+    ('next', '<u4'),
+    ('prev', '<u4'),
+    ('kind', '<u2'),
+    ('used', '<u2'),
+    ('tag', '<u2'),
+    ('payload', 'V8166'),
+])
+SMF_PAYLOAD_OFFSET = 26
+SMF_DATA_PAGE = 1
+
+# Rekaman sumbu x: string satuan, lalu jumlah titik (uint32) dan nilai awal/akhir/langkah (float64)
+_AXIS_UNIT = b'1/cm\x00'
+_AXIS_RECORD = struct.Struct('<I16xd8xd8xd')
+_AXIS_OFFSET = 64
+_TEXT_PATTERN = re.compile(rb'[\x20-\x7e]{5,}')
+
+def _page_table(buffer):
+    """Tabel header seluruh halaman sebagai array terstruktur (view tanpa salinan)"""
+    n_pages = len(buffer) // SMF_PAGE_SIZE
+    if n_pages < 2:
+        raise ValueError("File .smf terlalu kecil atau rusak")
+    return np.frombuffer(buffer, dtype=SMF_PAGE_DTYPE, count=n_pages)
+
+def read_smf_streams(buffer, pages=None):
+    """
+    Menyusun ulang semua aliran data biner (rantai halaman data) menjadi array float64.
+
+    Aliran yang muat dalam satu halaman dikembalikan sebagai view langsung ke buffer
+    (np.frombuffer tanpa salinan); aliran multi-halaman digabung sekali.
+
+    Returns:
+    - streams: list np.ndarray float64, terurut sesuai posisi halaman pertamanya di file
+    """
+    pages = _page_table(buffer) if pages is None else pages
+    data_pages = np.flatnonzero(pages['kind'] == SMF_DATA_PAGE)
+    streams = []
+    for head in data_pages[pages['next'][data_pages] == 0]:
+        chain = [int(head)]
+        while pages['prev'][chain[-1]] and len(chain) < len(pages):
+            chain.append(int(pages['prev'][chain[-1]]))
+        n_bytes = int(pages['used'][chain].sum())
+        if n_bytes % 8:
+            continue
+        if len(chain) == 1:
+            offset = chain[0] * SMF_PAGE_SIZE + SMF_PAYLOAD_OFFSET
+            values = np.frombuffer(buffer, dtype='<f8', count=n_bytes // 8, offset=offset)
+        else:
+            payload = b''.join(
+                bytes(buffer[p * SMF_PAGE_SIZE + SMF_PAYLOAD_OFFSET:
+                             p * SMF_PAGE_SIZE + SMF_PAYLOAD_OFFSET + int(pages['used'][p])])
+                for p in chain)
+            values = np.frombuffer(payload, dtype='<f8')
+        streams.append((chain[-1], values))
+    return [values for _, values in sorted(streams, key=lambda item: item[0])]
+
+def _index_pages(buffer, pages):
+    """Isi halaman indeks (bukan halaman data, tanpa header file) sebagai bytes"""
+    for page in np.flatnonzero(pages['kind'] != SMF_DATA_PAGE)[1:]:
+        start = int(page) * SMF_PAGE_SIZE
+        yield bytes(buffer[start:start + SMF_PAGE_SIZE])
+
+def _read_axis(index_pages):
+    """Membaca rekaman sumbu wavenumber (jumlah titik, awal, akhir, langkah)"""
+    for content in index_pages:
+        start = content.find(_AXIS_UNIT)
+        if start >= 0 and start + _AXIS_OFFSET + _AXIS_RECORD.size <= len(content):
+            n_points, first, last, step = _AXIS_RECORD.unpack_from(content, start + _AXIS_OFFSET)
+            if n_points < 2:
+                raise ValueError("Jumlah titik pada sumbu wavenumber file .smf tidak valid")
+            return n_points, first, last, step
+    raise ValueError("Rekaman sumbu wavenumber (1/cm) tidak ditemukan di file .smf")
+
+def _read_text_metadata(index_pages):
+    """Mengambil string akuisisi dan riwayat pengolahan dari halaman indeks"""
+    metadata = {}
+    acquisition, history = [], []
+    for content in index_pages:
+        for match in _TEXT_PATTERN.finditer(content):
+            text = match.group().decode('ascii').strip()
+            if text.startswith('Scan on '):
+                metadata.setdefault('INSTRUMENT', text[len('Scan on '):])
+            elif text.startswith('Auto: '):
+                if text[len('Auto: '):] not in acquisition:
+                    acquisition.append(text[len('Auto: '):])
+            elif text.lower().endswith('.smf') and ':\\' in text:
+                metadata.setdefault('SOURCE', text)
+            elif text.endswith('.') or text.endswith(')'):
+                if text not in history and ' ' in text:
+                    history.append(text)
+            elif text == 'Measured in GLP mode':
+                metadata['GLP'] = 'YES'
+    if acquisition:
+        metadata['ACQUISITION'] = '; '.join(acquisition)
+    if history:
+        metadata['HISTORY'] = '; '.join(history)
+    return metadata
+
+def read_spectrum_smf(file_path, dataset=-1):
+    """
+    Membaca satu file biner .smf FTIR langsung menjadi array NumPy.
+
+    File di-memory-map; header halaman dibaca sebagai view terstruktur dan aliran
+    data didekode dengan np.frombuffer, tanpa perlu ekspor .txt.
+
+    Parameters:
+    - file_path: str, path ke file .smf
+    - dataset: int, indeks data set dengan panjang sama dengan sumbu x
+      (default -1: data set terakhir/hasil pengolahan, sama dengan ekspor .txt;
+      0: data set paling awal, mis. sebelum smoothing)
+
+    Returns:
+    - x: np.ndarray float64, wavenumber (naik)
+    - y: np.ndarray float64, %T
+    - metadata: dict, mis. {'TITLE', 'INSTRUMENT', 'ACQUISITION', 'HISTORY', 'XUNITS',
+      'FIRSTX', 'LASTX', 'DELTAX', 'NPOINTS', 'FILE'}
+    """
+    buffer = np.memmap(file_path, dtype=np.uint8, mode='r')
+    pages = _page_table(buffer)
+    index_pages = list(_index_pages(buffer, pages))
+    n_points, first, last, step = _read_axis(index_pages)
+
+    candidates = [values for values in read_smf_streams(buffer, pages) if len(values) == n_points]
+    if not candidates:
+        raise ValueError(f"Data spektrum ({n_points} titik) tidak ditemukan di file: {file_path}")
+    try:
+        y = np.array(candidates[dataset], dtype=np.float64)
+    except IndexError:
+        raise ValueError(f"Data set {dataset} tidak ada; file hanya berisi {len(candidates)} data set")
+    x = np.linspace(first, last, n_points)
+
+    metadata = _read_text_metadata(index_pages)
+    name = os.path.splitext(os.path.basename(file_path))[0]
+    if 'SOURCE' in metadata:
+        name = os.path.splitext(metadata['SOURCE'].rsplit('\\', 1)[-1])[0]
+    metadata.update({
+        'TITLE': name,
+        'XUNITS': '1/CM',
+        'FIRSTX': repr(first),
+        'LASTX': repr(last),
+        'DELTAX': repr(step),
+        'NPOINTS': str(n_points),
+        'DATASETS': str(len(candidates)),
+        'FILE': os.path.basename(file_path),
+    })
+    return x, y, metadata
@@ -0,0 +1,281 @@
+import socket
+import struct
+import threading
+import time
+import numpy as np
+from ftir.processing import asls_baseline
+
+# Protokol aliran instrumen (little-endian):
+# - sekali di awal: AXIS_HEADER (b'FTXA', n_titik) diikuti n_titik float64 wavenumber naik
+# - tiap frame: FRAME_HEADER (b'FTIR', nomor urut, timestamp) diikuti n_titik float32 %T
+AXIS_HEADER = struct.Struct('<4sI')
+FRAME_HEADER = struct.Struct('<4sId')
+AXIS_MAGIC = b'FTXA'
+FRAME_MAGIC = b'FTIR'
+
+def _recv_exact(sock, view):
+    """Mengisi penuh memoryview dari socket (recv_into, tanpa alokasi baru)"""
+    received = 0
+    while received < len(view):
+        n = sock.recv_into(view[received:])
+        if n == 0:
+            raise ConnectionError("Koneksi instrumen terputus")
+        received += n
+
+def synthetic_template(n_points=3735, n_bands=12, seed=0):
+    """
+    Spektrum templat %T sintetis untuk SimulatedInstrument bila belum ada data dimuat.
+
+    Baseline landai di sekitar 85 %T dengan pita Lorentzian yang mengarah ke bawah.
+
+    Returns:
+    - x: np.ndarray wavenumber naik (400-4000 cm⁻¹)
+    - y: np.ndarray %T
+    """
+    rng = np.random.default_rng(seed)
+    x = np.linspace(400.0, 4000.0, n_points)
+    t = (x - x[0]) / (x[-1] - x[0])
+    centers = rng.uniform(500, 3900, n_bands)
+    widths = rng.uniform(5, 60, n_bands)
+    depths = rng.uniform(5, 40, n_bands)
+    bands = (depths / (1 + ((x[:, None] - centers) / (widths / 2)) ** 2)).sum(axis=1)
+    return x, np.clip(85.0 + 5.0 * t - bands, 1.0, 100.0)
+
+class FrameRingBuffer:
+    """
+    Ring buffer frame spektrum yang dialokasikan sekali, dengan co-adding berjalan.
+
+    Frame ditulis langsung ke slot berikutnya (lihat next_slot) lalu di-commit;
+    jumlah n_coadd frame terakhir dipertahankan sebagai jumlah berjalan float64
+    sehingga rata-rata tersedia dalam O(n_titik) tanpa menjumlah ulang semua frame.
+
+    skipped menghitung frame yang sudah keluar dari jendela co-add sebelum pembaca
+    sempat memanggil average, yaitu frame yang tidak pernah ikut tampil karena
+    tampilan tertinggal dari laju instrumen.
+    """
+
+    def __init__(self, n_points, capacity=256, n_coadd=16):
+        if not 0 < n_coadd < capacity:
+            raise ValueError("Jumlah co-add harus lebih dari 0 dan kurang dari kapasitas buffer")
+        self.frames = np.zeros((capacity, n_points), dtype='<f4')
+        self.sequence = np.full(capacity, -1, dtype=np.int64)
+        self.timestamps = np.zeros(capacity)
+        self.capacity = capacity
+        self.n_coadd = n_coadd
+        self._sum = np.zeros(n_points)
+        self._index = 0
+        self._count = 0
+        self._lock = threading.Lock()
+        self.last_sequence = -1
+        self.received = 0
+        self.skipped = 0
+        self._read_received = 0
+
+    def next_slot(self):
+        """Slot kosong berikutnya; aman ditulis karena tidak termasuk jendela co-add"""
+        return self.frames[self._index]
+
+    def commit(self, sequence, timestamp):
+        """Menandai slot berikutnya berisi frame baru dan memperbarui jumlah co-add"""
+        with self._lock:
+            index = self._index
+            self._sum += self.frames[index]
+            if self._count >= self.n_coadd:
+                self._sum -= self.frames[(index - self.n_coadd) % self.capacity]
+            else:
+                self._count += 1
+            self.sequence[index] = sequence
+            self.timestamps[index] = timestamp
+            self.last_sequence = sequence
+            self.received += 1
+            self._index = (index + 1) % self.capacity
+            if self._index == 0:
+                # Hitung ulang sekali per putaran agar galat pembulatan tidak menumpuk
+                self._resum()
+
+    def _resum(self):
+        """Menjumlah ulang jendela co-add dari slot (dipanggil dengan lock dipegang)"""
+        rows = (self._index - 1 - np.arange(self._count)) % self.capacity
+        np.sum(self.frames[rows], axis=0, dtype=np.float64, out=self._sum)
+
+    def set_coadd(self, n_coadd):
+        """Mengubah jumlah frame yang dirata-ratakan"""
+        if not 0 < n_coadd < self.capacity:
+            raise ValueError("Jumlah co-add harus lebih dari 0 dan kurang dari kapasitas buffer")
+        with self._lock:
+            self.n_coadd = n_coadd
+            self._count = min(n_coadd, self.received)
+            self._resum()
+
+    def average(self, out):
+        """
+        Menulis rata-rata co-add ke array out (tanpa alokasi) dan memperbarui skipped.
+
+        Returns:
+        - (nomor urut frame terakhir, jumlah frame yang dirata-ratakan)
+        """
+        with self._lock:
+            if self._count == 0:
+                return -1, 0
+            # Frame baru sejak pembacaan terakhir yang tidak lagi berada di jendela co-add
+            self.skipped += max(self.received - self._read_received - self._count, 0)
+            self._read_received = self.received
+            np.divide(self._sum, self._count, out=out)
+            return self.last_sequence, self._count
+
+class IncrementalBaseline:
+    """
+    Baseline AsLS untuk spektrum yang berubah perlahan (sumbu wavenumber naik).
+
+    Bobot akhir tiap pemanggilan dipakai sebagai warm start pemanggilan berikutnya,
+    sehingga iterasi biasanya konvergen dalam satu-dua solve banded.
+    """
+
+    def __init__(self, lam=1e3, p=0.01, max_iter=10):
+        if not 0 < p < 1:
+            raise ValueError("Parameter p harus berada di antara 0 dan 1.")
+        self.lam = lam
+        self.p = p
+        self.max_iter = max_iter
+        self._weights = None
+
+    def __call__(self, y):
+        y = np.asarray(y, dtype=np.float64)
+        weights = self._weights if self._weights is not None and len(self._weights) == len(y) else None
+        baseline, self._weights = asls_baseline(y, self.lam, self.p, weights=weights, return_weights=True,
+                                                max_iter=self.max_iter)
+        return baseline
+
+class SimulatedInstrument:
+    """
+    Pengganti instrumen lokal: server TCP yang mengirim frame spektrum berderau.
+
+    Frame dibuat dari spektrum templat ditambah derau Gaussian dan pergeseran
+    baseline lambat, dengan laju tetap (frame per detik).
+    """
+
+    def __init__(self, x, y, rate=30.0, noise=0.3, drift=2.0, host='127.0.0.1', port=0, seed=0):
+        order = np.argsort(np.asarray(x, dtype=np.float64), kind='mergesort')
+        self.x = np.asarray(x, dtype=np.float64)[order]
+        self.y = np.asarray(y, dtype=np.float64)[order]
+        self.rate = rate
+        self.noise = noise
+        self.drift = drift
+        self.seed = seed
+        self._server = socket.create_server((host, port))
+        self.address = self._server.getsockname()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._server.close()
+        self._thread.join(timeout=2)
+
+    def _serve(self):
+        try:
+            connection, _ = self._server.accept()
+        except OSError:
+            return
+        with connection:
+            connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            try:
+                connection.sendall(AXIS_HEADER.pack(AXIS_MAGIC, len(self.x)) + self.x.astype('<f8').tobytes())
+                self._stream(connection)
+            except OSError:
+                pass
+
+    def _stream(self, connection):
+        rng = np.random.default_rng(self.seed)
+        n_points = len(self.x)
+        frame = bytearray(FRAME_HEADER.size + 4 * n_points)
+        payload = np.frombuffer(frame, dtype='<f4', offset=FRAME_HEADER.size)
+        noise = np.empty(n_points, dtype=np.float32)
+        ramp = np.linspace(-1.0, 1.0, n_points)
+        interval = 1.0 / self.rate
+        start = next_time = time.perf_counter()
+        sequence = 0
+        while not self._stop.is_set():
+            elapsed = time.perf_counter() - start
+            rng.standard_normal(dtype=np.float32, out=noise)
+            # Pergeseran baseline lambat: offset dan kemiringan berosilasi
+            payload[:] = self.y + self.drift * (np.sin(0.2 * elapsed) + 0.5 * np.sin(0.07 * elapsed) * ramp)
+            payload += self.noise * noise
+            FRAME_HEADER.pack_into(frame, 0, FRAME_MAGIC, sequence, elapsed)
+            connection.sendall(frame)
+            sequence += 1
+            next_time += interval
+            delay = next_time - time.perf_counter()
+            if delay > 0:
+                self._stop.wait(delay)
+
+class StreamReceiver:
+    """
+    Penerima aliran frame di thread latar belakang.
+
+    Payload tiap frame dibaca langsung (recv_into) ke slot FrameRingBuffer,
+    sehingga tidak ada alokasi per frame dan memori tetap konstan.
+    """
+
+    def __init__(self, address, capacity=256, n_coadd=16):
+        self.address = address
+        self.capacity = capacity
+        self.n_coadd = n_coadd
+        self.axis = None
+        self.buffer = None
+        self.error = None
+        self.ready = threading.Event()
+        self._stop = threading.Event()
+        self._socket = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self, timeout=5.0):
+        """Memulai thread penerima dan menunggu sumbu wavenumber diterima"""
+        self._thread.start()
+        if not self.ready.wait(timeout):
+            raise TimeoutError("Instrumen tidak mengirim sumbu wavenumber")
+        if self.error is not None:
+            raise self.error
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._socket is not None:
+            try:
+                self._socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        self._thread.join(timeout=2)
+
+    def _run(self):
+        try:
+            with socket.create_connection(self.address) as sock:
+                self._socket = sock
+                header = bytearray(max(AXIS_HEADER.size, FRAME_HEADER.size))
+                _recv_exact(sock, memoryview(header)[:AXIS_HEADER.size])
+                magic, n_points = AXIS_HEADER.unpack_from(header)
+                if magic != AXIS_MAGIC:
+                    raise ValueError("Aliran instrumen tidak diawali sumbu wavenumber")
+                axis = np.empty(n_points, dtype='<f8')
+                _recv_exact(sock, memoryview(axis).cast('B'))
+                self.axis = axis
+                self.buffer = FrameRingBuffer(n_points, self.capacity, self.n_coadd)
+                self.ready.set()
+
+                frame_header = memoryview(header)[:FRAME_HEADER.size]
+                while not self._stop.is_set():
+                    _recv_exact(sock, frame_header)
+                    magic, sequence, timestamp = FRAME_HEADER.unpack_from(header)
+                    if magic != FRAME_MAGIC:
+                        raise ValueError("Frame instrumen tidak valid")
+                    _recv_exact(sock, memoryview(self.buffer.next_slot()).cast('B'))
+                    self.buffer.commit(sequence, timestamp)
+        except Exception as e:
+            if not self._stop.is_set():
+                self.error = e
+        finally:
+            self.ready.set()
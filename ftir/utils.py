@@ -1,3 +1,4 @@
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 
@@ -19,20 +20,126 @@ FUNCTIONAL_GROUPS = [
     {"group": "NO₂ (Nitro)", "range": (1300, 1600), "description": "Kuat"},
 ]
 
-def identify_functional_groups(data, peaks):
+# Pita yang lebih lebar dari faktor ini kali lebar median dicek terpisah (lihat build_band_index)
+WIDE_BAND_FACTOR = 4.0
+
+def build_band_index(bands):
+    """
+    Menyusun tabel pita serapan menjadi indeks interval terurut untuk pencarian cepat.
+
+    Parameters:
+    - bands: list dict bergaya FUNCTIONAL_GROUPS ({'group', 'range', 'description'})
+      atau DataFrame dengan kolom 'group', 'low', 'high' dan opsional 'description'
+
+    Returns:
+    - band_index: dict berisi array 'low', 'high', 'group', 'description' dan 'order'
+      yang diurutkan berdasarkan batas bawah, 'wide' (mask pita yang lebih lebar dari
+      WIDE_BAND_FACTOR x lebar median) serta 'max_width' (lebar pita terbesar di luar 'wide')
+
+    Jendela pencarian assign_functional_groups selebar 'max_width'; satu pita yang sangat
+    lebar akan membuat jendela itu mencakup hampir seluruh tabel, sehingga pita lebar
+    dikeluarkan dari batas tersebut dan dicek langsung.
+    """
+    if isinstance(bands, pd.DataFrame):
+        table = bands
+    else:
+        table = pd.DataFrame({
+            'group': [band['group'] for band in bands],
+            'low': [band['range'][0] for band in bands],
+            'high': [band['range'][1] for band in bands],
+            'description': [band.get('description', '') for band in bands],
+        })
+    if 'description' not in table.columns:
+        table = table.assign(description='')
+
+    low = table['low'].to_numpy(dtype=np.float64)
+    high = table['high'].to_numpy(dtype=np.float64)
+    if np.any(high < low):
+        raise ValueError("Batas atas rentang pita tidak boleh lebih kecil dari batas bawah.")
+
+    # 'order' menyimpan urutan asli tabel, dipakai untuk menentukan gugus dominan
+    sort_idx = np.argsort(low, kind='mergesort')
+    width = (high - low)[sort_idx]
+    wide = width > WIDE_BAND_FACTOR * np.median(width) if len(width) else np.zeros(0, dtype=bool)
+    return {
+        'low': low[sort_idx],
+        'high': high[sort_idx],
+        'group': table['group'].to_numpy(dtype=object)[sort_idx],
+        'description': table['description'].fillna('').to_numpy(dtype=object)[sort_idx],
+        'order': sort_idx,
+        'wide': wide,
+        'max_width': float(width[~wide].max()) if np.any(~wide) else 0.0,
+    }
+
+def load_band_library(file_path):
+    """Memuat pustaka pita referensi dari file CSV/TSV/Excel (kolom: group, low, high, description)"""
+    if file_path.lower().endswith(('.xlsx', '.xls')):
+        table = pd.read_excel(file_path)
+    else:
+        table = pd.read_csv(file_path, sep=None, engine='python')
+    table.columns = [str(col).strip().lower() for col in table.columns]
+    missing = {'group', 'low', 'high'} - set(table.columns)
+    if missing:
+        raise ValueError(f"Pustaka pita tidak memiliki kolom: {', '.join(sorted(missing))}")
+    return build_band_index(table)
+
+DEFAULT_BAND_INDEX = build_band_index(FUNCTIONAL_GROUPS)
+
+def assign_functional_groups(wavenumbers, band_index=None):
+    """
+    Mencari semua kandidat gugus fungsi untuk array posisi puncak dalam satu panggilan.
+
+    Parameters:
+    - wavenumbers: array-like, posisi puncak (cm⁻¹)
+    - band_index: dict dari build_band_index/load_band_library (default: FUNCTIONAL_GROUPS)
+
+    Returns:
+    - assignments: DataFrame dengan kolom 'peak' (indeks dalam wavenumbers), 'wavenumber',
+      'group', 'description'; diurutkan per puncak lalu menurut urutan tabel pita
+    """
+    if band_index is None:
+        band_index = DEFAULT_BAND_INDEX
+    wavenumbers = np.asarray(wavenumbers, dtype=np.float64)
+    low, high = band_index['low'], band_index['high']
+
+    # Pita sempit yang mungkin memuat w memiliki low di [w - max_width, w]; rentang ini
+    # dicari dengan searchsorted lalu dibentangkan tanpa loop Python
+    start = np.searchsorted(low, wavenumbers - band_index['max_width'], side='left')
+    stop = np.searchsorted(low, wavenumbers, side='right')
+    counts = stop - start
+    peak_idx = np.repeat(np.arange(len(wavenumbers)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    band_pos = np.repeat(start, counts) + offsets
+
+    keep = (high[band_pos] >= wavenumbers[peak_idx]) & ~band_index['wide'][band_pos]
+    peak_idx, band_pos = peak_idx[keep], band_pos[keep]
+
+    # Pita lebar (sedikit) dicek langsung terhadap semua puncak
+    wide_pos = np.flatnonzero(band_index['wide'])
+    if len(wide_pos):
+        inside = ((low[wide_pos] <= wavenumbers[:, None]) & (high[wide_pos] >= wavenumbers[:, None]))
+        wide_peak, wide_band = np.nonzero(inside)
+        peak_idx = np.concatenate([peak_idx, wide_peak])
+        band_pos = np.concatenate([band_pos, wide_pos[wide_band]])
+    sort_idx = np.lexsort((band_index['order'][band_pos], peak_idx))
+    peak_idx, band_pos = peak_idx[sort_idx], band_pos[sort_idx]
+
+    return pd.DataFrame({
+        'peak': peak_idx,
+        'wavenumber': wavenumbers[peak_idx],
+        'group': band_index['group'][band_pos],
+        'description': band_index['description'][band_pos],
+    })
+
+def identify_functional_groups(data, peaks, band_index=None):
     """Mengidentifikasi gugus fungsi berdasarkan posisi puncak"""
-    functional_groups = []
-    for peak in peaks:
-        wavenumber = data['wavenumber'].iloc[peak]
-        for fg in FUNCTIONAL_GROUPS:
-            low, high = fg['range']
-            if low <= wavenumber <= high:
-                functional_groups.append({
-                    "wavenumber": wavenumber,
-                    "group": fg['group'],
-                    "description": fg['description']
-                })
-    return functional_groups
+    wavenumbers = data['wavenumber'].to_numpy()[np.asarray(peaks, dtype=int)]
+    assignments = assign_functional_groups(wavenumbers, band_index)
+    return [
+        {"wavenumber": wavenumber, "group": group, "description": description}
+        for wavenumber, group, description in zip(
+            assignments['wavenumber'], assignments['group'], assignments['description'])
+    ]
 
 def export_to_excel(data, peaks, file_path):
     """Ekspor data dan puncak ke file Excel"""
@@ -1,7 +1,11 @@
+import multiprocessing
 from tkinter import Tk
 from ui import UIMainApp
 
 if __name__ == "__main__":
+    # Wajib untuk build PyInstaller (Windows): proses pekerja ProcessPoolExecutor
+    # menjalankan ulang executable ini dan harus berhenti di sini
+    multiprocessing.freeze_support()
     root = Tk()
     app = UIMainApp(root)
-    root.mainloop()
\ No newline at end of file
+    root.mainloop()
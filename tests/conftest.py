@@ -0,0 +1,14 @@
+import os
+import pytest
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data', 'ftir', '0319fidela')
+
+@pytest.fixture
+def data_dir():
+    """Folder contoh FTIR bawaan repo"""
+    return DATA_DIR
+
+@pytest.fixture
+def sample_paths():
+    """File contoh FTIR bawaan repo (La5% Cr 2% dan La5% Cr 4%)"""
+    return [os.path.join(DATA_DIR, name) for name in ("La5% Cr 2%.txt", "La5% Cr 4%.txt")]
@@ -0,0 +1,63 @@
+import os
+import numpy as np
+import pytest
+from ftir.processing import (load_data, load_folder, asls_baseline, baseline_correction,
+                             baseline_correction_many, clear_caches, tune_baseline)
+
+@pytest.fixture
+def spectrum(sample_paths):
+    data = load_data(sample_paths[0])
+    return data['wavenumber'].to_numpy(), data['%T'].to_numpy()
+
+@pytest.mark.parametrize('lam, p', [(1e3, 0.01), (1e5, 0.05)])
+def test_asls_matches_pybaselines(spectrum, lam, p):
+    Baseline = pytest.importorskip('pybaselines').Baseline
+    x, y = spectrum
+    clear_caches()
+    expected, _ = Baseline(x_data=x).asls(y, lam=lam, p=p)
+    np.testing.assert_allclose(asls_baseline(y, lam=lam, p=p, x=x), expected, rtol=1e-8, atol=1e-8)
+
+def test_rerun_with_new_parameters_uses_warm_start(sample_paths):
+    # Baseline dengan lam/p baru dimulai dari bobot cache; hasilnya harus sama dengan hitungan dingin
+    clear_caches()
+    data = load_data(sample_paths[0])
+    first = baseline_correction(data, lam=1e3, p=0.01)
+    warm = baseline_correction(data, lam=1e5, p=0.05)
+    clear_caches()
+    cold = baseline_correction(data, lam=1e5, p=0.05)
+    np.testing.assert_allclose(warm['%T_corrected'], cold['%T_corrected'], atol=1e-6)
+    np.testing.assert_array_equal(baseline_correction(data, lam=1e3, p=0.01)['%T_corrected'],
+                                  first['%T_corrected'])
+
+def test_explicit_weights_round_trip(spectrum):
+    x, y = spectrum
+    clear_caches()
+    baseline, weights = asls_baseline(y, x=x, return_weights=True)
+    assert weights.shape == y.shape
+    np.testing.assert_allclose(asls_baseline(y, x=x, weights=weights), baseline, atol=1e-9)
+
+def test_baseline_correction_many_matches_single(sample_paths):
+    batch = load_folder(os.path.dirname(sample_paths[0]), max_workers=1)
+    x = batch['wavenumber'][0]
+    Y = np.vstack([batch['%T'][0], batch['%T'][0] + 1.0])
+    stacked = baseline_correction_many(x, Y, max_workers=1)
+    clear_caches()
+    np.testing.assert_allclose(stacked[0], asls_baseline(Y[0], x=x), atol=1e-9)
+    np.testing.assert_allclose(stacked[1], asls_baseline(Y[1], x=x), atol=1e-9)
+
+def test_tune_baseline_picks_interior_candidate(spectrum):
+    x, y = spectrum
+    lam_range, p_range = (1e2, 1e8), (1e-3, 1e-1)
+    result = tune_baseline(y, x, lam_range=lam_range, p_range=p_range)
+    assert lam_range[0] < result['lam'] < lam_range[1]
+    assert p_range[0] < result['p'] < p_range[1]
+    candidates = result['candidates']
+    chosen = candidates[(candidates['lam'] == result['lam']) & (candidates['p'] == result['p'])]
+    assert chosen['score'].tolist() == [result['score']]
+    np.testing.assert_allclose(result['baseline'], asls_baseline(y, lam=result['lam'], p=result['p'], x=x))
+
+    parallel = tune_baseline(y, x, lam_range=lam_range, p_range=p_range, max_workers=2)
+    assert (parallel['lam'], parallel['p']) == (result['lam'], result['p'])
+
+    with pytest.raises(ValueError):
+        tune_baseline(y, x, p_range=(0.1, 1.5))
@@ -0,0 +1,31 @@
+import numpy as np
+import pytest
+
+from ftir.chemometrics import randomized_svd
+
+
+def _low_rank(rank=4, shape=(60, 300), seed=0):
+    rng = np.random.default_rng(seed)
+    X = rng.standard_normal((shape[0], rank)) @ rng.standard_normal((rank, shape[1]))
+    return X + 1e-8 * rng.standard_normal(shape) + 5.0
+
+
+def _assert_matches_full_svd(X_centered, U, S, Vt, n_components):
+    _, S_full, Vt_full = np.linalg.svd(X_centered, full_matrices=False)
+    np.testing.assert_allclose(S, S_full[:n_components], rtol=1e-6)
+    # Vektor singular hanya unik sampai tanda; bandingkan proyektor subruangnya.
+    np.testing.assert_allclose(Vt.T @ Vt, Vt_full[:n_components].T @ Vt_full[:n_components], atol=1e-6)
+    np.testing.assert_allclose(U @ np.diag(S) @ Vt, X_centered, atol=1e-5)
+
+
+@pytest.mark.parametrize('center', [False, True])
+def test_randomized_svd_matches_full_svd(center):
+    X = _low_rank()
+    mean = X.mean(axis=0) if center else None
+    n_components = 4 if center else 5
+    U, S, Vt = randomized_svd(X, n_components, mean=mean)
+
+    assert U.shape == (60, n_components)
+    assert Vt.shape == (n_components, 300)
+    _assert_matches_full_svd(X - mean if center else X, U, S, Vt, n_components)
+    np.testing.assert_allclose(U.T @ U, np.eye(n_components), atol=1e-10)
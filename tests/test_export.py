@@ -0,0 +1,48 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from ftir.processing import load_data, baseline_correction
+from ftir.analysis import identify_peaks
+from ftir.utils import identify_functional_groups
+from ftir.export import export_batch
+
+@pytest.fixture
+def samples(sample_paths):
+    data = baseline_correction(load_data(sample_paths[0]))
+    peaks = identify_peaks(data)
+    return [
+        # Sampel pertama sengaja tanpa puncak: skema tidak boleh diambil darinya
+        {'name': 'tanpa_puncak', 'data': data},
+        {'name': 'dengan_puncak', 'data': data, 'peaks': peaks,
+         'functional_groups': identify_functional_groups(data, peaks)},
+    ]
+
+@pytest.mark.parametrize('extension', ['.parquet', '.feather'])
+def test_arrow_round_trip_with_peakless_first_sample(tmp_path, samples, extension):
+    pytest.importorskip('pyarrow')
+    file_path = str(tmp_path / f"batch{extension}")
+    summary = export_batch(samples, file_path, screen=False)
+    assert summary['n_peaks'].tolist() == [0, len(samples[1]['peaks'])]
+
+    read = pd.read_parquet if extension == '.parquet' else pd.read_feather
+    spectra = read(file_path)
+    peaks = read(str(tmp_path / f"batch_peaks{extension}"))
+    data = samples[0]['data']
+    assert len(spectra) == 2 * len(data)
+    first = spectra[spectra['sample'] == 'tanpa_puncak']
+    np.testing.assert_allclose(first['%T'], data['%T'])
+    np.testing.assert_allclose(first['baseline'], data['%T_corrected'])
+    assert not first['Peak'].any()
+    assert (peaks['sample'] == 'dengan_puncak').all()
+    np.testing.assert_array_equal(peaks['index'], samples[1]['peaks'])
+
+def test_hdf5_round_trip(tmp_path, samples):
+    h5py = pytest.importorskip('h5py')
+    file_path = str(tmp_path / "batch.h5")
+    export_batch(samples, file_path, screen=False)
+    with h5py.File(file_path, 'r') as h5file:
+        assert set(h5file) == {'tanpa_puncak', 'dengan_puncak'}
+        assert len(h5file['tanpa_puncak/peaks']) == 0
+        np.testing.assert_allclose(h5file['dengan_puncak/baseline'][:], samples[1]['data']['%T_corrected'])
+        np.testing.assert_array_equal(h5file['dengan_puncak/peaks']['index'], samples[1]['peaks'])
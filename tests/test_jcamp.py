@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from ftir.jcamp import decode_asdf_line, iter_jcamp, write_jcamp
+
+
+def _blocks():
+    x1 = np.linspace(4000.0, 400.0, 517)
+    y1 = 50 + 40 * np.sin(x1 / 97.0)
+    # Sumbu tidak seragam dan lebih pendek pada blok kedua.
+    x2 = np.sort(np.random.default_rng(0).uniform(500.0, 3500.0, 203))[::-1]
+    y2 = 80 - 0.01 * (x2 - 2000.0) ** 2 / 100.0
+    return [(x1, y1, {'TITLE': 'a'}), (x2, y2, {'TITLE': 'b', 'YUNITS': '%T'})]
+
+
+def test_decode_asdf_line_sqz_dif_dup():
+    values, ends_with_dif = decode_asdf_line('100A0J1%T')
+    assert values == [100.0, 10.0, 21.0, 21.0, 21.0]
+    assert ends_with_dif
+
+
+@pytest.mark.parametrize('compression', ['DIFDUP', 'AFFN'])
+def test_write_iter_round_trip(tmp_path, compression):
+    file_path = tmp_path / f'spektra_{compression}.jdx'
+    blocks = _blocks()
+    assert write_jcamp(str(file_path), blocks, compression=compression, y_decimals=6) == 2
+
+    result = list(iter_jcamp(str(file_path)))
+    assert len(result) == 2
+    for (x, y, meta), (x_read, y_read, meta_read) in zip(blocks, result):
+        assert len(x_read) == len(x)
+        np.testing.assert_allclose(x_read, x, atol=1e-9)
+        np.testing.assert_allclose(y_read, y, atol=1e-6)
+        assert meta_read['TITLE'] == meta['TITLE']
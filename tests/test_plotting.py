@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+matplotlib = pytest.importorskip('matplotlib')
+matplotlib.use('Agg')
+from matplotlib.figure import Figure
+
+from ftir.processing import load_data, baseline_correction
+from ftir.analysis import identify_peaks
+from ftir.plotting import draw_spectrum_artists, add_peak_artist, update_spectrum_artists, remove_peak_artist
+from ftir.utils import identify_functional_groups
+
+
+@pytest.fixture
+def corrected(sample_paths):
+    return baseline_correction(load_data(sample_paths[0]))
+
+
+def _small_axes():
+    # Axes sempit agar decimation aktif untuk 3735 titik
+    return Figure(figsize=(2, 2), dpi=100).add_subplot()
+
+
+def test_added_peak_survives_decimation(corrected):
+    artists = draw_spectrum_artists(_small_axes(), corrected, [], "uji")
+    shown = artists["line"].get_xdata()
+    assert len(shown) < len(corrected)
+
+    x = corrected['wavenumber'].to_numpy()
+    index = int(np.flatnonzero(~np.isin(x, shown))[len(shown) // 2])
+    add_peak_artist(artists, corrected, index)
+    assert x[index] in artists["line"].get_xdata()
+
+    # Tetap tergambar setelah zoom/pan menghitung ulang decimation
+    ax = artists["line"].axes
+    ax.set_xlim(4000, 400)
+    assert x[index] in artists["line"].get_xdata()
+
+
+def test_toggles_reuse_artists(corrected):
+    peaks = identify_peaks(corrected)
+    groups = identify_functional_groups(corrected, peaks)
+    artists = draw_spectrum_artists(_small_axes(), corrected, peaks, "uji")
+    ax = artists["line"].axes
+    lines, texts = list(ax.lines), list(ax.texts)
+    assert len(artists["peaks"]) == len(peaks)
+
+    update_spectrum_artists(artists, show_peaks=False)
+    assert not any(peak["tick"].get_visible() or peak["label"].get_visible() for peak in artists["peaks"])
+    update_spectrum_artists(artists, show_legend=False, functional_groups=groups)
+    assert all(peak["label"].get_visible() and peak["label"].get_text() for peak in artists["peaks"])
+    assert not artists["legend"].get_visible()
+    update_spectrum_artists(artists, show_groups=False, functional_groups=groups)
+    assert all(peak["label"].get_text().endswith("cm⁻¹") for peak in artists["peaks"])
+    # Toggle hanya mengubah artist yang sudah ada
+    assert list(ax.lines) == lines and list(ax.texts) == texts
+
+    removed = remove_peak_artist(artists, artists["peaks"][0]["wavenumber"])
+    assert removed["tick"] not in ax.lines and removed["label"] not in ax.texts
+    assert len(ax.lines) == len(lines) - 1
@@ -0,0 +1,29 @@
+import os
+import numpy as np
+from ftir.processing import read_spectrum_txt, load_data, load_folder, stack_spectra
+
+def test_read_spectrum_txt_parses_header_and_columns(sample_paths):
+    x, y, metadata = read_spectrum_txt(sample_paths[0])
+    assert len(x) == len(y) == 3735
+    assert x.dtype == y.dtype == np.float64
+    assert np.all(np.isfinite(x)) and np.all(np.isfinite(y))
+    assert 399 < x.min() < 400 and 4000 < x.max() < 4001
+    assert isinstance(metadata, dict)
+
+def test_load_folder_matches_load_data(sample_paths):
+    batch = load_folder(os.path.dirname(sample_paths[0]), max_workers=1)
+    assert batch['names'] == ['La5% Cr 2%', 'La5% Cr 4%']
+    assert batch['wavenumber'].flags.c_contiguous and batch['%T'].flags.c_contiguous
+    for i, path in enumerate(sample_paths):
+        data = load_data(path)
+        n = batch['lengths'][i]
+        np.testing.assert_array_equal(batch['wavenumber'][i, :n], data['wavenumber'])
+        np.testing.assert_array_equal(batch['%T'][i, :n], data['%T'])
+
+def test_stack_spectra_pads_shorter_rows_with_nan():
+    results = [(np.arange(5.0), np.ones(5), {}), (np.arange(3.0), np.zeros(3), {})]
+    batch = stack_spectra(['a.txt', 'b.txt'], results)
+    assert batch['%T'].shape == (2, 5)
+    np.testing.assert_array_equal(batch['lengths'], [5, 3])
+    assert np.isnan(batch['%T'][1, 3:]).all()
+    assert batch['names'] == ['a', 'b']
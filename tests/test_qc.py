@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+from ftir.processing import load_data
+from ftir.qc import screen_folder, screen_spectrum
+
+
+def test_sample_folder_lanes(data_dir):
+    lanes, report = screen_folder(data_dir)
+    assert report.loc['La5% Cr 2%', 'lane'] == 'warn'
+    assert report.loc['La5% Cr 2%', 'reasons'].startswith('non_monotonic=')
+    assert report.loc['La5% Cr 4%', 'lane'] == 'pass'
+    assert report.loc['La5% Cr 4%', 'reasons'] == ''
+    assert lanes['pass']['names'] == ['La5% Cr 4%']
+    assert lanes['warn']['names'] == ['La5% Cr 2%']
+    assert lanes['reject']['names'] == []
+
+
+def test_screen_spectrum_matches_folder(sample_paths):
+    for path, lane in zip(sample_paths, ('warn', 'pass')):
+        assert screen_spectrum(load_data(path))[0] == lane
+
+
+def test_reject_lanes():
+    x = np.linspace(4000.0, 400.0, 500)
+    y = 80 + 5 * np.sin(x / 50.0)
+
+    assert screen_spectrum(pd.DataFrame({'wavenumber': x, '%T': y}))[0] == 'pass'
+
+    lane, reasons = screen_spectrum(pd.DataFrame({'wavenumber': x[:8], '%T': y[:8]}))
+    assert lane == 'reject'
+    assert 'n_points' in reasons
+
+    y_nan = y.copy()
+    y_nan[100] = np.nan
+    lane, reasons = screen_spectrum(pd.DataFrame({'wavenumber': x, '%T': y_nan}))
+    assert lane == 'reject'
+    assert 'non_finite' in reasons
+
+    lane, reasons = screen_spectrum(pd.DataFrame({'wavenumber': x, '%T': np.full_like(y, 0.5)}))
+    assert lane == 'reject'
+    assert 'saturation' in reasons
@@ -0,0 +1,36 @@
+import numpy as np
+
+from ftir.processing import load_folder
+from ftir.quantification import band_area_matrix, band_areas, to_absorbance
+
+
+def _band(x, center=1600.0, width=30.0, depth=40.0):
+    return 90.0 - depth * np.exp(-0.5 * ((x - center) / width) ** 2)
+
+
+def test_local_baseline_isolated_band():
+    x = np.linspace(4000.0, 400.0, 3601)
+    areas, names = band_areas(x, _band(x), {'pita': (1400.0, 1800.0)})
+    # Absorbansi bersih di atas absorbansi latar -log10(0.9)
+    net = to_absorbance(_band(x)) - to_absorbance(90.0)
+    inside = (x >= 1400.0) & (x <= 1800.0)
+    expected = -np.trapezoid(net[inside], x[inside])
+    assert names == ['pita']
+    np.testing.assert_allclose(areas[0, 0], expected, rtol=1e-6)
+
+
+def test_no_negative_or_one_sided_chord_areas(data_dir):
+    areas = band_area_matrix(load_folder(data_dir))
+    # Jendela M-O lattice (400-700) menyentuh ujung data 399 cm⁻¹
+    assert areas['M-O lattice'].isna().all()
+    assert (areas[['O-H stretching', 'H-O-H bending']] > 0).all().all()
+
+    x = np.linspace(4000.0, 400.0, 3601)
+    windows = {'tepi': (350.0, 700.0), 'tepi atas': (3800.0, 4100.0), 'di bawah garis': (1560.0, 1900.0)}
+    areas, _ = band_areas(x, _band(x), windows)
+    assert np.isnan(areas[0, :2]).all()
+    assert areas[0, 2] >= 0
+
+    # Tanpa baseline lokal jendela terpotong tetap diintegrasikan sampai ujung data
+    areas, _ = band_areas(x, _band(x), windows, local_baseline=False)
+    assert np.isfinite(areas[0]).all()
@@ -0,0 +1,19 @@
+import pytest
+
+pytest.importorskip('matplotlib')
+from ftir.processing import load_folder
+from ftir.report import generate_report
+
+
+def test_screened_report_reuses_loaded_batch(data_dir, tmp_path, monkeypatch):
+    unscreened = generate_report(data_dir, str(tmp_path / 'semua.pdf'), screen=False, max_workers=1)
+
+    # Dengan screen=True file hanya dimuat sekali (oleh load_folder untuk QC)
+    monkeypatch.setattr('ftir.report.load_data', lambda path: pytest.fail(f"{path} dimuat ulang"))
+    screened = generate_report(data_dir, str(tmp_path / 'qc.pdf'), max_workers=1)
+    assert screened['qc'].tolist() == ['warn', 'pass']
+    assert screened.drop(columns='qc').equals(unscreened)
+
+    from_batch = generate_report(load_folder(data_dir), str(tmp_path / 'batch.pdf'), max_workers=1)
+    assert from_batch.equals(screened)
+    assert (tmp_path / 'batch.pdf').stat().st_size > 0
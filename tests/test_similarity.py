@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from scipy.cluster import hierarchy as scipy_hierarchy
+from scipy.spatial.distance import squareform
+
+from ftir.similarity import cluster_spectra, single_linkage
+
+
+def _similarity(n=40, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((4, 200))
+    X = centers[rng.integers(0, 4, n)] + 0.3 * rng.standard_normal((n, 200))
+    X = (X - X.mean(axis=1, keepdims=True)) / np.linalg.norm(X - X.mean(axis=1, keepdims=True), axis=1, keepdims=True)
+    S = X @ X.T
+    np.fill_diagonal(S, 1.0)
+    return S
+
+
+def _scipy_single(S):
+    distance = np.clip(1.0 - S, 0.0, None)
+    np.fill_diagonal(distance, 0.0)
+    return scipy_hierarchy.linkage(squareform(distance, checks=False), method='single')
+
+
+def test_single_linkage_matches_scipy():
+    S = _similarity()
+    Z = single_linkage(S)
+    Z_ref = _scipy_single(S)
+
+    assert Z.shape == Z_ref.shape
+    np.testing.assert_allclose(Z[:, 2], Z_ref[:, 2], atol=1e-12)
+    np.testing.assert_array_equal(Z[:, 3], Z_ref[:, 3])
+    for n_clusters in (2, 4, 8):
+        labels = scipy_hierarchy.fcluster(Z, n_clusters, criterion='maxclust')
+        labels_ref = scipy_hierarchy.fcluster(Z_ref, n_clusters, criterion='maxclust')
+        # Nomor klaster boleh berbeda; pembagiannya harus sama.
+        pairs = labels[:, None] == labels[None, :]
+        pairs_ref = labels_ref[:, None] == labels_ref[None, :]
+        np.testing.assert_array_equal(pairs, pairs_ref)
+
+
+def test_cluster_spectra_labels_and_methods():
+    S = _similarity()
+    result = cluster_spectra(S, threshold=0.5)
+    assert len(result['labels']) == len(S)
+    assert cluster_spectra(S)['labels'] is None
+    with pytest.raises(ValueError):
+        cluster_spectra(S, method='average')
@@ -0,0 +1,14 @@
+import numpy as np
+from ftir.smf import read_spectrum_smf
+from ftir.processing import read_spectrum_txt
+
+def test_smf_matches_instrument_text_export(sample_paths):
+    # File .smf bawaan adalah sumber dari ekspor .txt yang bernama sama
+    for path in sample_paths:
+        x_smf, y_smf, _ = read_spectrum_smf(path[:-4] + '.smf')
+        x_txt, y_txt, _ = read_spectrum_txt(path)
+        order = np.argsort(x_txt, kind='mergesort')
+        assert np.all(np.diff(x_smf) > 0)
+        np.testing.assert_allclose(x_smf, x_txt[order], atol=1e-5)
+        # Ekspor teks dibulatkan ke 6 desimal
+        np.testing.assert_allclose(y_smf, y_txt[order], atol=1e-5)
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from ftir.streaming import FrameRingBuffer
+
+
+def _push(buffer, values):
+    for value in values:
+        buffer.next_slot()[:] = value
+        buffer.commit(int(value), 0.0)
+
+
+def test_empty_buffer_average():
+    buffer = FrameRingBuffer(4, capacity=8, n_coadd=3)
+    out = np.empty(4)
+    assert buffer.average(out) == (-1, 0)
+    assert buffer.skipped == 0
+
+
+def test_coadd_average_across_wraparound():
+    buffer = FrameRingBuffer(4, capacity=8, n_coadd=3)
+    out = np.empty(4)
+    _push(buffer, range(20))
+    assert buffer.average(out) == (19, 3)
+    np.testing.assert_allclose(out, 18.0)
+
+
+def test_skip_accounting():
+    buffer = FrameRingBuffer(4, capacity=8, n_coadd=3)
+    out = np.empty(4)
+    _push(buffer, range(10))
+    assert buffer.average(out) == (9, 3)
+    np.testing.assert_allclose(out, 8.0)
+    # Frame 0..6 keluar dari jendela sebelum sempat dibaca.
+    assert buffer.skipped == 7
+
+    _push(buffer, range(10, 12))
+    buffer.average(out)
+    assert buffer.skipped == 7
+    np.testing.assert_allclose(out, 10.0)
+
+    _push(buffer, range(12, 17))
+    buffer.average(out)
+    assert buffer.skipped == 9
+
+
+def test_set_coadd():
+    buffer = FrameRingBuffer(4, capacity=8, n_coadd=3)
+    out = np.empty(4)
+    _push(buffer, range(5))
+    buffer.set_coadd(5)
+    assert buffer.average(out) == (4, 5)
+    np.testing.assert_allclose(out, 2.0)
+
+    buffer.set_coadd(2)
+    assert buffer.average(out) == (4, 2)
+    np.testing.assert_allclose(out, 3.5)
+
+    with pytest.raises(ValueError):
+        buffer.set_coadd(8)
@@ -1,5 +1,6 @@
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg, NavigationToolbar2Tk
+from common.plotting import layout_labels
 
 def plot_graph(gui, show_absorbance=True):
     """
@@ -23,6 +24,7 @@ def plot_graph(gui, show_absorbance=True):
 
     figsize = (gui.fig_width_scale.get(), gui.fig_height_scale.get())
     fig, ax = plt.subplots(figsize=figsize)
+    peak_points = []  # (lambda, absorbansi) puncak tiap sampel untuk dilabeli setelah plotting
     for i, df in enumerate(gui.data_frames):
         if show_absorbance:
             ax.plot(df['Lambda'], df['Absorbansi'], label=f"{gui.sample_names_var.get().split(',')[i].strip()} (Absorbansi)")
@@ -31,10 +33,18 @@ def plot_graph(gui, show_absorbance=True):
                 max_lambda = df['Lambda'].iloc[abs_max_idx]
                 max_abs = df['Absorbansi'].iloc[abs_max_idx]
                 ax.scatter(max_lambda, max_abs, color='black', zorder=1, s=2)
-                ax.text(max_lambda, max_abs, f'{max_abs:.2f}', color='black', fontsize=8, ha='left', va='bottom')
+                peak_points.append((max_lambda, max_abs))
         else:
             ax.plot(df['Lambda'], df['Transmitansi'], label=f"{gui.sample_names_var.get().split(',')[i].strip()} (Transmitansi)")
 
+    if peak_points:
+        # Sampel dengan puncak berdekatan ditumpuk ke beberapa baris label agar tidak bertabrakan
+        x_range = max(df['Lambda'].max() for df in gui.data_frames) - min(df['Lambda'].min() for df in gui.data_frames)
+        label_x, levels = layout_labels([x for x, _ in peak_points], 0.04 * x_range, n_levels=3, descending=False)
+        for (_, max_abs), text_x, level in zip(peak_points, label_x, levels):
+            ax.annotate(f'{max_abs:.2f}', xy=(text_x, max_abs), xytext=(0, 10 * level), textcoords='offset points',
+                        color='black', fontsize=8, ha='left', va='bottom')
+
     if gui.show_degradasi.get():
         degradasi_text = '\n'.join([f'% Degradasi {gui.sample_names_var.get().split(",")[0].strip()} ke {gui.sample_names_var.get().split(",")[i+1].strip()} : {gui.degradasi_values[i]:.2f}%'
                                    for i in range(len(gui.degradasi_values))])